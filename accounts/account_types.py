@@ -0,0 +1,94 @@
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import BankAccountType
+
+
+class AccountTypeRegistry:
+    """
+    Process-local cache of ``BankAccountType`` rows.
+
+    Account types almost never change, so they are loaded once and kept
+    for ``ACCOUNT_TYPE_CACHE_TTL`` seconds. When ``ACCOUNT_TYPE_CACHE_ALIAS``
+    names a Django cache, an expired process reloads from that shared cache
+    before falling back to the database. Saving or deleting an account type
+    invalidates the cache.
+    """
+    cache_key = 'accounts:account_types'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._account_types = None
+        self._expires_at = 0
+
+    @property
+    def ttl(self):
+        return settings.ACCOUNT_TYPE_CACHE_TTL
+
+    @property
+    def shared_cache(self):
+        alias = settings.ACCOUNT_TYPE_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def load(self):
+        shared_cache = self.shared_cache
+        account_types = shared_cache.get(self.cache_key) if shared_cache else None
+
+        if account_types is None:
+            account_types = {
+                account_type.pk: account_type
+                for account_type in BankAccountType.objects.order_by('pk')
+            }
+            if shared_cache:
+                shared_cache.set(self.cache_key, account_types, self.ttl)
+
+        return account_types
+
+    def as_dict(self):
+        account_types = self._account_types
+        if account_types is None or time.monotonic() >= self._expires_at:
+            with self._lock:
+                if self._account_types is None or time.monotonic() >= self._expires_at:
+                    self._account_types = self.load()
+                    self._expires_at = time.monotonic() + self.ttl
+                account_types = self._account_types
+        return account_types
+
+    async def aas_dict(self):
+        account_types = self._account_types
+        if account_types is None or time.monotonic() >= self._expires_at:
+            # Reloading goes through the sync cache and ORM APIs.
+            account_types = await sync_to_async(self.as_dict)()
+        return account_types
+
+    def all(self):
+        return list(self.as_dict().values())
+
+    def get(self, pk):
+        try:
+            return self.as_dict()[int(pk)]
+        except (KeyError, TypeError, ValueError):
+            raise BankAccountType.DoesNotExist(
+                f'BankAccountType matching pk={pk!r} does not exist.'
+            )
+
+    def invalidate(self):
+        with self._lock:
+            self._account_types = None
+        if self.shared_cache:
+            self.shared_cache.delete(self.cache_key)
+
+
+account_types = AccountTypeRegistry()
+
+
+def get_account_type_choices():
+    return [('', '---------')] + [
+        (account_type.pk, account_type.name)
+        for account_type in account_types.all()
+    ]
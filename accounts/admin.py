@@ -1,9 +1,33 @@
-from django.contrib import admin
-
-from .models import BankAccountType, User, UserAddress, UserBankAccount
-
-
-admin.site.register(BankAccountType)
-admin.site.register(User)
-admin.site.register(UserAddress)
-admin.site.register(UserBankAccount)
+from django.contrib import admin
+
+from core.admin import ScalableModelAdmin
+
+from .models import BankAccountType, User, UserAddress, UserBankAccount
+
+
+admin.site.register(BankAccountType)
+
+
+@admin.register(User)
+class UserAdmin(ScalableModelAdmin):
+    list_display = ('email', 'first_name', 'last_name', 'is_staff', 'date_joined')
+    search_fields = ('=email',)
+
+
+@admin.register(UserAddress)
+class UserAddressAdmin(ScalableModelAdmin):
+    list_display = ('user', 'city', 'country')
+    list_select_related = ('user',)
+    search_fields = ('=user__email',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(UserBankAccount)
+class UserBankAccountAdmin(ScalableModelAdmin):
+    list_display = (
+        'account_no', 'user', 'account_type', 'balance', 'initial_deposit_date'
+    )
+    list_select_related = ('user', 'account_type')
+    list_filter = ('account_type',)
+    search_fields = ('=account_no', '=user__email')
+    raw_id_fields = ('user',)
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+UserModel = get_user_model()
+
+
+class AccountModelBackend(ModelBackend):
+    """
+    Load the user's bank account, account type and address together with
+    the user, so the rest of the request does not trigger lazy queries
+    for them.
+    """
+    related_fields = ('account__account_type', 'address')
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related(
+                *self.related_fields
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -1,7 +1,7 @@
-MALE = 'M'
-FEMALE = 'F'
-
-GENDER_CHOICE = (
-    (MALE, "Male"),
-    (FEMALE, "Female"),
-)
+MALE = 'M'
+FEMALE = 'F'
+
+GENDER_CHOICE = (
+    (MALE, "Male"),
+    (FEMALE, "Female"),
+)
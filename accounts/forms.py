@@ -1,61 +1,81 @@
-from django import forms
-from django.conf import settings
-from django.contrib.auth.forms import UserCreationForm
-from django.db import transaction
-
-from .models import User, BankAccountType, UserBankAccount, UserAddress
-from .constants import GENDER_CHOICE
-
-
-class UserAddressForm(forms.ModelForm):
-    class Meta:
-        model = UserAddress
-        fields = ['street_address', 'city', 'postal_code', 'country']
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for field in self.fields:
-            self.fields[field].widget.attrs.update({
-                'class': 'appearance-none block w-full bg-gray-200 text-gray-700 border border-gray-200 rounded py-3 px-4 leading-tight focus:outline-none focus:bg-white focus:border-gray-500'
-            })
-
-
-class UserRegistrationForm(UserCreationForm):
-    account_type = forms.ModelChoiceField(
-        queryset=BankAccountType.objects.all())
-    gender = forms.ChoiceField(choices=GENDER_CHOICE)
-    birth_date = forms.DateField(
-        widget=forms.DateInput(attrs={'type': 'date'}),  # Use HTML5 date input
-        label='Birth Date'
-    )
-
-    class Meta:
-        model = User
-        fields = ['first_name', 'last_name', 'email', 'account_type',
-                  'gender', 'birth_date', 'password1', 'password2']
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for field in self.fields:
-            self.fields[field].widget.attrs.update({
-                'class': 'appearance-none block w-full bg-gray-200 text-gray-700 border border-gray-200 rounded py-3 px-4 leading-tight focus:outline-none focus:bg-white focus:border-gray-500'
-            })
-
-    @transaction.atomic
-    def save(self, commit=True):
-        user = super().save(commit=False)
-        user.set_password(self.cleaned_data["password1"])
-        if commit:
-            user.save()
-            account_type = self.cleaned_data.get('account_type')
-            gender = self.cleaned_data.get('gender')
-            birth_date = self.cleaned_data.get('birth_date')
-
-            UserBankAccount.objects.create(
-                user=user,
-                gender=gender,
-                birth_date=birth_date,
-                account_type=account_type,
-                account_no=user.id + settings.ACCOUNT_NUMBER_START_FROM
-            )
-        return user
+from django import forms
+from django.contrib.auth.forms import UserCreationForm
+from django.db import transaction
+
+from .account_types import account_types, get_account_type_choices
+from .models import User, BankAccountType, UserBankAccount, UserAddress
+from .constants import GENDER_CHOICE
+
+
+class AccountTypeChoiceField(forms.TypedChoiceField):
+    """
+    Account type select backed by the cached account type registry
+    instead of a queryset, so rendering and validating it needs no query.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            choices=get_account_type_choices,
+            coerce=self.get_account_type,
+            **kwargs
+        )
+
+    @staticmethod
+    def get_account_type(pk):
+        try:
+            return account_types.get(pk)
+        except BankAccountType.DoesNotExist:
+            raise ValueError(pk)
+
+
+class UserAddressForm(forms.ModelForm):
+    class Meta:
+        model = UserAddress
+        fields = ['street_address', 'city', 'postal_code', 'country']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields:
+            self.fields[field].widget.attrs.update({
+                'class': 'appearance-none block w-full bg-gray-200 text-gray-700 border border-gray-200 rounded py-3 px-4 leading-tight focus:outline-none focus:bg-white focus:border-gray-500'
+            })
+
+
+class UserRegistrationForm(UserCreationForm):
+    account_type = AccountTypeChoiceField()
+    gender = forms.ChoiceField(choices=GENDER_CHOICE)
+    birth_date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'}),  # Use HTML5 date input
+        label='Birth Date'
+    )
+
+    class Meta:
+        model = User
+        fields = ['first_name', 'last_name', 'email', 'account_type',
+                  'gender', 'birth_date', 'password1', 'password2']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields:
+            self.fields[field].widget.attrs.update({
+                'class': 'appearance-none block w-full bg-gray-200 text-gray-700 border border-gray-200 rounded py-3 px-4 leading-tight focus:outline-none focus:bg-white focus:border-gray-500'
+            })
+
+    @transaction.atomic
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        user.set_password(self.cleaned_data["password1"])
+        if commit:
+            user.save()
+            account_type = self.cleaned_data.get('account_type')
+            gender = self.cleaned_data.get('gender')
+            birth_date = self.cleaned_data.get('birth_date')
+
+            UserBankAccount.objects.create(
+                user=user,
+                gender=gender,
+                birth_date=birth_date,
+                account_type=account_type,
+                account_no=UserBankAccount.objects.reserve_account_numbers(1)[0]
+            )
+        return user
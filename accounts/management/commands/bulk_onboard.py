@@ -0,0 +1,82 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand
+
+from accounts.onboarding import REJECT_FIELDS, onboard_chunk, read_csv
+
+
+class Command(BaseCommand):
+    help = (
+        'Create customers with their bank account and address from a CSV '
+        'file with the columns email, password, first_name, last_name, '
+        'account_type (id or name), gender, birth_date, street_address, '
+        'city, postal_code and country. Passwords are hashed on a process '
+        'pool and rejected rows are written to a rejects file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file of customers.')
+        parser.add_argument(
+            '--rejects',
+            help='Where to write rejected rows, <path>.rejects.csv by default.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of customers validated and created per DB transaction.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Processes hashing passwords, 0 hashes them in this process.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        rejects_path = options['rejects'] or f'{path}.rejects.csv'
+
+        started = time.perf_counter()
+        rows_read = created = rejected = 0
+
+        executor = None
+        if options['workers']:
+            # Spawned workers need Django set up to read the hasher settings.
+            executor = ProcessPoolExecutor(
+                options['workers'], initializer=django.setup
+            )
+
+        try:
+            with open(path, newline='') as file, \
+                    open(rejects_path, 'w', newline='') as rejects_file:
+                rejects = csv.writer(rejects_file)
+                rejects.writerow(REJECT_FIELDS)
+
+                def reject(line, row, reason):
+                    nonlocal rejected
+                    rejected += 1
+                    rejects.writerow([line, row.get('email'), reason])
+
+                rows = read_csv(file)
+                while True:
+                    chunk = list(islice(rows, options['chunk_size']))
+                    if not chunk:
+                        break
+                    rows_read += len(chunk)
+                    created += onboard_chunk(chunk, reject, executor)
+
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'{rows_read} rows processed')
+        finally:
+            if executor:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} of {rows_read} customers, rejected {rejected} '
+            f'({rejects_path}) in {elapsed:.2f}s '
+            f'({rows_read / elapsed if elapsed else 0:.0f} rows/sec).'
+        ))
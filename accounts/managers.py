@@ -1,60 +1,151 @@
-from django.contrib import auth
-from django.contrib.auth.base_user import BaseUserManager
-
-
-class UserManager(BaseUserManager):
-    use_in_migrations = True
-
-    def _create_user(self, email, password, **extra_fields):
-        """
-        Create and save a user with the given email, and password.
-        """
-        if not email:
-            raise ValueError('The given email must be set')
-        email = self.normalize_email(email)
-        user = self.model(email=email, **extra_fields)
-        user.set_password(password)
-        user.save(using=self._db)
-        return user
-
-    def create_user(self, email=None, password=None, **extra_fields):
-        extra_fields.setdefault('is_staff', False)
-        extra_fields.setdefault('is_superuser', False)
-        return self._create_user(email, password, **extra_fields)
-
-    def create_superuser(self, email, password=None, **extra_fields):
-        extra_fields.setdefault('is_staff', True)
-        extra_fields.setdefault('is_superuser', True)
-
-        if extra_fields.get('is_staff') is not True:
-            raise ValueError('Superuser must have is_staff=True.')
-        if extra_fields.get('is_superuser') is not True:
-            raise ValueError('Superuser must have is_superuser=True.')
-
-        return self._create_user(email, password, **extra_fields)
-
-    def with_perm(self, perm, is_active=True, include_superusers=True, backend=None, obj=None):
-        if backend is None:
-            backends = auth._get_backends(return_tuples=True)
-            if len(backends) == 1:
-                backend, _ = backends[0]
-            else:
-                raise ValueError(
-                    'You have multiple authentication backends configured and '
-                    'therefore must provide the `backend` argument.'
-                )
-        elif not isinstance(backend, str):
-            raise TypeError(
-                'backend must be a dotted import path string (got %r).'
-                % backend
-            )
-        else:
-            backend = auth.load_backend(backend)
-        if hasattr(backend, 'with_perm'):
-            return backend.with_perm(
-                perm,
-                is_active=is_active,
-                include_superusers=include_superusers,
-                obj=obj,
-            )
-        return self.none()
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.base_user import BaseUserManager
+from django.db import connections, models, transaction
+from django.db.models import F, Max
+
+
+ACCOUNT_NUMBER_SEQUENCE = 'accounts_account_no_seq'
+
+
+class UserManager(BaseUserManager):
+    use_in_migrations = True
+
+    def _create_user(self, email, password, **extra_fields):
+        """
+        Create and save a user with the given email, and password.
+        """
+        if not email:
+            raise ValueError('The given email must be set')
+        email = self.normalize_email(email)
+        user = self.model(email=email, **extra_fields)
+        user.set_password(password)
+        user.save(using=self._db)
+        return user
+
+    def create_user(self, email=None, password=None, **extra_fields):
+        extra_fields.setdefault('is_staff', False)
+        extra_fields.setdefault('is_superuser', False)
+        return self._create_user(email, password, **extra_fields)
+
+    def create_superuser(self, email, password=None, **extra_fields):
+        extra_fields.setdefault('is_staff', True)
+        extra_fields.setdefault('is_superuser', True)
+
+        if extra_fields.get('is_staff') is not True:
+            raise ValueError('Superuser must have is_staff=True.')
+        if extra_fields.get('is_superuser') is not True:
+            raise ValueError('Superuser must have is_superuser=True.')
+
+        return self._create_user(email, password, **extra_fields)
+
+    def with_perm(self, perm, is_active=True, include_superusers=True, backend=None, obj=None):
+        if backend is None:
+            backends = auth._get_backends(return_tuples=True)
+            if len(backends) == 1:
+                backend, _ = backends[0]
+            else:
+                raise ValueError(
+                    'You have multiple authentication backends configured and '
+                    'therefore must provide the `backend` argument.'
+                )
+        elif not isinstance(backend, str):
+            raise TypeError(
+                'backend must be a dotted import path string (got %r).'
+                % backend
+            )
+        else:
+            backend = auth.load_backend(backend)
+        if hasattr(backend, 'with_perm'):
+            return backend.with_perm(
+                perm,
+                is_active=is_active,
+                include_superusers=include_superusers,
+                obj=obj,
+            )
+        return self.none()
+
+
+class UserBankAccountManager(models.Manager):
+
+    def reserve_account_numbers(self, count):
+        """
+        Reserve ``count`` new account numbers in one round trip.
+
+        PostgreSQL draws them from a dedicated sequence, which never blocks
+        concurrent reservations and may leave gaps. Other databases bump
+        the ``AccountNumberSequence`` counter row, which stays locked until
+        the surrounding transaction ends.
+        """
+        if count <= 0:
+            return []
+
+        connection = connections[self.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT nextval(%s) FROM generate_series(1, %s)',
+                    [ACCOUNT_NUMBER_SEQUENCE, count]
+                )
+                return sorted(row[0] for row in cursor.fetchall())
+
+        AccountNumberSequence = apps.get_model(
+            'accounts', 'AccountNumberSequence'
+        )
+        sequences = AccountNumberSequence.objects.db_manager(self.db)
+        with transaction.atomic(using=self.db):
+            if not sequences.filter(pk=1).update(
+                last_value=F('last_value') + count
+            ):
+                # The counter row is gone after a flush, start after the
+                # highest number in use.
+                last_value = self.aggregate(
+                    last=Max('account_no')
+                )['last'] or settings.ACCOUNT_NUMBER_START_FROM
+                sequences.create(pk=1, last_value=last_value + count)
+            last_value = sequences.values_list('last_value', flat=True).get(pk=1)
+
+        return list(range(last_value - count + 1, last_value + 1))
+
+    def adjust_balance(self, pk, amount):
+        """
+        Add ``amount`` (negative for debits) to the account balance in a
+        single conditional UPDATE and return the new balance.
+
+        Debits only apply while the balance covers them; ``None`` is
+        returned when the account does not exist or has insufficient funds.
+        """
+        connection = connections[self.db]
+
+        if not connection.features.can_return_columns_from_insert:
+            queryset = self.filter(pk=pk)
+            if amount < 0:
+                queryset = queryset.filter(balance__gte=-amount)
+            if not queryset.update(balance=F('balance') + amount):
+                return None
+            return self.filter(pk=pk).values_list('balance', flat=True).get()
+
+        opts = self.model._meta
+        qn = connection.ops.quote_name
+        balance = qn(opts.get_field('balance').column)
+        sql = (
+            f'UPDATE {qn(opts.db_table)} SET {balance} = {balance} + %s '
+            f'WHERE {qn(opts.pk.column)} = %s'
+        )
+        params = [amount, pk]
+        if amount < 0:
+            sql += f' AND {balance} >= %s'
+            params.append(-amount)
+        sql += f' RETURNING {balance}'
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        # SQLite hands back a float for decimal arithmetic.
+        return Decimal(str(row[0])).quantize(Decimal('0.01'))
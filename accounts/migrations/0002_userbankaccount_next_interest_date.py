@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:31
+
+from dateutil.relativedelta import relativedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_next_interest_date(apps, schema_editor):
+    UserBankAccount = apps.get_model('accounts', 'UserBankAccount')
+    db_alias = schema_editor.connection.alias
+    this_month = timezone.localdate().replace(day=1)
+    accounts = []
+
+    queryset = UserBankAccount.objects.using(db_alias).filter(
+        interest_start_date__isnull=False
+    ).select_related('account_type')
+
+    for account in queryset.iterator(chunk_size=2000):
+        interval = int(12 / account.account_type.interest_calculation_per_year)
+        next_interest_date = account.interest_start_date.replace(day=1)
+        while next_interest_date < this_month:
+            next_interest_date += relativedelta(months=+interval)
+
+        account.next_interest_date = next_interest_date
+        accounts.append(account)
+
+        if len(accounts) >= 2000:
+            UserBankAccount.objects.using(db_alias).bulk_update(
+                accounts, ['next_interest_date']
+            )
+            accounts = []
+
+    UserBankAccount.objects.using(db_alias).bulk_update(accounts, ['next_interest_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userbankaccount',
+            name='next_interest_date',
+            field=models.DateField(blank=True, db_index=True, help_text='The date interest will next be posted on', null=True),
+        ),
+        migrations.RunPython(
+            backfill_next_interest_date, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.16 on 2026-10-17 05:16
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def create_account_number_sequence(apps, schema_editor):
+    UserBankAccount = apps.get_model('accounts', 'UserBankAccount')
+    AccountNumberSequence = apps.get_model('accounts', 'AccountNumberSequence')
+
+    db_alias = schema_editor.connection.alias
+    last_value = UserBankAccount.objects.using(db_alias).aggregate(
+        last=Max('account_no')
+    )['last'] or settings.ACCOUNT_NUMBER_START_FROM
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE SEQUENCE accounts_account_no_seq START WITH {last_value + 1}'
+        )
+    else:
+        AccountNumberSequence.objects.using(db_alias).create(
+            pk=1, last_value=last_value
+        )
+
+
+def drop_account_number_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP SEQUENCE accounts_account_no_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_userbankaccount_next_interest_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountNumberSequence',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_value', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(
+            create_account_number_sequence, drop_account_number_sequence
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-17 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_account_number_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userbankaccount',
+            name='transactions_archived_before',
+            field=models.DateField(blank=True, help_text='Transactions before this date are kept in archive files', null=True),
+        ),
+    ]
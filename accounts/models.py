@@ -1,124 +1,166 @@
-from decimal import Decimal
-
-from django.contrib.auth.models import AbstractUser
-from django.core.validators import (
-    MinValueValidator,
-    MaxValueValidator,
-)
-from django.db import models
-
-from .constants import GENDER_CHOICE
-from .managers import UserManager
-
-
-class User(AbstractUser):
-    username = None
-    email = models.EmailField(unique=True, null=False, blank=False)
-
-    objects = UserManager()
-
-    USERNAME_FIELD = 'email'
-    REQUIRED_FIELDS = []
-
-    def __str__(self):
-        return self.email
-
-    @property
-    def balance(self):
-        if hasattr(self, 'account'):
-            return self.account.balance
-        return 0
-
-
-class BankAccountType(models.Model):
-    name = models.CharField(max_length=128)
-    maximum_withdrawal_amount = models.DecimalField(
-        decimal_places=2,
-        max_digits=12
-    )
-    annual_interest_rate = models.DecimalField(
-        validators=[MinValueValidator(0), MaxValueValidator(100)],
-        decimal_places=2,
-        max_digits=5,
-        help_text='Interest rate from 0 - 100'
-    )
-    interest_calculation_per_year = models.PositiveSmallIntegerField(
-        validators=[MinValueValidator(1), MaxValueValidator(12)],
-        help_text='The number of times interest will be calculated per year'
-    )
-
-    def __str__(self):
-        return self.name
-
-    def calculate_interest(self, principal):
-        """
-        Calculate interest for each account type.
-
-        This uses a basic interest calculation formula
-        """
-        p = principal
-        r = self.annual_interest_rate
-        n = Decimal(self.interest_calculation_per_year)
-
-        # Basic Future Value formula to calculate interest
-        interest = (p * (1 + ((r/100) / n))) - p
-
-        return round(interest, 2)
-
-
-class UserBankAccount(models.Model):
-    user = models.OneToOneField(
-        User,
-        related_name='account',
-        on_delete=models.CASCADE,
-    )
-    account_type = models.ForeignKey(
-        BankAccountType,
-        related_name='accounts',
-        on_delete=models.CASCADE
-    )
-    account_no = models.PositiveIntegerField(unique=True)
-    gender = models.CharField(max_length=1, choices=GENDER_CHOICE)
-    birth_date = models.DateField(null=True, blank=True)
-    balance = models.DecimalField(
-        default=0,
-        max_digits=12,
-        decimal_places=2
-    )
-    interest_start_date = models.DateField(
-        null=True, blank=True,
-        help_text=(
-            'The month number that interest calculation will start from'
-        )
-    )
-    initial_deposit_date = models.DateField(null=True, blank=True)
-
-    def __str__(self):
-        return str(self.account_no)
-
-    def get_interest_calculation_months(self):
-        """
-        List of month numbers for which the interest will be calculated
-
-        returns [2, 4, 6, 8, 10, 12] for every 2 months interval
-        """
-        interval = int(
-            12 / self.account_type.interest_calculation_per_year
-        )
-        start = self.interest_start_date.month
-        return [i for i in range(start, 13, interval)]
-
-
-class UserAddress(models.Model):
-    user = models.OneToOneField(
-        User,
-        related_name='address',
-        on_delete=models.CASCADE,
-    )
-    street_address = models.CharField(max_length=512)
-    city = models.CharField(max_length=256)
-    postal_code = models.PositiveIntegerField()
-    country = models.CharField(max_length=256)
-
-    def __str__(self):
-        return self.user.email
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+
+from django.contrib.auth.models import AbstractUser
+from django.core.validators import (
+    MinValueValidator,
+    MaxValueValidator,
+)
+from django.db import models
+
+from .constants import GENDER_CHOICE
+from .managers import UserBankAccountManager, UserManager
+
+
+class User(AbstractUser):
+    username = None
+    email = models.EmailField(unique=True, null=False, blank=False)
+
+    objects = UserManager()
+
+    USERNAME_FIELD = 'email'
+    REQUIRED_FIELDS = []
+
+    def __str__(self):
+        return self.email
+
+    @property
+    def balance(self):
+        if hasattr(self, 'account'):
+            return self.account.balance
+        return 0
+
+
+class BankAccountType(models.Model):
+    name = models.CharField(max_length=128)
+    maximum_withdrawal_amount = models.DecimalField(
+        decimal_places=2,
+        max_digits=12
+    )
+    annual_interest_rate = models.DecimalField(
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+        decimal_places=2,
+        max_digits=5,
+        help_text='Interest rate from 0 - 100'
+    )
+    interest_calculation_per_year = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(12)],
+        help_text='The number of times interest will be calculated per year'
+    )
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def interest_calculation_interval(self):
+        """Number of months between two interest postings."""
+        return int(12 / self.interest_calculation_per_year)
+
+    def calculate_interest(self, principal):
+        """
+        Calculate interest for each account type.
+
+        This uses a basic interest calculation formula
+        """
+        p = principal
+        r = self.annual_interest_rate
+        n = Decimal(self.interest_calculation_per_year)
+
+        # Basic Future Value formula to calculate interest
+        interest = (p * (1 + ((r/100) / n))) - p
+
+        return round(interest, 2)
+
+
+class UserBankAccount(models.Model):
+    user = models.OneToOneField(
+        User,
+        related_name='account',
+        on_delete=models.CASCADE,
+    )
+    account_type = models.ForeignKey(
+        BankAccountType,
+        related_name='accounts',
+        on_delete=models.CASCADE
+    )
+    account_no = models.PositiveIntegerField(unique=True)
+    gender = models.CharField(max_length=1, choices=GENDER_CHOICE)
+    birth_date = models.DateField(null=True, blank=True)
+    balance = models.DecimalField(
+        default=0,
+        max_digits=12,
+        decimal_places=2
+    )
+    interest_start_date = models.DateField(
+        null=True, blank=True,
+        help_text=(
+            'The month number that interest calculation will start from'
+        )
+    )
+    initial_deposit_date = models.DateField(null=True, blank=True)
+    next_interest_date = models.DateField(
+        null=True, blank=True, db_index=True,
+        help_text='The date interest will next be posted on'
+    )
+    transactions_archived_before = models.DateField(
+        null=True, blank=True,
+        help_text='Transactions before this date are kept in archive files'
+    )
+
+    objects = UserBankAccountManager()
+
+    def __str__(self):
+        return str(self.account_no)
+
+    def start_interest_schedule(self, deposit_date):
+        """
+        Set the interest dates for an account receiving its first deposit.
+        """
+        from .account_types import account_types
+
+        interval = account_types.get(
+            self.account_type_id
+        ).interest_calculation_interval
+        self.initial_deposit_date = deposit_date
+        self.interest_start_date = deposit_date + relativedelta(
+            months=+interval
+        )
+        # Interest is posted by the job on the first of the month.
+        self.next_interest_date = self.interest_start_date.replace(day=1)
+
+    def get_interest_calculation_months(self):
+        """
+        List of month numbers for which the interest will be calculated
+
+        returns [2, 4, 6, 8, 10, 12] for every 2 months interval
+        """
+        interval = self.account_type.interest_calculation_interval
+        start = self.interest_start_date.month
+        return [i for i in range(start, 13, interval)]
+
+
+class AccountNumberSequence(models.Model):
+    """
+    Last account number handed out, for databases without sequences.
+    PostgreSQL uses the ``accounts_account_no_seq`` sequence instead.
+    """
+    last_value = models.PositiveBigIntegerField()
+
+    def __str__(self):
+        return str(self.last_value)
+
+
+class UserAddress(models.Model):
+    user = models.OneToOneField(
+        User,
+        related_name='address',
+        on_delete=models.CASCADE,
+    )
+    street_address = models.CharField(max_length=512)
+    city = models.CharField(max_length=256)
+    postal_code = models.PositiveIntegerField()
+    country = models.CharField(max_length=256)
+
+    def __str__(self):
+        return self.user.email
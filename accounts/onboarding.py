@@ -0,0 +1,180 @@
+import csv
+import datetime
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .account_types import account_types
+from .constants import GENDER_CHOICE
+from .models import User, UserAddress, UserBankAccount
+
+
+ONBOARD_FIELDS = (
+    'email', 'password', 'first_name', 'last_name', 'account_type', 'gender',
+    'birth_date', 'street_address', 'city', 'postal_code', 'country',
+)
+REJECT_FIELDS = ('line', 'email', 'reason')
+
+GENDERS = dict(GENDER_CHOICE)
+
+
+def read_csv(file):
+    for line, row in enumerate(csv.DictReader(file), start=2):
+        yield line, row
+
+
+def get_account_type_lookup():
+    """Account types by primary key and by case-insensitive name."""
+    lookup = {}
+    for account_type in account_types.all():
+        lookup[str(account_type.pk)] = account_type
+        lookup[account_type.name.lower()] = account_type
+    return lookup
+
+
+def get_text(row, field, max_length, required=True):
+    value = (row.get(field) or '').strip()
+    if required and not value:
+        raise ValueError(f'Missing {field}')
+    if len(value) > max_length:
+        raise ValueError(f'{field} is longer than {max_length} characters')
+    return value
+
+
+def parse_customer(row, account_type_lookup):
+    """
+    Return the cleaned fields of a customer row or raise ``ValueError``
+    with the reason it is rejected.
+    """
+    email = User.objects.normalize_email(get_text(row, 'email', 254))
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ValueError('Invalid email')
+
+    account_type = account_type_lookup.get(
+        (row.get('account_type') or '').strip().lower()
+    )
+    if account_type is None:
+        raise ValueError('Unknown account type')
+
+    gender = (row.get('gender') or '').strip().upper()
+    if gender not in GENDERS:
+        raise ValueError('Invalid gender')
+
+    birth_date = (row.get('birth_date') or '').strip()
+    try:
+        birth_date = datetime.date.fromisoformat(birth_date) if birth_date else None
+    except ValueError:
+        raise ValueError('Invalid birth date')
+
+    try:
+        postal_code = int(row.get('postal_code'))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid postal code')
+    if postal_code < 0:
+        raise ValueError('Invalid postal code')
+
+    return {
+        'email': email,
+        # Customers without a password set one with a password reset.
+        'password': row.get('password') or None,
+        'first_name': get_text(row, 'first_name', 150, required=False),
+        'last_name': get_text(row, 'last_name', 150, required=False),
+        'account_type': account_type,
+        'gender': gender,
+        'birth_date': birth_date,
+        'street_address': get_text(row, 'street_address', 512),
+        'city': get_text(row, 'city', 256),
+        'postal_code': postal_code,
+        'country': get_text(row, 'country', 256),
+    }
+
+
+def hash_passwords(passwords, executor=None):
+    """
+    Hash ``passwords`` with the default hasher, on the processes of
+    ``executor`` when given. ``None`` becomes an unusable password.
+    """
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    # Batches the inter-process round trips, a hash takes ~0.2s.
+    return list(executor.map(make_password, passwords, chunksize=8))
+
+
+def onboard_chunk(rows, reject, executor=None):
+    """
+    Validate and create a chunk of ``(line, row)`` customers.
+
+    Passwords are hashed before the DB transaction, on ``executor`` if
+    given. Account numbers for the whole chunk are reserved with one
+    query, then users, accounts and addresses are each written with one
+    ``bulk_create``. Rejected rows are passed to ``reject(line, row,
+    reason)``. Returns the number of customers created.
+    """
+    lookup = get_account_type_lookup()
+    customers = []
+    for line, row in rows:
+        try:
+            customers.append((line, row, parse_customer(row, lookup)))
+        except ValueError as e:
+            reject(line, row, str(e))
+
+    existing = set(User.objects.filter(
+        email__in=[customer['email'] for _, _, customer in customers]
+    ).values_list('email', flat=True))
+
+    accepted = []
+    for line, row, customer in customers:
+        if customer['email'] in existing:
+            reject(line, row, 'Email already registered')
+            continue
+        existing.add(customer['email'])
+        accepted.append(customer)
+
+    if not accepted:
+        return 0
+
+    passwords = hash_passwords(
+        [customer['password'] for customer in accepted], executor
+    )
+
+    with transaction.atomic():
+        account_numbers = UserBankAccount.objects.reserve_account_numbers(
+            len(accepted)
+        )
+        users = User.objects.bulk_create(
+            User(
+                email=customer['email'],
+                password=password,
+                first_name=customer['first_name'],
+                last_name=customer['last_name']
+            )
+            for customer, password in zip(accepted, passwords)
+        )
+        UserBankAccount.objects.bulk_create(
+            UserBankAccount(
+                user=user,
+                account_type=customer['account_type'],
+                account_no=account_no,
+                gender=customer['gender'],
+                birth_date=customer['birth_date']
+            )
+            for user, customer, account_no in zip(
+                users, accepted, account_numbers
+            )
+        )
+        UserAddress.objects.bulk_create(
+            UserAddress(
+                user=user,
+                street_address=customer['street_address'],
+                city=customer['city'],
+                postal_code=customer['postal_code'],
+                country=customer['country']
+            )
+            for user, customer in zip(users, accepted)
+        )
+
+    return len(users)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .account_types import account_types
+from .models import BankAccountType
+
+
+@receiver(post_save, sender=BankAccountType)
+@receiver(post_delete, sender=BankAccountType)
+def invalidate_account_types(sender, **kwargs):
+    account_types.invalidate()
@@ -1,3 +1,338 @@
-from django.test import TestCase
-
-# Create your tests here.
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpRequest
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .account_types import account_types
+from .forms import UserRegistrationForm
+from .models import (
+    AccountNumberSequence,
+    BankAccountType,
+    User,
+    UserAddress,
+    UserBankAccount,
+)
+
+
+class AccountModelBackendTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        account_type = BankAccountType.objects.create(
+            name='Savings',
+            maximum_withdrawal_amount=10000,
+            annual_interest_rate=12,
+            interest_calculation_per_year=12
+        )
+        cls.user = User.objects.create_user(
+            email='customer@example.com',
+            password='test-password'
+        )
+        UserBankAccount.objects.create(
+            user=cls.user,
+            account_type=account_type,
+            account_no=1000000001,
+            gender='M'
+        )
+        UserAddress.objects.create(
+            user=cls.user,
+            street_address='1 Kenyatta Avenue',
+            city='Nairobi',
+            postal_code=100,
+            country='Kenya'
+        )
+
+    def get_login_request(self, user):
+        self.client.force_login(user)
+        request = HttpRequest()
+        request.session = self.client.session
+        return request
+
+    def test_user_is_loaded_with_account_context(self):
+        request_user = get_user(self.get_login_request(self.user))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(request_user.balance, 0)
+            self.assertEqual(
+                request_user.account.account_type.maximum_withdrawal_amount,
+                10000
+            )
+            self.assertEqual(request_user.address.city, 'Nairobi')
+
+    def test_user_without_account(self):
+        staff = User.objects.create_user(
+            email='staff@example.com',
+            password='test-password'
+        )
+        request = self.get_login_request(staff)
+
+        # Session and user.
+        with self.assertNumQueries(2):
+            request_user = get_user(request)
+            self.assertEqual(request_user.pk, staff.pk)
+            self.assertEqual(request_user.balance, 0)
+
+
+class AccountTypeRegistryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account_type = BankAccountType.objects.create(
+            name='Savings',
+            maximum_withdrawal_amount=10000,
+            annual_interest_rate=12,
+            interest_calculation_per_year=12
+        )
+
+    def setUp(self):
+        account_types.invalidate()
+
+    def test_account_types_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            account_types.all()
+            account_types.get(self.account_type.pk)
+            account_types.get(str(self.account_type.pk))
+
+    def test_saving_an_account_type_invalidates_the_cache(self):
+        account_types.all()
+        self.account_type.maximum_withdrawal_amount = 500
+        self.account_type.save()
+
+        self.assertEqual(
+            account_types.get(self.account_type.pk).maximum_withdrawal_amount,
+            500
+        )
+
+    def test_deleting_an_account_type_invalidates_the_cache(self):
+        account_types.all()
+        self.account_type.delete()
+
+        with self.assertRaises(BankAccountType.DoesNotExist):
+            account_types.get(self.account_type.pk)
+
+    def get_registration_data(self):
+        return {
+            'first_name': 'Jane',
+            'last_name': 'Doe',
+            'email': 'jane@example.com',
+            'account_type': str(self.account_type.pk),
+            'gender': 'F',
+            'birth_date': '1990-01-01',
+            'password1': 'a-Strong-passw0rd',
+            'password2': 'a-Strong-passw0rd',
+            'street_address': '1 Kenyatta Avenue',
+            'city': 'Nairobi',
+            'postal_code': '100',
+            'country': 'Kenya',
+        }
+
+    def test_registration_form_reads_cached_account_types(self):
+        account_types.all()
+        data = self.get_registration_data()
+
+        # Only the unique email check.
+        with self.assertNumQueries(1):
+            form = UserRegistrationForm(data)
+            str(form['account_type'])
+            self.assertTrue(form.is_valid(), form.errors)
+
+        self.assertEqual(form.cleaned_data['account_type'], self.account_type)
+
+    def test_registration(self):
+        self.assertContains(
+            self.client.get(reverse('accounts:user_registration')), 'Savings'
+        )
+        response = self.client.post(
+            reverse('accounts:user_registration'), self.get_registration_data()
+        )
+
+        self.assertRedirects(
+            response, reverse('transactions:deposit_money'),
+            fetch_redirect_response=False
+        )
+        account = UserBankAccount.objects.get(user__email='jane@example.com')
+        self.assertEqual(account.account_type, self.account_type)
+        self.assertGreater(account.account_no, settings.ACCOUNT_NUMBER_START_FROM)
+
+
+class AccountNumberReservationTests(TestCase):
+
+    def test_reserved_numbers_are_unique_and_increasing(self):
+        first = UserBankAccount.objects.reserve_account_numbers(3)
+        second = UserBankAccount.objects.reserve_account_numbers(2)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertEqual(sorted(set(first + second)), first + second)
+        self.assertGreater(first[0], settings.ACCOUNT_NUMBER_START_FROM)
+        self.assertEqual(UserBankAccount.objects.reserve_account_numbers(0), [])
+
+    def test_reservation_query_count(self):
+        with self.assertNumQueries(1 if connection.vendor == 'postgresql' else 4):
+            UserBankAccount.objects.reserve_account_numbers(1000)
+
+    def test_counter_restarts_after_highest_number_in_use(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('PostgreSQL uses a sequence.')
+
+        account_type = BankAccountType.objects.create(
+            name='Savings',
+            maximum_withdrawal_amount=10000,
+            annual_interest_rate=12,
+            interest_calculation_per_year=12
+        )
+        UserBankAccount.objects.create(
+            user=User.objects.create_user(email='customer@example.com'),
+            account_type=account_type,
+            account_no=2000000000,
+            gender='F'
+        )
+        AccountNumberSequence.objects.all().delete()
+
+        self.assertEqual(
+            UserBankAccount.objects.reserve_account_numbers(2),
+            [2000000001, 2000000002]
+        )
+
+
+class AccountAdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account_type = BankAccountType.objects.create(
+            name='Savings',
+            maximum_withdrawal_amount=10000,
+            annual_interest_rate=12,
+            interest_calculation_per_year=12
+        )
+        cls.admin_user = User.objects.create_superuser(
+            email='admin@example.com', password='test-password'
+        )
+
+    def create_customers(self, count, start=0):
+        for i in range(start, start + count):
+            user = User.objects.create_user(email=f'customer{i}@example.com')
+            UserBankAccount.objects.create(
+                user=user, account_type=self.account_type,
+                account_no=1000000000 + i, gender='F'
+            )
+            UserAddress.objects.create(
+                user=user, street_address=f'{i} Moi Avenue', city='Nairobi',
+                postal_code=100, country='Kenya'
+            )
+
+    def test_changelists_join_related_rows(self):
+        self.client.force_login(self.admin_user)
+        self.create_customers(1)
+        paths = [
+            reverse(f'admin:accounts_{model}_changelist')
+            for model in ('user', 'useraddress', 'userbankaccount')
+        ]
+        query_counts = []
+        for path in paths:
+            self.client.get(path)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(path).status_code, 200)
+            query_counts.append(len(queries))
+
+        self.create_customers(10, start=1)
+        for path, query_count in zip(paths, query_counts):
+            with self.assertNumQueries(query_count):
+                self.client.get(path)
+
+    def test_account_search_is_exact(self):
+        self.client.force_login(self.admin_user)
+        self.create_customers(11)
+        response = self.client.get(
+            reverse('admin:accounts_userbankaccount_changelist'),
+            {'q': '1000000001'}
+        )
+        self.assertEqual(
+            [account.account_no for account in response.context['cl'].result_list],
+            [1000000001]
+        )
+
+
+class BulkOnboardCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.account_type = BankAccountType.objects.create(
+            name='Savings',
+            maximum_withdrawal_amount=10000,
+            annual_interest_rate=12,
+            interest_calculation_per_year=12
+        )
+        User.objects.create_user(email='taken@example.com')
+
+    def setUp(self):
+        account_types.invalidate()
+
+    def onboard(self, content, workers=0):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'customers.csv')
+        with open(path, 'w') as file:
+            file.write(content)
+
+        call_command(
+            'bulk_onboard', path, chunk_size=2, workers=workers,
+            stdout=mock.Mock()
+        )
+        with open(f'{path}.rejects.csv') as file:
+            return file.read().splitlines()[1:]
+
+    def test_customers_are_created_and_invalid_rows_rejected(self):
+        rejects = self.onboard(
+            'email,password,first_name,last_name,account_type,gender,'
+            'birth_date,street_address,city,postal_code,country\n'
+            'jane@example.com,a-Strong-passw0rd,Jane,Doe,savings,F,1990-01-01,'
+            '1 Moi Avenue,Nairobi,100,Kenya\n'
+            'taken@example.com,,Taken,User,Savings,M,,1 Moi Avenue,Nairobi,'
+            '100,Kenya\n'
+            f'john@example.com,,John,Doe,{self.account_type.pk},M,,'
+            '2 Moi Avenue,Mombasa,200,Kenya\n'
+            'jane@example.com,,Jane,Again,Savings,F,,1 Moi Avenue,Nairobi,'
+            '100,Kenya\n'
+            'bad@example.com,,Bad,Row,Checking,X,,,Nairobi,abc,Kenya\n'
+        )
+
+        self.assertEqual(rejects, [
+            '3,taken@example.com,Email already registered',
+            '5,jane@example.com,Email already registered',
+            '6,bad@example.com,Unknown account type',
+        ])
+        jane = User.objects.select_related('account', 'address').get(
+            email='jane@example.com'
+        )
+        self.assertTrue(jane.check_password('a-Strong-passw0rd'))
+        self.assertEqual(jane.account.account_type, self.account_type)
+        self.assertEqual(str(jane.account.birth_date), '1990-01-01')
+        self.assertEqual(jane.address.city, 'Nairobi')
+
+        john = User.objects.get(email='john@example.com')
+        self.assertFalse(john.has_usable_password())
+        self.assertNotEqual(john.account.account_no, jane.account.account_no)
+
+    def test_passwords_are_hashed_on_worker_processes(self):
+        self.onboard(
+            'email,password,account_type,gender,street_address,city,'
+            'postal_code,country\n'
+            'jane@example.com,a-Strong-passw0rd,Savings,F,1 Moi Avenue,'
+            'Nairobi,100,Kenya\n',
+            workers=2
+        )
+
+        self.assertTrue(
+            User.objects.get(email='jane@example.com').check_password(
+                'a-Strong-passw0rd'
+            )
+        )
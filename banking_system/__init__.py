@@ -1,5 +1,13 @@
-from __future__ import absolute_import, unicode_literals
-
-from .celery import app as celery_app
-
-__all__ = ('celery_app',)
+from __future__ import absolute_import, unicode_literals
+
+__all__ = ('celery_app',)
+
+
+def __getattr__(name):
+    # Celery is imported on first use, web processes never send tasks and
+    # importing it is a large share of their cold start.
+    # ``celery -A banking_system`` finds the app in banking_system.celery.
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,133 +1,227 @@
-"""
-Django Settings for Banking System - Vercel Optimized
-"""
-
-import os
-from pathlib import Path
-
-# Build paths inside the project
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-# Security
-SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-change-me-in-production')
-
-# Environment detection
-IS_VERCEL = 'VERCEL_ENV' in os.environ
-DEBUG = not IS_VERCEL
-
-# Allowed hosts
-ALLOWED_HOSTS = ['*'] if IS_VERCEL else ['127.0.0.1', 'localhost']
-
-# Application definition
-INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'accounts',
-    'core', 
-    'transactions',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-ROOT_URLCONF = 'banking_system.urls'
-AUTH_USER_MODEL = 'accounts.User'
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = 'banking_system.wsgi.app'
-
-# Database
-if IS_VERCEL or os.environ.get('DATABASE_URL'):
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': os.environ.get('DB_NAME', 'postgres'),
-            'USER': os.environ.get('DB_USER'),
-            'PASSWORD': os.environ.get('DB_PASSWORD'),
-            'HOST': os.environ.get('DB_HOST'),
-            'PORT': os.environ.get('DB_PORT', '5432'),
-            'OPTIONS': {
-                'sslmode': 'require',
-            },
-            'CONN_MAX_AGE': 0,
-        }
-    }
-else:
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
-        }
-    }
-
-# Password validation
-AUTH_PASSWORD_VALIDATORS = [
-    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', 'OPTIONS': {'min_length': 8}},
-    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
-]
-
-# Internationalization
-LANGUAGE_CODE = 'en-us'
-TIME_ZONE = 'Africa/Nairobi'
-USE_I18N = True
-USE_L10N = True
-USE_TZ = True
-
-# Static files
-STATIC_URL = '/static/'
-STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
-
-# Banking settings
-ACCOUNT_NUMBER_START_FROM = 1000000000
-MINIMUM_DEPOSIT_AMOUNT = 100
-MINIMUM_WITHDRAWAL_AMOUNT = 100
-
-# Authentication
-LOGIN_REDIRECT_URL = 'home'
-LOGIN_URL = '/accounts/login/'
-LOGOUT_REDIRECT_URL = '/'
-
-# Session
-SESSION_COOKIE_AGE = 3600
-SESSION_SAVE_EVERY_REQUEST = True
-
-# Security for production
-if IS_VERCEL:
-    SECURE_BROWSER_XSS_FILTER = True
-    SECURE_CONTENT_TYPE_NOSNIFF = True
-
-# Default field type
-DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
-
-# Email
+"""
+Django Settings for Banking System - Vercel Optimized
+"""
+
+import os
+from pathlib import Path
+
+# Build paths inside the project
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Security
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-change-me-in-production')
+
+# Environment detection
+IS_VERCEL = 'VERCEL_ENV' in os.environ
+DEBUG = not IS_VERCEL
+
+# Allowed hosts
+ALLOWED_HOSTS = ['*'] if IS_VERCEL else ['127.0.0.1', 'localhost']
+
+# Application definition
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'accounts',
+    'core', 
+    'transactions',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.SessionRefreshMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'banking_system.urls'
+AUTH_USER_MODEL = 'accounts.User'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            # Compile every template once per process whatever DEBUG is,
+            # runserver still reloads changed templates
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'banking_system.wsgi.app'
+
+# Database
+# How Postgres connections are reused between requests: "none" opens one
+# per request, "persistent" keeps one per worker for DB_CONN_MAX_AGE seconds
+# and health checks it before reuse
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+
+if IS_VERCEL or os.environ.get('DATABASE_URL'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'postgres'),
+            'USER': os.environ.get('DB_USER'),
+            'PASSWORD': os.environ.get('DB_PASSWORD'),
+            'HOST': os.environ.get('DB_HOST'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'OPTIONS': {
+                'sslmode': os.environ.get('DB_SSLMODE', 'require'),
+            },
+            'CONN_MAX_AGE': 0,
+        }
+    }
+
+    if DB_CONNECTION_MODE == 'persistent':
+        DATABASES['default'].update({
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+        })
+
+    # Read replicas, as comma separated hosts sharing the name and
+    # credentials of the default database
+    for i, host in enumerate(
+        filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')),
+        start=1
+    ):
+        DATABASES[f'replica_{i}'] = {
+            **DATABASES['default'],
+            'HOST': host.strip(),
+            'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+            # Tests read replicated rows from the default test database
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+# The report, the statement export and admin changelists read from one of
+# these aliases, except for sessions that posted a transaction in the last
+# REPLICA_PIN_SECONDS, which read their own writes from the primary
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 30))
+
+# Password validation
+AUTH_PASSWORD_VALIDATORS = [
+    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', 'OPTIONS': {'min_length': 8}},
+    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
+]
+
+# Internationalization
+LANGUAGE_CODE = 'en-us'
+TIME_ZONE = 'Africa/Nairobi'
+USE_I18N = True
+USE_L10N = True
+USE_TZ = True
+
+# Static files
+STATIC_URL = '/static/'
+STATIC_ROOT = os.environ.get('STATIC_ROOT') or BASE_DIR / 'staticfiles'
+# Deployments serve the hashed files listed in the manifest written by
+# collectstatic at build time
+STATICFILES_STORAGE = (
+    'whitenoise.storage.CompressedManifestStaticFilesStorage' if IS_VERCEL
+    else 'whitenoise.storage.CompressedStaticFilesStorage'
+)
+# Version of the deployed code, part of the ETag of the report and export
+# so a deploy invalidates the copies clients hold. Defaults to the commit on
+# Vercel, else to a hash of the manifest collectstatic wrote
+RELEASE_VERSION = (
+    os.environ.get('RELEASE_VERSION')
+    or os.environ.get('VERCEL_GIT_COMMIT_SHA', '')
+)
+
+# Banking settings
+ACCOUNT_NUMBER_START_FROM = 1000000000
+MINIMUM_DEPOSIT_AMOUNT = 100
+MINIMUM_WITHDRAWAL_AMOUNT = 100
+# Number of account ids handled by each interest posting task
+INTEREST_SHARD_SIZE = 10000
+# Partition the transactions table by month on Postgres, once the
+# partition_transactions command has moved it over. Partitions are created
+# this many months ahead by the create_transaction_partitions task
+TRANSACTION_PARTITIONING = os.environ.get('TRANSACTION_PARTITIONING') == '1'
+TRANSACTION_PARTITION_MONTHS_AHEAD = 3
+# Where archive_transactions moves whole years of transactions older than
+# TRANSACTION_ARCHIVE_AFTER_DAYS to. Every process serving reports and
+# exports reads from it, so it has to be shared between hosts
+TRANSACTION_ARCHIVE_ROOT = (
+    os.environ.get('TRANSACTION_ARCHIVE_ROOT') or BASE_DIR / 'archive'
+)
+TRANSACTION_ARCHIVE_AFTER_DAYS = 730
+# Seconds account types are cached in each process, and optionally the
+# name of a shared cache in CACHES processes reload them from
+ACCOUNT_TYPE_CACHE_TTL = 300
+ACCOUNT_TYPE_CACHE_ALIAS = None
+# Serve the report, deposit and withdraw pages with the async views in
+# transactions.async_views, for deployments running under ASGI
+ASYNC_TRANSACTION_VIEWS = os.environ.get('ASYNC_TRANSACTION_VIEWS') == '1'
+# Bearer token Prometheus scrapes /metrics with, staff users can always
+# read it
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Let staff users profile requests with ?_profile=1 or an X-Profile: 1
+# header. Always on with DEBUG
+PROFILE_REQUESTS = DEBUG or os.environ.get('PROFILE_REQUESTS') == '1'
+# Statements slower than this many milliseconds in profiled requests are
+# stored with their EXPLAIN output
+PROFILE_SLOW_QUERY_MS = 50
+
+# Authentication
+AUTHENTICATION_BACKENDS = ['accounts.backends.AccountModelBackend']
+LOGIN_REDIRECT_URL = 'home'
+LOGIN_URL = '/accounts/login/'
+LOGOUT_REDIRECT_URL = '/'
+
+# Session
+# Where sessions are kept: "db", "cached_db" reads them through the default
+# cache, "signed_cookies" keeps them in the cookie with no server side writes
+SESSION_STORE = os.environ.get('SESSION_STORE', 'db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+SESSION_COOKIE_AGE = 3600
+# Sessions are saved when modified, and otherwise only once this fraction of
+# SESSION_COOKIE_AGE has passed since their last save instead of on every
+# request. 0 saves them on every request
+SESSION_REFRESH_FRACTION = float(
+    os.environ.get('SESSION_REFRESH_FRACTION', 0.1)
+)
+
+# Security for production
+if IS_VERCEL:
+    SECURE_BROWSER_XSS_FILTER = True
+    SECURE_CONTENT_TYPE_NOSNIFF = True
+
+# Default field type
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+# Email
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Settings ``manage.py test`` runs the test suite with.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+
+# Stand-in replica the routing tests list in DATABASE_REPLICAS, a second
+# SQLite database nothing is replicated to
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DATABASES['default']['NAME'],
+    }
@@ -1,20 +1,26 @@
-from django.contrib import admin
-from django.urls import include, path
-from django.conf import settings
-from django.conf.urls.static import static
-from core.views import HomeView
-
-
-urlpatterns = [
-    path('', HomeView.as_view(), name='home'),
-    path('accounts/', include('accounts.urls', namespace='accounts')),
-    path('admin/', admin.site.urls),
-    path(
-        'transactions/',
-        include('transactions.urls', namespace='transactions')
-    )
-]
-
-# add at the last
-urlpatterns += static(settings.MEDIA_URL, document_root = settings.MEDIA_ROOT)
-urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+from django.contrib import admin
+from django.urls import include, path
+from django.conf import settings
+from django.conf.urls.static import static
+from core.views import DatabaseConnectionStatsView, HomeView, MetricsView
+
+
+urlpatterns = [
+    path('', HomeView.as_view(), name='home'),
+    path('accounts/', include('accounts.urls', namespace='accounts')),
+    path('admin/', admin.site.urls),
+    path(
+        'db-stats/',
+        DatabaseConnectionStatsView.as_view(),
+        name='db_connection_stats'
+    ),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path(
+        'transactions/',
+        include('transactions.urls', namespace='transactions')
+    )
+]
+
+# add at the last
+urlpatterns += static(settings.MEDIA_URL, document_root = settings.MEDIA_ROOT)
+urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
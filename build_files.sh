@@ -8,11 +8,6 @@ pip install --upgrade pip
 pip install -r requirements.txt
 
 echo "Collecting static files..."
-# Run Django collectstatic command to gather static files
+# Collect, hash and compress static files into STATIC_ROOT along with the
+# staticfiles.json manifest, so nothing is collected at runtime
 python manage.py collectstatic --noinput --clear
-
-# Ensure the output directory exists
-mkdir -p staticfiles
-
-# Move collected static files to the output directory
-mv staticfiles/* staticfiles/
@@ -1,3 +1,252 @@
-from django.contrib import admin
-
-# Register your models here.
+import datetime
+import json
+
+from dateutil.relativedelta import relativedelta
+
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min, QuerySet
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.response import SimpleTemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from .models import RequestProfile
+from .routers import pin_to_primary, read_from_replica
+
+
+class ReplicaChangeListMixin:
+    """
+    Read changelist pages from a replica. Actions posted to the changelist
+    and the other admin views use the primary, and saving or deleting pins
+    the session to it so the next changelist shows the change.
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'GET':
+            return super().changelist_view(request, extra_context)
+        with read_from_replica(request):
+            response = super().changelist_view(request, extra_context)
+            # The page of results is read while rendering.
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+        return response
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        pin_to_primary(request)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        pin_to_primary(request)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        pin_to_primary(request)
+
+
+class ReplicaModelAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    pass
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Count with the query planner's row estimate on PostgreSQL, and only
+    run an exact ``COUNT(*)`` when the estimate is small.
+    """
+    exact_count_limit = 10000
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[queryset.db].vendor == 'postgresql':
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate > self.exact_count_limit:
+                self.estimated = True
+                return estimate
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist paged on the primary key, newest first. Each page is one
+    ``pk <`` range query whatever its depth, where page numbers would
+    need an ``OFFSET`` over every row before the page.
+    """
+    CURSOR_VAR = 'before'
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Other filters, searches and dates start on the first page.
+        return super().get_query_string(
+            new_params, [*(remove or []), self.CURSOR_VAR]
+        )
+
+    def get_ordering(self, request, queryset):
+        return ['-pk']
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        queryset = self.queryset
+        cursor = request.GET.get(self.CURSOR_VAR)
+        if cursor:
+            try:
+                queryset = queryset.filter(pk__lt=int(cursor))
+            except ValueError:
+                raise IncorrectLookupParameters
+        rows = list(queryset[:self.list_per_page + 1])
+
+        self.result_count = paginator.count
+        self.result_count_estimated = paginator.estimated
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = rows[:self.list_per_page]
+        self.can_show_all = False
+        self.multi_page = bool(cursor) or len(rows) > self.list_per_page
+        self.paginator = paginator
+        self.first_page_url = cursor and self.get_query_string()
+        self.next_page_url = None
+        if len(rows) > self.list_per_page:
+            self.next_page_url = self.get_query_string({
+                self.CURSOR_VAR: self.result_list[-1].pk
+            })
+
+
+class DateHierarchyQuerySet(QuerySet):
+    """
+    List the periods of the admin date hierarchy from the first and last
+    date of the queryset, two index lookups, instead of a ``DISTINCT``
+    over every row. Periods between them without rows are listed too.
+    """
+
+    def get_periods(self, field_name, kind):
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        if bounds['first'] is None:
+            return []
+        first, last = bounds['first'], bounds['last']
+        if isinstance(first, datetime.datetime):
+            first, last = timezone.localdate(first), timezone.localdate(last)
+
+        period = first.replace(
+            month=1 if kind == 'year' else first.month,
+            day=1 if kind in ('year', 'month') else first.day
+        )
+        periods = []
+        while period <= last:
+            periods.append(period)
+            period += relativedelta(**{f'{kind}s': 1})
+        return periods
+
+    def dates(self, field_name, kind, order='ASC'):
+        return self.get_periods(field_name, kind)
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None,
+                  is_dst=None):
+        return [
+            timezone.make_aware(datetime.datetime.combine(
+                period, datetime.time.min
+            ))
+            for period in self.get_periods(field_name, kind)
+        ]
+
+
+class ScalableModelAdmin(ReplicaModelAdmin):
+    """
+    Admin for tables with millions of rows: keyset paging, estimated
+    counts, no sorting by columns, and a date hierarchy that reads only
+    the first and last date. Set ``list_select_related`` for every
+    relation in ``list_display``, and only filter on indexed columns or
+    values common enough to fill a page quickly.
+    """
+    change_list_template = 'admin/keyset_change_list.html'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if not self.date_hierarchy:
+            return queryset
+        return DateHierarchyQuerySet(
+            model=queryset.model,
+            query=queryset.query.chain(),
+            using=queryset._db,
+            hints=queryset._hints,
+        )
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'created_at', 'method', 'path', 'view_name', 'user', 'status_code',
+        'duration_ms', 'query_count', 'query_time_ms', 'download_link'
+    )
+    list_filter = ('view_name', 'status_code')
+    search_fields = ('path', 'user__email')
+    list_select_related = ('user',)
+    fields = (
+        'created_at', 'user', 'method', 'path', 'view_name', 'status_code',
+        'duration_ms', 'query_count', 'query_time_ms', 'download_link',
+        'formatted_stats', 'formatted_queries'
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='core_requestprofile_download',
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, object_id):
+        profile = get_object_or_404(RequestProfile, pk=object_id)
+        response = HttpResponse(
+            bytes(profile.profile), content_type='application/octet-stream'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="request-{profile.pk}.prof"'
+        )
+        return response
+
+    @admin.display(description='Profile')
+    def download_link(self, obj):
+        return format_html(
+            '<a href="{}">Download .prof</a>',
+            reverse('admin:core_requestprofile_download', args=[obj.pk])
+        )
+
+    @admin.display(description='Stats')
+    def formatted_stats(self, obj):
+        return format_html('<pre>{}</pre>', obj.stats)
+
+    @admin.display(description='Queries')
+    def formatted_queries(self, obj):
+        return format_html(
+            '<pre>{}</pre>', json.dumps(obj.queries, indent=2)
+        )
@@ -1,5 +1,12 @@
-from django.apps import AppConfig
-
-
-class CoreConfig(AppConfig):
-    name = 'core'
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        from .db import collect_connection_metrics
+        from .metrics import metrics
+
+        metrics.add_collector(collect_connection_metrics)
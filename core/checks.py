@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+DB_CONNECTION_MODES = ('none', 'persistent')
+SESSION_STORES = ('db', 'cached_db', 'signed_cookies')
+
+
+@register()
+def check_db_connection_mode(app_configs, **kwargs):
+    mode = settings.DB_CONNECTION_MODE
+    if mode not in DB_CONNECTION_MODES:
+        return [Error(
+            f'DB_CONNECTION_MODE must be one of '
+            f'{", ".join(DB_CONNECTION_MODES)}, not {mode!r}.',
+            id='core.E001',
+        )]
+
+    return []
+
+
+@register()
+def check_session_store(app_configs, **kwargs):
+    errors = []
+    if settings.SESSION_STORE not in SESSION_STORES:
+        errors.append(Error(
+            f'SESSION_STORE must be one of {", ".join(SESSION_STORES)}, '
+            f'not {settings.SESSION_STORE!r}.',
+            id='core.E003',
+        ))
+    if not 0 <= settings.SESSION_REFRESH_FRACTION < 1:
+        errors.append(Error(
+            'SESSION_REFRESH_FRACTION must be at least 0 and below 1.',
+            id='core.E004',
+        ))
+    return errors
+
+
+@register()
+def check_database_replicas(app_configs, **kwargs):
+    errors = []
+    for alias in settings.DATABASE_REPLICAS:
+        if alias not in settings.DATABASES or alias == 'default':
+            errors.append(Error(
+                f'DATABASE_REPLICAS lists {alias!r}, which is not a replica '
+                f'alias of DATABASES.',
+                id='core.E005',
+            ))
+    return errors
@@ -0,0 +1,248 @@
+import csv
+import functools
+import io
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import islice
+
+from django.db import connections, router
+
+
+def fast_bulk_update(objs, fields, using=None):
+    """
+    Write ``fields`` of already saved ``objs`` to the database.
+
+    ``QuerySet.bulk_update()`` builds a ``CASE WHEN`` expression per field
+    and row, which dominates the cost of large batches. On PostgreSQL this
+    runs a single ``UPDATE ... FROM (VALUES ...)`` instead, elsewhere one
+    parametrised UPDATE through ``executemany()``.
+    """
+    objs = list(objs)
+    if not objs:
+        return 0
+
+    model = type(objs[0])
+    opts = model._meta
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    model_fields = [opts.pk] + [opts.get_field(name) for name in fields]
+    rows = [
+        [
+            field.get_db_prep_save(getattr(obj, field.attname), connection)
+            for field in model_fields
+        ]
+        for obj in objs
+    ]
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            placeholders = '({})'.format(', '.join(
+                f'%s::{field.cast_db_type(connection)}'
+                for field in model_fields
+            ))
+            cursor.execute(
+                'UPDATE {table} SET {assignments} FROM (VALUES {values}) '
+                'AS v ({columns}) WHERE {table}.{pk} = v.{pk}'.format(
+                    table=qn(opts.db_table),
+                    assignments=', '.join(
+                        f'{qn(field.column)} = v.{qn(field.column)}'
+                        for field in model_fields[1:]
+                    ),
+                    values=', '.join([placeholders] * len(rows)),
+                    columns=', '.join(
+                        qn(field.column) for field in model_fields
+                    ),
+                    pk=qn(opts.pk.column),
+                ),
+                [param for row in rows for param in row]
+            )
+        else:
+            cursor.executemany(
+                'UPDATE {} SET {} WHERE {} = %s'.format(
+                    qn(opts.db_table),
+                    ', '.join(
+                        f'{qn(field.column)} = %s'
+                        for field in model_fields[1:]
+                    ),
+                    qn(opts.pk.column)
+                ),
+                [row[1:] + row[:1] for row in rows]
+            )
+
+    return len(objs)
+
+
+def fast_bulk_insert(model, fields, rows, using=None, batch_size=10000):
+    """
+    Insert ``rows`` of ``fields`` values into the table of ``model``.
+
+    Values are written as given, so ``auto_now_add`` timestamps are kept,
+    and no model instances are built or primary keys returned. On
+    PostgreSQL with psycopg2 rows are streamed with ``COPY``, elsewhere
+    inserted with ``executemany()``, ``batch_size`` rows at a time.
+    """
+    opts = model._meta
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    model_fields = [opts.get_field(name) for name in fields]
+    table = qn(opts.db_table)
+    columns = ', '.join(qn(field.column) for field in model_fields)
+
+    def prepare(batch):
+        return [
+            [
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(model_fields, row)
+            ]
+            for row in batch
+        ]
+
+    inserted = 0
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        # psycopg 3 cursors have copy() instead.
+        use_copy = (
+            connection.vendor == 'postgresql' and hasattr(cursor, 'copy_expert')
+        )
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            if use_copy:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(
+                    [r'\N' if value is None else value for value in row]
+                    for row in prepare(batch)
+                )
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {table} ({columns}) FROM STDIN "
+                    f"WITH (FORMAT csv, NULL '\\N')",
+                    buffer
+                )
+            else:
+                cursor.executemany(
+                    'INSERT INTO {} ({}) VALUES ({})'.format(
+                        table, columns, ', '.join(['%s'] * len(model_fields))
+                    ),
+                    prepare(batch)
+                )
+            inserted += len(batch)
+
+    return inserted
+
+
+# ``execute_wrapper`` callables observing the queries of the current
+# context, see observe_queries().
+query_observers = ContextVar('query_observers', default=())
+
+
+def run_query_observers(execute, sql, params, many, context):
+    """
+    ``execute_wrapper`` every connection gets when it opens, passing its
+    queries through the observers of the current context.
+    """
+    for observer in query_observers.get():
+        execute = functools.partial(observer, execute)
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def observe_queries(observer):
+    """
+    Pass the queries run in the enclosed block, on any connection, through
+    the ``execute_wrapper`` ``observer``.
+
+    Unlike ``connection.execute_wrapper()`` this follows async code into
+    the threads ``sync_to_async`` runs its queries in, which have other
+    connection objects than the event loop.
+    """
+    token = query_observers.set((*query_observers.get(), observer))
+    try:
+        yield
+    finally:
+        query_observers.reset(token)
+
+
+def get_connection_mode(connection):
+    if connection.settings_dict['CONN_MAX_AGE'] != 0:
+        return 'persistent'
+    return 'none'
+
+
+class ConnectionStats:
+    """
+    Per-process counts of database connections opened, and of requests
+    that started with a connection from an earlier request still open.
+
+    Requests are checked after ``close_old_connections()`` has dropped
+    expired and unusable connections.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = Counter()
+        self.reused = Counter()
+
+    def connection_opened(self, alias):
+        with self._lock:
+            self.opened[alias] += 1
+
+    def request_started(self):
+        for connection in connections.all(initialized_only=True):
+            if connection.connection is not None:
+                with self._lock:
+                    self.reused[connection.alias] += 1
+
+    def reset(self):
+        with self._lock:
+            self.opened.clear()
+            self.reused.clear()
+
+    def as_dict(self):
+        stats = {}
+        for alias in connections:
+            connection = connections[alias]
+            with self._lock:
+                opened, reused = self.opened[alias], self.reused[alias]
+            stats[alias] = {
+                'mode': get_connection_mode(connection),
+                'max_age': connection.settings_dict['CONN_MAX_AGE'],
+                'connections_opened': opened,
+                'connections_reused': reused,
+                'checkouts': opened + reused,
+            }
+
+        return stats
+
+
+connection_stats = ConnectionStats()
+
+
+def collect_connection_metrics():
+    stats = connection_stats.as_dict()
+    return [
+        (
+            'db_connections_opened_total', 'counter',
+            'Database connections opened by this process.',
+            [
+                ({'alias': alias}, alias_stats['connections_opened'])
+                for alias, alias_stats in stats.items()
+            ]
+        ),
+        (
+            'db_connections_reused_total', 'counter',
+            'Requests that reused an open database connection.',
+            [
+                ({'alias': alias}, alias_stats['connections_reused'])
+                for alias, alias_stats in stats.items()
+            ]
+        ),
+    ]
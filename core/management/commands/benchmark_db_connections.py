@@ -0,0 +1,63 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS
+
+from accounts.backends import AccountModelBackend
+from core.db import connection_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Time simulated request cycles that load a user with their account, '
+        'as every authenticated request does, and report the latency per '
+        'request and how many database connections were opened. Run it once '
+        'per DB_CONNECTION_MODE to compare them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--threads', type=int, default=1,
+            help='Number of worker threads sending requests.'
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user_pk = User._default_manager.values_list('pk', flat=True).first()
+        users = User._default_manager.select_related(
+            *AccountModelBackend.related_fields
+        )
+        connection_stats.reset()
+
+        def request(_):
+            started = time.perf_counter()
+            # The same signals the request handlers send, so connections
+            # are opened, reused and closed as for real requests.
+            request_started.send(sender=self.__class__)
+            try:
+                users.filter(pk=user_pk).first()
+            finally:
+                request_finished.send(sender=self.__class__)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['threads']) as executor:
+            latencies = sorted(executor.map(request, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        stats = connection_stats.as_dict()[DEFAULT_DB_ALIAS]
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(self.style.SUCCESS(
+            f'{stats["mode"]} connections: {len(latencies)} requests on '
+            f'{options["threads"]} threads in {elapsed:.2f}s, '
+            f'mean {statistics.mean(latencies) * 1000:.2f}ms, '
+            f'p50 {quantiles[49] * 1000:.2f}ms, '
+            f'p95 {quantiles[94] * 1000:.2f}ms, '
+            f'{stats["connections_opened"]} connections opened, '
+            f'{stats["connections_reused"]} reused.'
+        ))
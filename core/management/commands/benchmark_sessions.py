@@ -0,0 +1,119 @@
+import datetime
+import time
+from contextlib import ExitStack
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+
+class SessionWriteCounter:
+    """``execute_wrapper`` counting statements that write sessions."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'django_session' in sql and not sql.lstrip().upper().startswith('SELECT'):
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Send GET requests for a page as an existing user, one every '
+        '--interval simulated seconds, and report the session writes per '
+        '1000 requests when the session is saved on every request and with '
+        'SESSION_REFRESH_FRACTION.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='User to send the requests as.')
+        parser.add_argument(
+            '--path', help='Page to request, the transaction report by default.'
+        )
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument(
+            '--interval', type=float, default=10,
+            help='Simulated seconds between two requests of the user.'
+        )
+        parser.add_argument(
+            '--fraction', type=float,
+            help='SESSION_REFRESH_FRACTION to compare with, the setting by '
+                 'default.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            self.user = get_user_model()._default_manager.get(
+                email=options['email']
+            )
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}.')
+
+        self.path = options['path'] or reverse(
+            'transactions:transaction_report'
+        )
+        fraction = options['fraction']
+        if fraction is None:
+            fraction = settings.SESSION_REFRESH_FRACTION
+
+        self.stdout.write(
+            f'{settings.SESSION_ENGINE}, SESSION_COOKIE_AGE '
+            f'{settings.SESSION_COOKIE_AGE}s, a request every '
+            f'{options["interval"]}s:'
+        )
+        for label, mode_fraction in (
+            ('every request', 0),
+            (f'fraction {fraction}', fraction),
+        ):
+            writes, cookies, elapsed = self.run(
+                options['requests'], options['interval'], mode_fraction
+            )
+            per_1000 = 1000 / options['requests']
+            self.stdout.write(
+                f'{label:>16}: {writes * per_1000:7.1f} session writes and '
+                f'{cookies * per_1000:7.1f} cookies set per 1000 requests, '
+                f'{elapsed / options["requests"] * 1000:.2f}ms per request'
+            )
+
+    def run(self, requests, interval, fraction):
+        client = Client()
+        client.force_login(self.user)
+        counter = SessionWriteCounter()
+        cookies = 0
+        elapsed = 0.0
+        started_at = timezone.now()
+
+        # The test client sends requests for the "testserver" host.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            SESSION_REFRESH_FRACTION=fraction
+        ), ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+
+            for i in range(requests):
+                # Session expiry and refresh read the simulated clock.
+                with mock.patch(
+                    'django.utils.timezone.now',
+                    return_value=started_at + datetime.timedelta(
+                        seconds=i * interval
+                    )
+                ):
+                    started = time.perf_counter()
+                    response = client.get(self.path)
+                    elapsed += time.perf_counter() - started
+
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{self.path} returned {response.status_code}.'
+                    )
+                cookies += settings.SESSION_COOKIE_NAME in response.cookies
+
+        return counter.count, cookies, elapsed
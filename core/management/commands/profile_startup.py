@@ -0,0 +1,49 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from core.startup import measure_cold_start
+
+
+class Command(BaseCommand):
+    help = (
+        'Import the WSGI application and serve one request in a fresh '
+        'interpreter, then report the cold start time and the most '
+        'expensive module imports.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module', default='banking_system.wsgi',
+            help='Module exposing the WSGI application.'
+        )
+        parser.add_argument('--path', default='/', help='Page to request.')
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Number of modules and packages to list.'
+        )
+
+    def handle(self, *args, **options):
+        stats = measure_cold_start(options['module'], options['path'])
+        limit = options['limit']
+
+        self.stdout.write(
+            f'Cold start: import {stats["import"] * 1000:.0f}ms, first '
+            f'request {stats["first_request"] * 1000:.0f}ms (status '
+            f'{stats["status"]}), total {stats["total"] * 1000:.0f}ms, '
+            f'{len(stats["imports"])} modules imported.'
+        )
+
+        self.stdout.write('\nSlowest imports, cumulative ms:')
+        slowest = sorted(stats['imports'], key=lambda row: -row[2])[:limit]
+        for module, self_us, cumulative_us in slowest:
+            self.stdout.write(
+                f'{cumulative_us / 1000:9.1f} {self_us / 1000:9.1f}  {module}'
+            )
+
+        packages = Counter()
+        for module, self_us, _ in stats['imports']:
+            packages[module.split('.')[0]] += self_us
+        self.stdout.write('\nImport time by top-level package, ms:')
+        for package, self_us in packages.most_common(limit):
+            self.stdout.write(f'{self_us / 1000:9.1f}  {package}')
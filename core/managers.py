@@ -0,0 +1,49 @@
+import json
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+
+class MetricValueManager(models.Manager):
+
+    def add(self, metric, labels, amounts):
+        """
+        Add ``amounts``, a dict of sample names to amounts, to the values of
+        ``metric`` with the ``labels`` values.
+
+        Every amount is added by an UPDATE of the stored value, so
+        concurrent processes never lose each other's increments. Values
+        seen for the first time are created.
+        """
+        labels = json.dumps(list(labels))
+        with transaction.atomic(using=self.db):
+            for sample, amount in amounts.items():
+                values = self.filter(metric=metric, labels=labels, sample=sample)
+                if values.update(value=F('value') + amount):
+                    continue
+                try:
+                    with transaction.atomic(using=self.db):
+                        self.create(
+                            metric=metric, labels=labels, sample=sample,
+                            value=amount
+                        )
+                except IntegrityError:
+                    # Created by another process meanwhile.
+                    values.update(value=F('value') + amount)
+
+    def get_values(self, metric):
+        """
+        Return ``(labels, sample, value)`` for every stored value of
+        ``metric``, ``labels`` being a tuple of label values.
+        """
+        return [
+            (
+                tuple(json.loads(labels)),
+                sample,
+                # Counts are rendered without a decimal point.
+                int(value) if value.is_integer() else value
+            )
+            for labels, sample, value in self.filter(metric=metric).values_list(
+                'labels', 'sample', 'value'
+            )
+        ]
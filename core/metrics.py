@@ -0,0 +1,289 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from .models import MetricValue
+
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300
+)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('\n', r'\n')
+            .replace('"', r'\"')
+        )
+        for name, value in labels.items()
+    )
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get_values(self):
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(self):
+        for labels, value in self.get_values():
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Histogram(Metric):
+    """
+    Counts observations per bucket upper bound, plus their sum and count.
+    Buckets are stored non-cumulative and added up on exposition, so an
+    observation only touches one bucket.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [
+                    [0] * (len(self.buckets) + 1), 0, 0
+                ]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def get_values(self):
+        with self._lock:
+            return [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._values.items()
+            ]
+
+    def samples(self):
+        for labels, counts, total, count in self.get_values():
+            labels = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield (
+                    f'{self.name}_bucket',
+                    {**labels, 'le': format_value(float(bound))},
+                    cumulative
+                )
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+
+class SharedCounter(Counter):
+    """
+    Counter kept in the database, so increments made in any process, like
+    the Celery workers, are rendered by every process.
+    """
+
+    def inc(self, *labels, amount=1):
+        MetricValue.objects.add(self.name, labels, {'': amount})
+
+    def get_values(self):
+        return [
+            (labels, value)
+            for labels, _, value in MetricValue.objects.get_values(self.name)
+        ]
+
+    def reset(self):
+        MetricValue.objects.filter(metric=self.name).delete()
+
+
+class SharedHistogram(Histogram):
+    """
+    Histogram kept in the database like ``SharedCounter``, one value per
+    bucket plus the sum and count of the observations.
+    """
+
+    def observe(self, *labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        MetricValue.objects.add(
+            self.name, labels, {str(index): 1, 'sum': value, 'count': 1}
+        )
+
+    def get_values(self):
+        entries = {}
+        for labels, sample, value in MetricValue.objects.get_values(self.name):
+            entry = entries.setdefault(
+                labels, [[0] * (len(self.buckets) + 1), 0, 0]
+            )
+            if sample == 'sum':
+                entry[1] = value
+            elif sample == 'count':
+                entry[2] = value
+            else:
+                entry[0][int(sample)] = value
+        return [
+            (labels, counts, total, count)
+            for labels, (counts, total, count) in entries.items()
+        ]
+
+    def reset(self):
+        MetricValue.objects.filter(metric=self.name).delete()
+
+
+class MetricsRegistry:
+    """
+    Metrics rendered in the Prometheus text format. Metrics are
+    process-local, except the shared ones kept in the database.
+
+    Collectors are callables returning ``(name, type, documentation,
+    samples)`` tuples, where samples are ``(labels, value)`` pairs, for
+    values read at scrape time instead of recorded as they happen.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+    def collect(self):
+        for metric in self._metrics:
+            yield (
+                metric.name, metric.type, metric.documentation,
+                metric.samples()
+            )
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                yield name, metric_type, documentation, (
+                    (name, labels, value) for labels, value in samples
+                )
+
+    def render(self):
+        lines = []
+        for name, metric_type, documentation, samples in self.collect():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.extend(
+                f'{sample_name}{format_labels(labels)} {format_value(value)}'
+                for sample_name, labels, value in samples
+            )
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+request_duration = metrics.histogram(
+    'http_request_duration_seconds',
+    'Time spent handling requests, by URL name.',
+    ['view', 'method']
+)
+requests_total = metrics.counter(
+    'http_requests_total',
+    'Requests handled, by URL name and response status.',
+    ['view', 'method', 'status']
+)
+request_db_queries = metrics.counter(
+    'http_request_db_queries_total',
+    'Database queries run while handling requests, by URL name.',
+    ['view']
+)
+request_db_duration = metrics.counter(
+    'http_request_db_duration_seconds_total',
+    'Time spent in database queries while handling requests, by URL name.',
+    ['view']
+)
+response_size = metrics.counter(
+    'http_response_size_bytes_total',
+    'Size of non-streaming response bodies, by URL name.',
+    ['view']
+)
+# Tasks run in the Celery workers, while /metrics is served by the web
+# processes.
+task_duration = metrics.register(SharedHistogram(
+    'task_duration_seconds',
+    'Time spent running background tasks, by task name and outcome.',
+    ['task', 'state']
+))
+task_rows = metrics.register(SharedCounter(
+    'task_rows_processed_total',
+    'Rows processed by background tasks, by task name.',
+    ['task']
+))
+
+
+def record_request(view, method, status, duration, queries, db_duration,
+                   size=None):
+    request_duration.observe(view, method, value=duration)
+    requests_total.inc(view, method, status)
+    request_db_queries.inc(view, amount=queries)
+    request_db_duration.inc(view, amount=db_duration)
+    if size is not None:
+        response_size.inc(view, amount=size)
+
+
+class TaskRun:
+    rows = 0
+
+
+@contextmanager
+def track_task(name):
+    """
+    Record the duration of the enclosed task and the ``rows`` it sets on
+    the yielded object.
+    """
+    run = TaskRun()
+    state = 'success'
+    started = time.perf_counter()
+    try:
+        yield run
+    except BaseException:
+        state = 'failure'
+        raise
+    finally:
+        task_duration.observe(name, state, value=time.perf_counter() - started)
+        task_rows.inc(name, amount=run.rows)
@@ -0,0 +1,194 @@
+import time
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from django.conf import settings
+
+from .db import observe_queries
+from .metrics import record_request
+from .profiling import aprofile_request, is_profile_requested, profile_request
+from .sessions import mark_refreshed, needs_refresh
+
+
+class QueryTimer:
+    """``execute_wrapper`` counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status, response size, and DB query count and time of
+    every request, keyed by the resolved URL name.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with observe_queries(timer):
+            response = self.get_response(request)
+        return self.record(request, response, timer, started)
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with observe_queries(timer):
+            response = await self.get_response(request)
+        return self.record(request, response, timer, started)
+
+    def record(self, request, response, timer, started):
+        match = request.resolver_match
+        record_request(
+            view=match.view_name if match else 'unresolved',
+            method=request.method,
+            status=response.status_code,
+            duration=time.perf_counter() - started,
+            queries=timer.count,
+            db_duration=timer.duration,
+            size=None if response.streaming else len(response.content),
+        )
+        return response
+
+
+class SessionRefreshMiddleware:
+    """
+    Push back the expiry of active sessions without saving them on every
+    request.
+
+    A session is saved when it was modified, and otherwise once
+    ``SESSION_REFRESH_FRACTION`` of ``SESSION_COOKIE_AGE`` has passed since
+    its last save, so an active session expires at most that fraction
+    earlier than with ``SESSION_SAVE_EVERY_REQUEST``. Must come after
+    ``SessionMiddleware``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.get_response(request)
+        if self.has_session(request):
+            self.refresh(request.session)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.has_session(request):
+            # Reading the session data may load it from the session store.
+            await sync_to_async(self.refresh)(request.session)
+        return response
+
+    def has_session(self, request):
+        session = getattr(request, 'session', None)
+        # No session cookie, or the session was flushed.
+        return session is not None and session.session_key is not None
+
+    def refresh(self, session):
+        if session.modified or (session.keys() and needs_refresh(session)):
+            mark_refreshed(session)
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request for staff users sending ``?_profile=1`` or an
+    ``X-Profile: 1`` header, while ``PROFILE_REQUESTS`` is on. The profile
+    id is returned in the ``X-Profile-Id`` response header. Other requests
+    go straight through.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not (is_profile_requested(request) and self.can_profile(request)):
+            return self.get_response(request)
+
+        response, profile = profile_request(self.get_response, request)
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+    async def __acall__(self, request):
+        # The user is only loaded for requests asking for a profile.
+        if not (
+            is_profile_requested(request)
+            and await sync_to_async(self.can_profile)(request)
+        ):
+            return await self.get_response(request)
+
+        response, profile = await aprofile_request(self.get_response, request)
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+    def can_profile(self, request):
+        return settings.PROFILE_REQUESTS and request.user.is_staff
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    ``WhiteNoiseMiddleware`` that also runs in async mode. A sync-only
+    middleware makes Django call everything below it, async views
+    included, through ``async_to_sync`` on a thread. Static files are
+    still looked up and served on a thread, as whitenoise reads them
+    synchronously.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-17 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_request_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricValue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100)),
+                ('labels', models.CharField(help_text='Label values as a JSON list', max_length=500)),
+                ('sample', models.CharField(blank=True, help_text='Histogram bucket index, "sum" or "count"', max_length=10)),
+                ('value', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='metricvalue',
+            constraint=models.UniqueConstraint(fields=('metric', 'labels', 'sample'), name='metric_value_unique'),
+        ),
+    ]
@@ -1,3 +1,62 @@
-from django.db import models
-
-# Create your models here.
+from django.conf import settings
+from django.db import models
+
+from .managers import MetricValueManager
+
+
+class RequestProfile(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='+',
+        null=True,
+        on_delete=models.SET_NULL,
+    )
+    method = models.CharField(max_length=10)
+    path = models.TextField()
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    query_time_ms = models.FloatField()
+    queries = models.JSONField(
+        default=list,
+        help_text='SQL issued, with EXPLAIN output for slow statements'
+    )
+    stats = models.TextField(help_text='Functions by cumulative time')
+    profile = models.BinaryField(help_text='cProfile data in pstats format')
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.duration_ms:.0f}ms)'
+
+
+class MetricValue(models.Model):
+    """
+    A metric value every process adds to and renders, see
+    ``core.metrics.SharedCounter`` and ``SharedHistogram``.
+    """
+    metric = models.CharField(max_length=100)
+    labels = models.CharField(
+        max_length=500, help_text='Label values as a JSON list'
+    )
+    sample = models.CharField(
+        max_length=10, blank=True,
+        help_text='Histogram bucket index, "sum" or "count"'
+    )
+    value = models.FloatField(default=0)
+
+    objects = MetricValueManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'labels', 'sample'],
+                name='metric_value_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.metric} {self.labels} {self.sample}'.rstrip()
@@ -0,0 +1,154 @@
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db import connections
+
+from .db import observe_queries
+from .models import RequestProfile
+
+
+PROFILE_QUERY_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_STATS_LIMIT = 60
+PROFILE_VALUES = ('1', 'true')
+
+
+def is_profile_requested(request):
+    value = (
+        request.META.get(PROFILE_HEADER)
+        or request.GET.get(PROFILE_QUERY_PARAM)
+        or ''
+    )
+    return value.lower() in PROFILE_VALUES
+
+
+class QueryRecorder:
+    """``execute_wrapper`` keeping every statement and its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'params': params,
+                'many': many,
+                'duration_ms': (time.perf_counter() - started) * 1000,
+            })
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{connection.ops.explain_query_prefix()} {sql}', params
+        )
+        return '\n'.join(
+            ' '.join(str(column) for column in row)
+            for row in cursor.fetchall()
+        )
+
+
+def describe_queries(queries):
+    """
+    JSON ready copies of ``queries`` with the plan of every slow SELECT.
+    Plans are read with plain EXPLAIN, the statements are not run again.
+    Parameters are left out, they may hold passwords, session keys or
+    account data.
+    """
+    described = []
+    for query in queries:
+        entry = {
+            'alias': query['alias'],
+            'sql': query['sql'],
+            'many': query['many'],
+            'duration_ms': round(query['duration_ms'], 3),
+        }
+        if (
+            query['duration_ms'] >= settings.PROFILE_SLOW_QUERY_MS
+            and not query['many']
+            and query['sql'].lstrip()[:6].upper() == 'SELECT'
+        ):
+            entry['explain'] = explain(
+                query['alias'], query['sql'], query['params']
+            )
+        described.append(entry)
+    return described
+
+
+class RequestProfiler:
+    """
+    Profile the code run inside it while recording its SQL. ``save()``
+    stores the result as a ``RequestProfile``.
+    """
+
+    def __enter__(self):
+        self.recorder = QueryRecorder()
+        self.profiler = cProfile.Profile()
+        self.stack = ExitStack()
+        self.stack.enter_context(observe_queries(self.recorder))
+        self.started = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.disable()
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        self.stack.close()
+
+    def save(self, request, response):
+        queries = self.recorder.queries
+        stats = io.StringIO()
+        pstats.Stats(self.profiler, stream=stats).sort_stats(
+            pstats.SortKey.CUMULATIVE
+        ).print_stats(PROFILE_STATS_LIMIT)
+        self.profiler.create_stats()
+
+        match = request.resolver_match
+        return RequestProfile.objects.create(
+            user=request.user if request.user.is_authenticated else None,
+            method=request.method,
+            path=request.get_full_path(),
+            view_name=match.view_name if match else '',
+            status_code=response.status_code,
+            duration_ms=self.duration_ms,
+            query_count=len(queries),
+            query_time_ms=sum(query['duration_ms'] for query in queries),
+            queries=describe_queries(queries),
+            stats=stats.getvalue(),
+            profile=marshal.dumps(self.profiler.stats),
+        )
+
+
+def profile_request(get_response, request):
+    """
+    Serve ``request`` under cProfile while recording its SQL, and store
+    the result as a ``RequestProfile``.
+    """
+    with RequestProfiler() as profiler:
+        response = get_response(request)
+    return response, profiler.save(request, response)
+
+
+async def aprofile_request(get_response, request):
+    """
+    Same as ``profile_request()`` with an async ``get_response``. Only the
+    event loop thread is profiled, so code the request runs in worker
+    threads is missing from the stats while its SQL is recorded, and
+    other requests served meanwhile show up in them.
+    """
+    with RequestProfiler() as profiler:
+        response = await get_response(request)
+    return response, await sync_to_async(profiler.save)(request, response)
@@ -0,0 +1,79 @@
+import math
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+
+PRIMARY_PINNED_UNTIL_KEY = '_primary_pinned_until'
+
+# Replica the reads of the current request are routed to, None for the
+# primary.
+replica_alias = ContextVar('replica_alias', default=None)
+
+
+def pin_to_primary(request):
+    """
+    Read from the primary for the session of ``request`` during the next
+    ``REPLICA_PIN_SECONDS``, so its own writes are visible while the
+    replicas catch up.
+    """
+    request.session[PRIMARY_PINNED_UNTIL_KEY] = math.ceil(
+        timezone.now().timestamp() + settings.REPLICA_PIN_SECONDS
+    )
+
+
+def is_pinned_to_primary(request):
+    pinned_until = request.session.get(PRIMARY_PINNED_UNTIL_KEY)
+    return (
+        pinned_until is not None
+        and timezone.now().timestamp() < pinned_until
+    )
+
+
+@contextmanager
+def read_from_replica(request=None):
+    """
+    Route the reads made in the block to one replica picked at random, or
+    to the primary when there are no replicas or the session of
+    ``request`` is pinned to it. Yields the alias reads are routed to.
+    """
+    alias = None
+    replicas = settings.DATABASE_REPLICAS
+    if replicas and not (request and is_pinned_to_primary(request)):
+        alias = random.choice(replicas)
+
+    token = replica_alias.set(alias)
+    try:
+        yield alias or DEFAULT_DB_ALIAS
+    finally:
+        replica_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads made inside ``read_from_replica()`` to its replica, and all
+    other reads and every write to the primary. Replicas copy the primary
+    and are never migrated themselves.
+    """
+
+    def db_for_read(self, model, **hints):
+        return replica_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica are saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.utils import timezone
+
+
+SESSION_REFRESHED_KEY = '_session_refreshed_at'
+
+
+def mark_refreshed(session):
+    session[SESSION_REFRESHED_KEY] = int(timezone.now().timestamp())
+
+
+def needs_refresh(session):
+    """
+    Whether ``SESSION_REFRESH_FRACTION`` of ``SESSION_COOKIE_AGE`` has
+    passed since ``session`` was last saved.
+    """
+    refreshed_at = session.get(SESSION_REFRESHED_KEY)
+    if refreshed_at is None:
+        return True
+    elapsed = timezone.now().timestamp() - refreshed_at
+    return elapsed >= settings.SESSION_COOKIE_AGE * settings.SESSION_REFRESH_FRACTION
@@ -0,0 +1,21 @@
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .db import connection_stats, run_query_observers
+
+
+@receiver(connection_created)
+def count_connection_opened(sender, connection, **kwargs):
+    connection_stats.connection_opened(connection.alias)
+
+
+@receiver(connection_created)
+def add_query_observers(sender, connection, **kwargs):
+    if run_query_observers not in connection.execute_wrappers:
+        connection.execute_wrappers.append(run_query_observers)
+
+
+@receiver(request_started)
+def count_connection_reused(sender, **kwargs):
+    connection_stats.request_started()
@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+
+COLD_START_SCRIPT = '''
+import io, json, sys, time
+
+started = time.perf_counter()
+from {module} import application
+imported = time.perf_counter()
+
+status = []
+body = application({{
+    'REQUEST_METHOD': 'GET',
+    'PATH_INFO': {path!r},
+    'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost',
+    'SERVER_PORT': '80',
+    'HTTP_HOST': 'localhost',
+    'wsgi.url_scheme': 'http',
+    'wsgi.input': io.BytesIO(),
+    'wsgi.errors': sys.stderr,
+}}, lambda response_status, headers, exc_info=None: status.append(response_status))
+b''.join(body)
+finished = time.perf_counter()
+
+print(json.dumps({{
+    'import': imported - started,
+    'first_request': finished - imported,
+    'status': int(status[0].split()[0]),
+    'modules': sorted(sys.modules),
+}}))
+'''
+
+
+def parse_importtime(output):
+    """
+    Return ``(module, self_us, cumulative_us)`` for every line of
+    ``python -X importtime`` output.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue
+        imports.append((module.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def measure_cold_start(module='banking_system.wsgi', path='/', env=None):
+    """
+    Import the WSGI ``module`` and serve ``path`` once in a fresh
+    interpreter.
+
+    Returns the seconds spent importing and serving the first request,
+    the response status, the loaded modules and the ``-X importtime``
+    profile.
+    """
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime', '-c',
+            COLD_START_SCRIPT.format(module=module, path=path),
+        ],
+        cwd=settings.BASE_DIR,
+        env={
+            **os.environ,
+            'PYTHONPATH': str(settings.BASE_DIR),
+            **(env or {}),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    stats = json.loads(result.stdout.splitlines()[-1])
+    stats['total'] = stats['import'] + stats['first_request']
+    stats['imports'] = parse_importtime(result.stderr)
+    return stats
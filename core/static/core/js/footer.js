@@ -0,0 +1,52 @@
+// Footer scroll effect
+window.addEventListener("scroll", function () {
+  const footer = document.getElementById("footer");
+  const scrollHeight = document.documentElement.scrollHeight;
+  const scrollTop = window.pageYOffset;
+  const clientHeight = window.innerHeight;
+
+  if (scrollTop + clientHeight > scrollHeight - 50) {
+    footer.classList.add("scrolled");
+  } else {
+    footer.classList.remove("scrolled");
+  }
+});
+
+// Remove loading animation after page load
+window.addEventListener("load", function () {
+  const footer = document.getElementById("footer");
+  setTimeout(() => {
+    footer.classList.remove("footer-loading");
+  }, 1500);
+});
+
+// Add interactive particle effect on hover
+document.getElementById("footer").addEventListener("mouseenter", function () {
+  const particles = this.querySelectorAll(".particle");
+  particles.forEach((particle, index) => {
+    particle.style.animationDuration = "3s";
+    particle.style.animationDelay = index * 0.2 + "s";
+  });
+});
+
+document.getElementById("footer").addEventListener("mouseleave", function () {
+  const particles = this.querySelectorAll(".particle");
+  particles.forEach((particle, index) => {
+    particle.style.animationDuration = "6s";
+    particle.style.animationDelay = index * 1 + "s";
+  });
+});
+
+// Smooth scroll to top when clicking footer
+document.getElementById("footer").addEventListener("click", function (e) {
+  if (
+    e.target === this ||
+    e.target.classList.contains("footer-content") ||
+    e.target.classList.contains("footer-container")
+  ) {
+    window.scrollTo({
+      top: 0,
+      behavior: "smooth",
+    });
+  }
+});
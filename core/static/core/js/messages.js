@@ -0,0 +1,58 @@
+// Auto-dismiss messages after 5 seconds
+document.addEventListener("DOMContentLoaded", function () {
+  const messages = document.querySelectorAll('[data-auto-dismiss="true"]');
+
+  messages.forEach((message, index) => {
+    setTimeout(() => {
+      if (message && message.parentNode) {
+        dismissMessage(message.id);
+      }
+    }, 5000 + index * 500); // Stagger dismissals by 500ms
+  });
+});
+
+// Manual dismiss function
+function dismissMessage(messageId) {
+  const message = document.getElementById(messageId);
+  if (message) {
+    message.style.animation =
+      "slideOutRight 0.4s cubic-bezier(0.4, 0, 0.2, 1) forwards";
+    setTimeout(() => {
+      if (message.parentNode) {
+        message.parentNode.removeChild(message);
+      }
+    }, 400);
+  }
+}
+
+// Add sound effect (optional)
+function playSuccessSound() {
+  // Create a subtle success sound using Web Audio API
+  const audioContext = new (window.AudioContext ||
+    window.webkitAudioContext)();
+  const oscillator = audioContext.createOscillator();
+  const gainNode = audioContext.createGain();
+
+  oscillator.connect(gainNode);
+  gainNode.connect(audioContext.destination);
+
+  oscillator.frequency.setValueAtTime(800, audioContext.currentTime);
+  oscillator.frequency.setValueAtTime(1000, audioContext.currentTime + 0.1);
+
+  gainNode.gain.setValueAtTime(0.1, audioContext.currentTime);
+  gainNode.gain.exponentialRampToValueAtTime(
+    0.01,
+    audioContext.currentTime + 0.3
+  );
+
+  oscillator.start(audioContext.currentTime);
+  oscillator.stop(audioContext.currentTime + 0.3);
+}
+
+// Play sound on message appearance (optional)
+document.addEventListener("DOMContentLoaded", function () {
+  const messages = document.querySelectorAll(".message-alert");
+  if (messages.length > 0) {
+    setTimeout(playSuccessSound, 100);
+  }
+});
@@ -0,0 +1,182 @@
+// Enhanced mobile menu toggle with smoother animations
+document
+  .getElementById("mobile-menu-toggle")
+  .addEventListener("click", function () {
+    const mobileMenu = document.getElementById("mobile-nav");
+    const toggleBtn = this;
+
+    if (mobileMenu.classList.contains("show")) {
+      // Close menu with staggered animation
+      const links = mobileMenu.querySelectorAll(".nav-link");
+      links.forEach((link, index) => {
+        setTimeout(() => {
+          link.style.animation = `slideOutToLeft 0.3s ease forwards`;
+        }, index * 50);
+      });
+
+      setTimeout(() => {
+        mobileMenu.classList.remove("show");
+        toggleBtn.classList.remove("active");
+        // Reset animations
+        links.forEach((link) => {
+          link.style.animation = "";
+        });
+      }, links.length * 50 + 200);
+    } else {
+      mobileMenu.classList.add("show");
+      toggleBtn.classList.add("active");
+    }
+  });
+
+// Enhanced navbar scroll effect with performance optimization
+let ticking = false;
+let lastScrollY = 0;
+
+function updateNavbar() {
+  const navbar = document.getElementById("navbar");
+  const currentScrollY = window.scrollY;
+
+  if (currentScrollY > 10) {
+    navbar.classList.add("scrolled");
+  } else {
+    navbar.classList.remove("scrolled");
+  }
+
+  // Add subtle parallax effect
+  const rate = currentScrollY * -0.3;
+  navbar.style.transform = `translateY(${Math.max(rate, -10)}px)`;
+
+  lastScrollY = currentScrollY;
+  ticking = false;
+}
+
+window.addEventListener("scroll", function () {
+  if (!ticking) {
+    requestAnimationFrame(updateNavbar);
+    ticking = true;
+  }
+});
+
+// Smooth scrolling for internal links with offset
+document.querySelectorAll('a[href^="#"]').forEach((anchor) => {
+  anchor.addEventListener("click", function (e) {
+    e.preventDefault();
+    const target = document.querySelector(this.getAttribute("href"));
+    if (target) {
+      const navbarHeight = document.getElementById("navbar").offsetHeight;
+      const targetPosition = target.offsetTop - navbarHeight - 20;
+
+      window.scrollTo({
+        top: targetPosition,
+        behavior: "smooth",
+      });
+    }
+  });
+});
+
+// Enhanced close mobile menu functionality
+document.addEventListener("click", function (event) {
+  const mobileMenu = document.getElementById("mobile-nav");
+  const toggleBtn = document.getElementById("mobile-menu-toggle");
+  const navbar = document.getElementById("navbar");
+
+  if (
+    !navbar.contains(event.target) &&
+    mobileMenu.classList.contains("show")
+  ) {
+    mobileMenu.classList.remove("show");
+    toggleBtn.classList.remove("active");
+  }
+});
+
+// Responsive menu handling with debounced resize
+let resizeTimer;
+window.addEventListener("resize", function () {
+  clearTimeout(resizeTimer);
+  resizeTimer = setTimeout(() => {
+    const mobileMenu = document.getElementById("mobile-nav");
+    const toggleBtn = document.getElementById("mobile-menu-toggle");
+
+    if (
+      window.innerWidth >= 1024 &&
+      mobileMenu.classList.contains("show")
+    ) {
+      mobileMenu.classList.remove("show");
+      toggleBtn.classList.remove("active");
+    }
+  }, 250);
+});
+
+// Enhanced loading animation with better timing
+window.addEventListener("load", function () {
+  const navbar = document.getElementById("navbar");
+  setTimeout(() => {
+    navbar.classList.remove("navbar-loading");
+  }, 2500);
+});
+
+// Add intersection observer for navbar visibility
+const observerOptions = {
+  root: null,
+  rootMargin: "0px",
+  threshold: 0.1,
+};
+
+const observer = new IntersectionObserver((entries) => {
+  entries.forEach((entry) => {
+    if (entry.isIntersecting) {
+      entry.target.style.opacity = "1";
+      entry.target.style.transform = "translateY(0)";
+    }
+  });
+}, observerOptions);
+
+// Observe navbar elements for smooth entry animations
+document.addEventListener("DOMContentLoaded", function () {
+  const navElements = document.querySelectorAll(".nav-link, .nav-button");
+  navElements.forEach((el) => {
+    el.style.opacity = "0";
+    el.style.transform = "translateY(20px)";
+    el.style.transition = "opacity 0.6s ease, transform 0.6s ease";
+    observer.observe(el);
+  });
+
+  // Stagger the navbar elements animation
+  setTimeout(() => {
+    navElements.forEach((el, index) => {
+      setTimeout(() => {
+        el.style.opacity = "1";
+        el.style.transform = "translateY(0)";
+      }, index * 100);
+    });
+  }, 500);
+});
+
+// Add keyboard navigation support
+document.addEventListener("keydown", function (e) {
+  if (e.key === "Escape") {
+    const mobileMenu = document.getElementById("mobile-nav");
+    const toggleBtn = document.getElementById("mobile-menu-toggle");
+
+    if (mobileMenu.classList.contains("show")) {
+      mobileMenu.classList.remove("show");
+      toggleBtn.classList.remove("active");
+    }
+  }
+});
+
+// Performance optimization: Preload hover states
+const style = document.createElement("style");
+style.textContent = `
+  @keyframes slideOutToLeft {
+    from {
+      opacity: 1;
+      transform: translateX(0);
+    }
+    to {
+      opacity: 0;
+      transform: translateX(-30px);
+    }
+  }
+`;
+document.head.appendChild(style);
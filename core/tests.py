@@ -1,3 +1,536 @@
-from django.test import TestCase
-
-# Create your tests here.
+import datetime
+import json
+import marshal
+import os
+import subprocess
+import sys
+import tempfile
+from importlib import import_module
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.backends.utils import CursorWrapper
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.checks import (
+    check_database_replicas,
+    check_db_connection_mode,
+    check_session_store,
+)
+from core.db import ConnectionStats, fast_bulk_insert
+from core.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    metrics,
+    request_db_queries,
+    requests_total,
+    task_duration,
+    task_rows,
+    track_task,
+)
+from core.middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    SessionRefreshMiddleware,
+    StaticFilesMiddleware,
+)
+from core.models import MetricValue, RequestProfile
+from core.sessions import SESSION_REFRESHED_KEY
+from core.startup import measure_cold_start
+
+
+class DatabaseConnectionModeCheckTests(SimpleTestCase):
+
+    @override_settings(DB_CONNECTION_MODE='persistent')
+    def test_valid_mode(self):
+        self.assertEqual(check_db_connection_mode(None), [])
+
+    @override_settings(DB_CONNECTION_MODE='pool')
+    def test_unknown_mode(self):
+        errors = check_db_connection_mode(None)
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+
+class DatabaseReplicasCheckTests(SimpleTestCase):
+
+    def test_replicas_must_be_configured(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(check_database_replicas(None), [])
+        with override_settings(DATABASE_REPLICAS=['default', 'replica_9']):
+            self.assertEqual(
+                [error.id for error in check_database_replicas(None)],
+                ['core.E005', 'core.E005']
+            )
+
+
+class ConnectionStatsTests(TestCase):
+
+    def test_counts_opened_and_reused_connections(self):
+        stats = ConnectionStats()
+        stats.connection_opened(DEFAULT_DB_ALIAS)
+        connection.ensure_connection()
+        stats.request_started()
+        stats.request_started()
+
+        default = stats.as_dict()[DEFAULT_DB_ALIAS]
+        self.assertEqual(default['connections_opened'], 1)
+        self.assertEqual(default['connections_reused'], 2)
+        self.assertEqual(default['checkouts'], 3)
+
+    def test_stats_view_is_staff_only(self):
+        user = get_user_model().objects.create_user(
+            email='staff@example.com', password='test-password'
+        )
+        self.client.force_login(user)
+        response = self.client.get(reverse('db_connection_stats'))
+        self.assertEqual(response.status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(reverse('db_connection_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('mode', response.json()[DEFAULT_DB_ALIAS])
+
+
+class FastBulkInsertTests(TestCase):
+
+    def insert(self):
+        fast_bulk_insert(
+            MetricValue, ['metric', 'labels', 'sample', 'value'],
+            [('hits', '[]', '', 1), ('hits', '["a"]', '', 2.5)],
+            batch_size=1
+        )
+        return list(MetricValue.objects.order_by('labels').values_list(
+            'labels', 'value'
+        ))
+
+    def test_insert(self):
+        self.assertEqual(self.insert(), [('["a"]', 2.5), ('[]', 1)])
+
+    def test_insert_without_copy_expert(self):
+        # As with psycopg 3, which has no copy_expert().
+        getattr_ = CursorWrapper.__getattr__
+
+        def getattr_without_copy_expert(cursor, attr):
+            if attr == 'copy_expert':
+                raise AttributeError(attr)
+            return getattr_(cursor, attr)
+
+        with mock.patch.object(
+            CursorWrapper, '__getattr__', getattr_without_copy_expert
+        ):
+            self.assertEqual(self.insert(), [('["a"]', 2.5), ('[]', 1)])
+
+
+class ColdStartTests(SimpleTestCase):
+    """
+    Import the WSGI application and serve the home page in a fresh
+    interpreter, configured as a Vercel deployment.
+    """
+    # Seconds for import plus first request, about 4x the current time.
+    budget = 1.0
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(static_root.cleanup)
+        cls.env = {'VERCEL_ENV': 'test', 'STATIC_ROOT': static_root.name}
+        # Templates link the hashed static files, as build_files.sh does.
+        subprocess.run(
+            [sys.executable, 'manage.py', 'collectstatic', '--noinput'],
+            cwd=settings.BASE_DIR, env={**os.environ, **cls.env},
+            capture_output=True, check=True
+        )
+
+    def test_cold_start_within_budget(self):
+        # Best of three runs to ride out noisy machines.
+        stats = min(
+            (measure_cold_start(env=self.env) for _ in range(3)),
+            key=lambda stats: stats['total']
+        )
+
+        self.assertEqual(stats['status'], 200)
+        self.assertLess(stats['total'], self.budget)
+        # Static files are collected at build time, tasks sent by workers.
+        for module in (
+            'django.contrib.staticfiles.management.commands.collectstatic',
+            'celery',
+        ):
+            self.assertFalse(
+                module in stats['modules'], f'{module} imported on startup'
+            )
+
+
+class MetricsRegistryTests(SimpleTestCase):
+
+    def test_render(self):
+        registry = MetricsRegistry()
+        counter = registry.register(Counter('hits_total', 'Hits.', ['path']))
+        histogram = registry.register(
+            Histogram('latency_seconds', 'Latency.', buckets=(0.1, 1))
+        )
+        counter.inc('/a"b', amount=2)
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value=value)
+
+        self.assertEqual(registry.render(), (
+            '# HELP hits_total Hits.\n'
+            '# TYPE hits_total counter\n'
+            'hits_total{path="/a\\"b"} 2\n'
+            '# HELP latency_seconds Latency.\n'
+            '# TYPE latency_seconds histogram\n'
+            'latency_seconds_bucket{le="0.1"} 1\n'
+            'latency_seconds_bucket{le="1.0"} 3\n'
+            'latency_seconds_bucket{le="+Inf"} 4\n'
+            'latency_seconds_sum 4.25\n'
+            'latency_seconds_count 4\n'
+        ))
+
+
+class TaskMetricsTests(TestCase):
+
+    def test_track_task(self):
+        metrics.reset()
+        with track_task('job') as task:
+            task.rows = 10
+        with self.assertRaises(ValueError), track_task('job'):
+            raise ValueError
+
+        self.assertIn(
+            ('task_rows_processed_total', {'task': 'job'}, 10),
+            list(task_rows.samples())
+        )
+        self.assertIn(
+            (
+                'task_duration_seconds_count',
+                {'task': 'job', 'state': 'failure'},
+                1
+            ),
+            list(task_duration.samples())
+        )
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Needs a test database other processes can connect to'
+)
+class SharedTaskMetricsTests(TransactionTestCase):
+
+    def test_metrics_recorded_by_other_processes_are_rendered(self):
+        # Run a task the way a Celery worker would, in its own process.
+        subprocess.run(
+            [
+                sys.executable, 'manage.py', 'shell', '-c',
+                'from core.metrics import track_task\n'
+                'with track_task("job") as task:\n'
+                '    task.rows = 3\n'
+            ],
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE,
+                'DB_NAME': connection.settings_dict['NAME'],
+            },
+            capture_output=True, check=True
+        )
+        user = get_user_model().objects.create_user(
+            email='staff@example.com', password='test-password', is_staff=True
+        )
+        self.client.force_login(user)
+        response = self.client.get(reverse('metrics'))
+
+        output = response.content.decode()
+        self.assertIn('task_rows_processed_total{task="job"} 3', output)
+        self.assertIn(
+            'task_duration_seconds_count{task="job",state="success"} 1', output
+        )
+
+
+class MetricsViewTests(TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        self.user = get_user_model().objects.create_user(
+            email='staff@example.com', password='test-password', is_staff=True
+        )
+
+    def test_requests_are_recorded_by_url_name(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('home'))
+        self.client.get(reverse('db_connection_stats'))
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        output = response.content.decode()
+        self.assertIn(
+            'http_requests_total{view="home",method="GET",status="200"} 1',
+            output
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{view="db_connection_stats",'
+            'method="GET"} 1', output
+        )
+        # Session and user lookups, the session was saved by the first
+        # request.
+        self.assertIn(
+            'http_request_db_queries_total{view="db_connection_stats"} 2',
+            output
+        )
+
+    async def test_async_requests_are_recorded(self):
+        async def get_response(request):
+            await sync_to_async(get_user_model().objects.count)()
+            return HttpResponse('ok')
+
+        middleware = MetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/'))
+
+        self.assertEqual(response.content, b'ok')
+        self.assertIn(
+            ('http_requests_total',
+             {'view': 'unresolved', 'method': 'GET', 'status': 200}, 1),
+            list(requests_total.samples())
+        )
+        # Counted in the thread the query ran in.
+        self.assertIn(
+            ('http_request_db_queries_total', {'view': 'unresolved'}, 1),
+            list(request_db_queries.samples())
+        )
+
+    def test_access(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+        with self.settings(METRICS_TOKEN='secret'):
+            response = self.client.get(
+                reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+            )
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(
+                reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong'
+            )
+            self.assertEqual(response.status_code, 403)
+
+
+@override_settings(WHITENOISE_AUTOREFRESH=True, WHITENOISE_USE_FINDERS=True)
+class StaticFilesMiddlewareTests(SimpleTestCase):
+
+    def test_async_requests(self):
+        async def get_response(request):
+            return HttpResponse('view')
+
+        middleware = StaticFilesMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = async_to_sync(middleware)(
+            RequestFactory().get('/static/core/css/navbar.css')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/css; charset="utf-8"')
+        response.close()
+
+        response = async_to_sync(middleware)(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'view')
+
+
+@override_settings(PROFILE_REQUESTS=True)
+class ProfilingMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='staff@example.com', password='test-password', is_staff=True,
+            is_superuser=True
+        )
+        self.client.force_login(self.user)
+
+    def test_requests_are_not_profiled_unless_asked(self):
+        with mock.patch('core.middleware.profile_request') as profile_request:
+            response = self.client.get(reverse('db_connection_stats'))
+
+        profile_request.assert_not_called()
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_only_true_values_request_a_profile(self):
+        for value in ('0', 'false', ''):
+            response = self.client.get(
+                reverse('db_connection_stats'), {'_profile': value}
+            )
+            self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get(
+            reverse('db_connection_stats'), HTTP_X_PROFILE='true'
+        )
+        self.assertIn('X-Profile-Id', response)
+
+    def test_profiling_can_be_turned_off(self):
+        with self.settings(PROFILE_REQUESTS=False):
+            response = self.client.get(
+                reverse('db_connection_stats'), {'_profile': '1'}
+            )
+
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_only_staff_can_profile(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(
+            reverse('db_connection_stats'), {'_profile': '1'}
+        )
+
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_async_requests_are_profiled(self):
+        async def get_response(request):
+            await sync_to_async(get_user_model().objects.count)()
+            return HttpResponse()
+
+        middleware = ProfilingMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = RequestFactory().get('/', {'_profile': '1'})
+        request.user = self.user
+        response = async_to_sync(middleware)(request)
+
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.query_count, 1)
+        self.assertIn('COUNT', profile.queries[0]['sql'])
+
+    @override_settings(PROFILE_SLOW_QUERY_MS=0)
+    def test_profile_is_stored_with_sql_and_plans(self):
+        response = self.client.get(
+            reverse('admin:accounts_user_changelist'), HTTP_X_PROFILE='1'
+        )
+
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.user, self.user)
+        self.assertEqual(profile.view_name, 'admin:accounts_user_changelist')
+        self.assertEqual(profile.status_code, 200)
+        self.assertEqual(profile.query_count, len(profile.queries))
+        self.assertIn('cumulative', profile.stats)
+        # Parameter values, like the session key, are not stored.
+        self.assertNotIn(
+            self.client.session.session_key, json.dumps(profile.queries)
+        )
+        self.assertTrue(all('params' not in query for query in profile.queries))
+        selects = [
+            query for query in profile.queries
+            if query['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(selects)
+        self.assertTrue(all(query['explain'] for query in selects))
+
+        response = self.client.get(
+            reverse('admin:core_requestprofile_changelist')
+        )
+        self.assertContains(response, 'Download .prof')
+
+        response = self.client.get(
+            reverse('admin:core_requestprofile_download', args=[profile.pk])
+        )
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertTrue(marshal.loads(response.content))
+
+
+@override_settings(SESSION_COOKIE_AGE=3600, SESSION_REFRESH_FRACTION=0.1)
+class SessionRefreshMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='customer@example.com', password='test-password'
+        )
+        self.now = timezone.now()
+
+    def get(self, seconds=0):
+        """Request the home page ``seconds`` after the first request."""
+        with mock.patch(
+            'django.utils.timezone.now',
+            return_value=self.now + datetime.timedelta(seconds=seconds)
+        ), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        session_writes = [
+            query for query in queries
+            if 'django_session' in query['sql']
+            and not query['sql'].startswith('SELECT')
+        ]
+        return response, len(session_writes)
+
+    def test_login_marks_session_refreshed(self):
+        self.client.post(reverse('accounts:user_login'), {
+            'username': 'customer@example.com', 'password': 'test-password'
+        })
+        self.assertIn(SESSION_REFRESHED_KEY, self.client.session)
+
+    def test_session_is_saved_once_per_refresh_interval(self):
+        self.client.force_login(self.user)
+
+        # Sessions saved before the refresh key existed are refreshed once.
+        response, writes = self.get()
+        self.assertEqual(writes, 1)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+        for seconds in (1, 200, 359):
+            response, writes = self.get(seconds)
+            self.assertEqual(writes, 0)
+            self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+        response, writes = self.get(360)
+        self.assertEqual(writes, 1)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    @override_settings(SESSION_REFRESH_FRACTION=0)
+    def test_zero_fraction_saves_every_request(self):
+        self.client.force_login(self.user)
+
+        for seconds in (0, 1, 2):
+            self.assertEqual(self.get(seconds)[1], 1)
+
+    def test_async_requests_refresh_sessions(self):
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        session = SessionStore()
+        session['key'] = 'value'
+        session.save()
+
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = SessionRefreshMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = RequestFactory().get('/')
+        request.session = SessionStore(session.session_key)
+        async_to_sync(middleware)(request)
+
+        self.assertTrue(request.session.modified)
+        self.assertIn(SESSION_REFRESHED_KEY, request.session)
+
+    def test_anonymous_requests_do_not_create_sessions(self):
+        response, writes = self.get()
+
+        self.assertEqual(writes, 0)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_check(self):
+        self.assertEqual(check_session_store(None), [])
+        with override_settings(SESSION_STORE='redis', SESSION_REFRESH_FRACTION=1):
+            self.assertEqual(
+                [error.id for error in check_session_store(None)],
+                ['core.E003', 'core.E004']
+            )
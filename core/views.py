@@ -1,5 +1,72 @@
-from django.views.generic import TemplateView
-
-
-class HomeView(TemplateView):
-    template_name = 'core/index.html'
+import hmac
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import HttpResponse, JsonResponse
+from django.template.response import SimpleTemplateResponse
+from django.views.generic import TemplateView, View
+
+from .db import connection_stats
+from .metrics import metrics
+from .routers import read_from_replica
+
+
+class ReplicaReadMixin:
+    """
+    Serve a read-only view from a replica, see ``read_from_replica()``.
+
+    Must come after the login mixin, so the session and the user are read
+    from the primary.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.replica_dispatch(request, *args, **kwargs)
+        with read_from_replica(request):
+            response = super().dispatch(request, *args, **kwargs)
+            # Querysets left lazy are read while rendering.
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+        return response
+
+    async def replica_dispatch(self, request, *args, **kwargs):
+        with read_from_replica(request):
+            response = await super().dispatch(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse):
+                await sync_to_async(response.render)()
+        return response
+
+
+class HomeView(TemplateView):
+    template_name = 'core/index.html'
+
+
+class DatabaseConnectionStatsView(UserPassesTestMixin, View):
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(connection_stats.as_dict())
+
+
+class MetricsView(UserPassesTestMixin, View):
+    """
+    Metrics in the Prometheus text format, for staff users or scrapers
+    sending ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+
+    def test_func(self):
+        token = settings.METRICS_TOKEN
+        authorization = self.request.headers.get('Authorization', '')
+        if token and hmac.compare_digest(authorization, f'Bearer {token}'):
+            return True
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            metrics.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -1,5 +1,36 @@
-from django.contrib import admin
-
-from transactions.models import Transaction
-
-admin.site.register(Transaction)
+from django.contrib import admin
+
+from core.admin import ScalableModelAdmin
+from transactions.models import InterestRun, InterestRunShard, Transaction
+
+
+@admin.register(Transaction)
+class TransactionAdmin(ScalableModelAdmin):
+    list_display = (
+        'id', 'timestamp', 'account', 'transaction_type', 'amount',
+        'balance_after_transaction'
+    )
+    list_select_related = ('account',)
+    list_filter = ('transaction_type',)
+    date_hierarchy = 'timestamp'
+    search_fields = ('=account__account_no',)
+    raw_id_fields = ('account',)
+
+
+class InterestRunShardInline(admin.TabularInline):
+    model = InterestRunShard
+    readonly_fields = (
+        'min_pk', 'max_pk', 'last_pk', 'accounts', 'completed_at'
+    )
+    extra = 0
+    can_delete = False
+
+
+@admin.register(InterestRun)
+class InterestRunAdmin(admin.ModelAdmin):
+    list_display = (
+        'period', 'shard_count', 'accounts', 'started_at', 'finished_at',
+        'duration'
+    )
+    readonly_fields = list_display
+    inlines = [InterestRunShardInline]
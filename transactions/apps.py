@@ -1,5 +1,12 @@
-from django.apps import AppConfig
-
-
-class TransactionsConfig(AppConfig):
-    name = 'transactions'
+from django.apps import AppConfig
+
+
+class TransactionsConfig(AppConfig):
+    name = 'transactions'
+
+    def ready(self):
+        from core.metrics import metrics
+
+        from .interest import collect_interest_run_metrics
+
+        metrics.add_collector(collect_interest_run_metrics)
@@ -0,0 +1,330 @@
+"""
+Cold storage for old transactions.
+
+Transactions of whole years before an account's
+``transactions_archived_before`` date live in one file per account and
+year instead of the transactions table. A file is a header, an index of
+the first record of every day of the year and fixed-width records sorted
+by ``(timestamp, id)``. Files are read through ``mmap``, a range is found
+with the day index and a binary search, and only the records in it are
+decoded.
+"""
+import bisect
+import datetime
+import mmap
+import os
+import struct
+import tempfile
+from decimal import Decimal
+from itertools import groupby
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import UserBankAccount
+
+from .models import Transaction
+
+
+MAGIC = b'TXAR'
+VERSION = 1
+# Magic, version, year, account id and number of records.
+HEADER = struct.Struct('<4sHHQI')
+DAYS = 366
+# Number of records before each day of the year, and in the whole file.
+INDEX = struct.Struct(f'<{DAYS + 1}I')
+# Timestamp in microseconds since the epoch, id, amount and balance in
+# cents, and transaction type.
+RECORD = struct.Struct('<qqqqB')
+# Leading fields of a record, its sort key.
+KEY = struct.Struct('<qq')
+RECORDS_OFFSET = HEADER.size + INDEX.size
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+ARCHIVE_FIELDS = (
+    'timestamp', 'id', 'amount', 'balance_after_transaction',
+    'transaction_type',
+)
+# Rows fetched at a time while an account's transactions are archived.
+ARCHIVE_CHUNK_SIZE = 2000
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def get_archive_dir(account_id):
+    # Spread accounts over a thousand directories.
+    return Path(settings.TRANSACTION_ARCHIVE_ROOT) / (
+        f'{account_id % 1000:03d}/{account_id}'
+    )
+
+
+def get_archive_path(account_id, year):
+    return get_archive_dir(account_id) / f'{year}.txa'
+
+
+def get_year_start(year):
+    return timezone.make_aware(datetime.datetime(year, 1, 1))
+
+
+def get_archive_horizon(account):
+    """
+    Local midnight before which the transactions of ``account`` are read
+    from the archive, ``None`` if none are archived.
+    """
+    if account.transactions_archived_before is None:
+        return None
+    return timezone.make_aware(datetime.datetime.combine(
+        account.transactions_archived_before, datetime.time.min
+    ))
+
+
+def encode_timestamp(timestamp):
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def encode_record(timestamp, pk, amount, balance, transaction_type):
+    return (
+        encode_timestamp(timestamp), pk, int(amount.scaleb(2)),
+        int(balance.scaleb(2)), transaction_type,
+    )
+
+
+def decode_record(record):
+    """``(timestamp, id, amount, balance, type)`` of a packed record."""
+    timestamp, pk, amount, balance, transaction_type = record
+    return (
+        EPOCH + timestamp * MICROSECOND, pk, Decimal(amount).scaleb(-2),
+        Decimal(balance).scaleb(-2), transaction_type,
+    )
+
+
+class ArchiveFile:
+    """
+    One account's archived transactions of one year, memory mapped.
+    Use as a context manager.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        with open(self.path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.year, self.account_id, self.count = (
+            HEADER.unpack_from(self.buffer)
+        )
+        if (magic, version) != (MAGIC, VERSION):
+            self.buffer.close()
+            raise ArchiveError(f'{self.path} is not a transaction archive.')
+        self.index = INDEX.unpack_from(self.buffer, HEADER.size)
+        self.year_start = get_year_start(self.year)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.buffer.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        """Sort key ``(timestamp, id)`` of the record at ``position``."""
+        return KEY.unpack_from(
+            self.buffer, RECORDS_OFFSET + position * RECORD.size
+        )
+
+    def get_day_bounds(self, timestamp):
+        """Positions of the first and last record of the day of ``timestamp``."""
+        day = (timezone.localdate(timestamp) - self.year_start.date()).days
+        day = min(max(day, 0), DAYS - 1)
+        return self.index[day], self.index[day + 1]
+
+    def find(self, key, right=False):
+        """
+        Position of the first record from ``key`` on, or after ``key`` if
+        ``right``. ``key`` is ``(timestamp,)`` or ``(timestamp, id)``.
+        """
+        if key[0] < self.year_start:
+            return 0
+        lo, hi = self.get_day_bounds(key[0])
+        key = (encode_timestamp(key[0]), *key[1:])
+        search = bisect.bisect_right if right else bisect.bisect_left
+        return search(self, key, lo, hi)
+
+    def read(self, start, stop, reverse=False):
+        positions = range(start, stop)
+        for position in reversed(positions) if reverse else positions:
+            yield decode_record(RECORD.unpack_from(
+                self.buffer, RECORDS_OFFSET + position * RECORD.size
+            ))
+
+
+def read_year(account_id, year):
+    """All records of the archive file of ``year``, ``[]`` if there is none."""
+    try:
+        with ArchiveFile(get_archive_path(account_id, year)) as archive:
+            return list(archive.read(0, len(archive)))
+    except FileNotFoundError:
+        return []
+
+
+def write_year(account_id, year, records):
+    """
+    Write the records of ``year`` merged with the ones already in its file.
+    The file is replaced in one rename, readers see the old or new one.
+    """
+    merged = {record[1]: record for record in read_year(account_id, year)}
+    merged.update((record[1], record) for record in records)
+    records = sorted(merged.values())
+
+    year_start = get_year_start(year).date()
+    days = [(timezone.localdate(record[0]) - year_start).days for record in records]
+    index = [bisect.bisect_left(days, day) for day in range(DAYS)]
+
+    buffer = bytearray(RECORDS_OFFSET + len(records) * RECORD.size)
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, year, account_id, len(records))
+    INDEX.pack_into(buffer, HEADER.size, *index, len(records))
+    for position, record in enumerate(records):
+        RECORD.pack_into(
+            buffer, RECORDS_OFFSET + position * RECORD.size,
+            *encode_record(*record)
+        )
+
+    path = get_archive_path(account_id, year)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        try:
+            file.write(buffer)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+class ArchivedTransactions:
+    """
+    Archived transactions of ``account`` with ``start <= timestamp < end``,
+    in ``(timestamp, id)`` order.
+    """
+
+    def __init__(self, account, start=None, end=None):
+        self.account = account
+        self.horizon = get_archive_horizon(account)
+        self.start = start
+        self.end = min(end, self.horizon) if end else self.horizon
+
+    def get_years(self):
+        years = []
+        try:
+            years = sorted(
+                int(name.removesuffix('.txa'))
+                for name in os.listdir(get_archive_dir(self.account.pk))
+                if name.endswith('.txa')
+            )
+        except FileNotFoundError:
+            pass
+        return [
+            year for year in years
+            if (self.start is None or self.start < get_year_start(year + 1))
+            and get_year_start(year) < self.end
+        ]
+
+    def read(self, after=None, before=None, reverse=False):
+        """
+        Yield ``(timestamp, id, amount, balance, type)`` tuples, only the
+        ones after or before the ``(timestamp, id)`` keys given.
+        """
+        years = self.get_years()
+        for year in reversed(years) if reverse else years:
+            with ArchiveFile(get_archive_path(self.account.pk, year)) as archive:
+                start = archive.find((self.start,)) if self.start else 0
+                if after:
+                    start = max(start, archive.find(after, right=True))
+                stop = archive.find((self.end,))
+                if before:
+                    stop = min(stop, archive.find(before))
+                yield from archive.read(start, stop, reverse)
+
+    def transactions(self, after=None, before=None, reverse=False):
+        """Same as ``read()``, as unsaved ``Transaction`` instances."""
+        for timestamp, pk, amount, balance, transaction_type in self.read(
+            after, before, reverse
+        ):
+            yield Transaction(
+                id=pk,
+                account=self.account,
+                amount=amount,
+                balance_after_transaction=balance,
+                transaction_type=transaction_type,
+                timestamp=timestamp,
+            )
+
+    def export_rows(self):
+        """Rows in the shape of ``exports.EXPORT_FIELDS``."""
+        for timestamp, pk, amount, balance, transaction_type in self.read():
+            yield timestamp, transaction_type, amount, balance
+
+
+def get_archived_transactions(account, start=None, end=None):
+    """
+    ``ArchivedTransactions`` for the range, ``None`` if the range has no
+    archived part.
+    """
+    horizon = get_archive_horizon(account)
+    if horizon is None or (start and start >= horizon):
+        return None
+    return ArchivedTransactions(account, start, end)
+
+
+def archive_account(account_id, before):
+    """
+    Move the transactions of the account before the year of the date
+    ``before`` into archive files. Returns the number of transactions
+    moved.
+
+    Readers take transactions before ``transactions_archived_before`` from
+    the files and the rest from the table, so nothing is read twice if
+    the DB transaction fails after the files are written, and running
+    again merges the same records into them.
+    """
+    before = datetime.date(before.year, 1, 1)
+    if before > timezone.localdate():
+        # Postings from now on have to land after the archive horizon.
+        raise ArchiveError('Only past years can be archived.')
+
+    with transaction.atomic():
+        # Keeps two archive runs off the same account.
+        account = UserBankAccount.objects.select_for_update().get(
+            pk=account_id
+        )
+        archived_before = account.transactions_archived_before
+        if archived_before and archived_before >= before:
+            return 0
+
+        transactions = Transaction.objects.filter(
+            account_id=account_id, timestamp__lt=get_year_start(before.year)
+        )
+        # Streamed, only the year being written is held in memory.
+        rows = transactions.order_by('timestamp', 'id').values_list(
+            *ARCHIVE_FIELDS
+        ).iterator(chunk_size=ARCHIVE_CHUNK_SIZE)
+        moved = 0
+        for year, records in groupby(
+            rows, key=lambda row: timezone.localdate(row[0]).year
+        ):
+            records = list(records)
+            write_year(account_id, year, records)
+            moved += len(records)
+
+        transactions.delete()
+        account.transactions_archived_before = before
+        account.save(update_fields=['transactions_archived_before'])
+
+    return moved
@@ -0,0 +1,124 @@
+from asgiref.sync import sync_to_async
+
+from django.contrib import messages
+from django.contrib.auth import get_user
+from django.http import Http404, HttpResponseRedirect
+
+from accounts.account_types import account_types
+from core.routers import pin_to_primary
+from transactions import views
+from transactions.forms import TransactionDateRangeForm
+from transactions.managers import InsufficientBalance
+from transactions.pagination import InvalidCursor, KeysetPaginator
+from transactions.summaries import aget_range_summary
+
+
+class AsyncLoginRequiredMixin:
+    """
+    Load ``request.user`` once in a worker thread before the async handler
+    runs, since the session and authentication backends are sync only.
+    Everything the views and templates read from the user is loaded by
+    ``AccountModelBackend`` in that one query.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await sync_to_async(get_user)(request)
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class TransactionRepostView(AsyncLoginRequiredMixin, views.TransactionRepostView):
+
+    async def get(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(
+            await self.get_latest_transaction().afirst()
+        )
+        if response is not None:
+            return self.add_validators(response)
+
+        account = request.user.account
+        paginator = KeysetPaginator(
+            self.get_queryset(), self.paginate_by, archive=self.get_archive()
+        )
+        try:
+            page = await paginator.apage(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+
+        self.object_list = page.object_list
+        return self.add_validators(self.render_to_response({
+            'view': self,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list,
+            'account': account,
+            'form': TransactionDateRangeForm(request.GET or None),
+            'totals': await aget_range_summary(
+                account, *self.get_summary_dates()
+            ),
+        }))
+
+
+class AsyncTransactionCreateMixin(AsyncLoginRequiredMixin):
+    """
+    Async ``CreateView`` handlers.
+
+    Posting still runs in a worker thread, as ``transaction.atomic()`` has
+    no async counterpart.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object = None
+        return self.render_to_response(self.get_context_data())
+
+    async def post(self, request, *args, **kwargs):
+        self.object = None
+        # Form validation reads the account type limits.
+        await account_types.aas_dict()
+        form = self.get_form()
+        if form.is_valid():
+            return await self.form_valid(form)
+        return self.form_invalid(form)
+
+    async def put(self, *args, **kwargs):
+        return await self.post(*args, **kwargs)
+
+
+class DepositMoneyView(AsyncTransactionCreateMixin, views.DepositMoneyView):
+
+    async def form_valid(self, form):
+        amount = form.cleaned_data.get('amount')
+        self.object = await sync_to_async(form.save)()
+        pin_to_primary(self.request)
+
+        messages.success(
+            self.request,
+            f'KES {amount} was deposited to your account successfully'
+        )
+
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class WithdrawMoneyView(AsyncTransactionCreateMixin, views.WithdrawMoneyView):
+
+    async def form_valid(self, form):
+        amount = form.cleaned_data.get('amount')
+
+        try:
+            self.object = await sync_to_async(form.save)()
+        except InsufficientBalance:
+            form.add_error(
+                'amount',
+                'You can not withdraw more than your account balance'
+            )
+            return self.form_invalid(form)
+        pin_to_primary(self.request)
+
+        messages.success(
+            self.request,
+            f'Successfully withdrawn KES {amount} from your account'
+        )
+
+        return HttpResponseRedirect(self.get_success_url())
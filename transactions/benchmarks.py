@@ -0,0 +1,332 @@
+import datetime
+import platform
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.db import OperationalError, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import UserBankAccount
+from banking_system.celery import app as celery_app
+
+from .constants import DEPOSIT, WITHDRAWAL
+from .models import InterestRun, Transaction
+from .seeding import BankSeeder
+from .tasks import calculate_interest
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def summarise(timings, operations=1):
+    """
+    Milliseconds per run and operations per second for ``timings`` in
+    seconds, ``operations`` done per run.
+    """
+    timings = sorted(timings)
+    return {
+        'runs': len(timings),
+        'min_ms': timings[0] * 1000,
+        'median_ms': statistics.median(timings) * 1000,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p95_ms': timings[max(0, round(len(timings) * 0.95) - 1)] * 1000,
+        'max_ms': timings[-1] * 1000,
+        'ops_per_second': operations * len(timings) / sum(timings),
+    }
+
+
+def measure(func, repeat, warmup=1, setup=None, operations=1):
+    """
+    Time ``repeat`` calls of ``func`` after ``warmup`` untimed ones.
+    ``setup`` runs untimed before every call.
+    """
+    timings = []
+    for i in range(warmup + repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed)
+    return summarise(timings, operations)
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results):
+    """
+    Return ``(name, baseline_ms, median_ms, change)`` for every benchmark
+    in both result sets, ``change`` being the relative change of the median.
+    """
+    rows = []
+    for name, stats in results['benchmarks'].items():
+        baseline_stats = baseline['benchmarks'].get(name)
+        if baseline_stats is None:
+            continue
+        rows.append((
+            name,
+            baseline_stats['median_ms'],
+            stats['median_ms'],
+            stats['median_ms'] / baseline_stats['median_ms'] - 1
+        ))
+    return rows
+
+
+class BenchmarkSuite:
+    """
+    Time the transaction report at several history sizes, deposits,
+    withdrawals, concurrent withdrawals from one account, registration, the
+    statement export and the interest run against seeded data.
+
+    ``customers`` background customers averaging ``transactions``
+    transactions are seeded first so the tables are not trivially small,
+    then one customer per entry of ``history_sizes``. Everything is seeded
+    from ``seed``, so runs on different commits see the same data.
+    """
+
+    def __init__(self, history_sizes=(100, 1000, 10000), customers=1000,
+                 transactions=100, repeat=20, seed=0, log=None):
+        self.history_sizes = sorted(history_sizes)
+        self.customers = customers
+        self.transactions = transactions
+        self.repeat = repeat
+        self.seed = seed
+        self.log = log or (lambda message: None)
+
+    @property
+    def parameters(self):
+        return {
+            'history_sizes': self.history_sizes,
+            'customers': self.customers,
+            'transactions': self.transactions,
+            'repeat': self.repeat,
+            'seed': self.seed,
+        }
+
+    def setup(self):
+        seeder = BankSeeder(seed=self.seed)
+        started = time.perf_counter()
+        seeder.seed(self.customers, self.transactions)
+        users, _ = seeder.create_customers(self.history_sizes)
+        self.users = dict(zip(self.history_sizes, users))
+        self.log(
+            f'Seeded {self.customers} customers and '
+            f'{len(self.history_sizes)} benchmark accounts in '
+            f'{time.perf_counter() - started:.2f}s'
+        )
+
+    def get_client(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def check_status(self, response, path, status_code):
+        if response.status_code != status_code:
+            raise BenchmarkError(
+                f'{path} returned {response.status_code}, '
+                f'expected {status_code}'
+            )
+
+    def get(self, client, path, data=None):
+        response = client.get(path, data)
+        if response.streaming:
+            # Streaming responses are only produced while they are consumed.
+            b''.join(response.streaming_content)
+        self.check_status(response, path, 200)
+        return response
+
+    def post(self, client, path, data):
+        response = client.post(path, data)
+        # Successful form posts redirect.
+        self.check_status(response, path, 302)
+        return response
+
+    def bench_report(self):
+        path = reverse('transactions:transaction_report')
+        today = timezone.localdate()
+        daterange = (
+            f'{today - datetime.timedelta(days=30):%Y-%m-%d} - {today:%Y-%m-%d}'
+        )
+        for size, user in self.users.items():
+            client = self.get_client(user)
+            yield f'report_{size}', measure(
+                lambda: self.get(client, path), self.repeat
+            )
+            yield f'report_{size}_last_30_days', measure(
+                lambda: self.get(client, path, {'daterange': daterange}),
+                self.repeat
+            )
+
+    def bench_postings(self):
+        client = self.get_client(self.users[self.history_sizes[0]])
+        for name, url_name, transaction_type in (
+            ('deposit', 'transactions:deposit_money', DEPOSIT),
+            ('withdraw', 'transactions:withdraw_money', WITHDRAWAL),
+        ):
+            path = reverse(url_name)
+            data = {
+                'amount': settings.MINIMUM_DEPOSIT_AMOUNT,
+                'transaction_type': transaction_type,
+            }
+            yield name, measure(
+                lambda: self.post(client, path, data), self.repeat
+            )
+
+    def bench_concurrent_withdrawals(self, workers=8):
+        """
+        Withdraw from one account from ``workers`` threads, each on its own
+        connection, and check no balance update was lost.
+        """
+        account = self.users[self.history_sizes[0]].account
+        amount = Decimal(settings.MINIMUM_DEPOSIT_AMOUNT)
+        withdrawals = workers * 10
+
+        def fund():
+            UserBankAccount.objects.filter(pk=account.pk).update(
+                balance=amount * withdrawals
+            )
+
+        def withdraw(_):
+            try:
+                while True:
+                    try:
+                        Transaction.objects.post(account, amount, WITHDRAWAL)
+                        return
+                    except OperationalError:
+                        # SQLite reports lock contention instead of waiting.
+                        time.sleep(0.001)
+            finally:
+                connections.close_all()
+
+        def withdraw_all():
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(withdraw, range(withdrawals)))
+
+            balance = UserBankAccount.objects.values_list(
+                'balance', flat=True
+            ).get(pk=account.pk)
+            if balance != 0:
+                raise BenchmarkError(
+                    f'{withdrawals} concurrent withdrawals left a balance of '
+                    f'{balance}, expected 0'
+                )
+
+        yield f'concurrent_withdrawals_{workers}_threads', measure(
+            withdraw_all,
+            max(1, self.repeat // 4),
+            setup=fund,
+            operations=withdrawals
+        )
+
+    def bench_registration(self):
+        path = reverse('accounts:user_registration')
+        account_type = UserBankAccount.objects.values_list(
+            'account_type_id', flat=True
+        ).first()
+        emails = (f'benchmark{i}@example.com' for i in range(self.repeat + 1))
+
+        def register():
+            self.post(Client(), path, {
+                'first_name': 'Bench',
+                'last_name': 'Mark',
+                'email': next(emails),
+                'account_type': account_type,
+                'gender': 'F',
+                'birth_date': '1990-01-01',
+                'password1': 'a-Strong-passw0rd',
+                'password2': 'a-Strong-passw0rd',
+                'street_address': '1 Kenyatta Avenue',
+                'city': 'Nairobi',
+                'postal_code': '100',
+                'country': 'Kenya',
+            })
+
+        yield 'registration', measure(register, self.repeat)
+
+    def bench_export(self):
+        size = self.history_sizes[-1]
+        client = self.get_client(self.users[size])
+        rows = self.users[size].account.transactions.count()
+        path = reverse('transactions:transaction_export')
+        for export_format in ('csv', 'ndjson'):
+            yield f'export_{export_format}_{size}', measure(
+                lambda: self.get(client, path, {'format': export_format}),
+                max(1, self.repeat // 4),
+                operations=rows
+            )
+
+    def bench_interest(self):
+        today = timezone.localdate()
+        accounts = UserBankAccount.objects.filter(
+            initial_deposit_date__isnull=False
+        )
+        due = accounts.count()
+
+        def reset():
+            InterestRun.objects.all().delete()
+            accounts.update(next_interest_date=today)
+
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        try:
+            yield 'calculate_interest', measure(
+                lambda: calculate_interest.delay().get(),
+                max(1, self.repeat // 4),
+                setup=reset,
+                operations=due
+            )
+        finally:
+            celery_app.conf.task_always_eager = eager
+
+    def run(self):
+        """
+        Seed the current database, run every benchmark and return the
+        results.
+        """
+        self.setup()
+        benchmarks = {}
+        # The test client sends requests for the "testserver" host.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+        ):
+            for bench in (
+                self.bench_report,
+                self.bench_postings,
+                self.bench_concurrent_withdrawals,
+                self.bench_registration,
+                self.bench_export,
+                self.bench_interest,
+            ):
+                for name, stats in bench():
+                    benchmarks[name] = stats
+                    self.log(
+                        f'{name}: median {stats["median_ms"]:.2f}ms, '
+                        f'{stats["ops_per_second"]:.1f} ops/sec'
+                    )
+
+        return {
+            'commit': get_commit(),
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'parameters': self.parameters,
+            'benchmarks': benchmarks,
+        }
@@ -1,9 +1,16 @@
-DEPOSIT = 1
-WITHDRAWAL = 2
-INTEREST = 3
-
-TRANSACTION_TYPE_CHOICES = (
-    (DEPOSIT, 'Deposit'),
-    (WITHDRAWAL, 'Withdrawal'),
-    (INTEREST, 'Interest'),
-)
+from decimal import Decimal
+
+
+DEPOSIT = 1
+WITHDRAWAL = 2
+INTEREST = 3
+
+# Largest value the ``max_digits=12, decimal_places=2`` amount and balance
+# columns can hold.
+MAXIMUM_AMOUNT = Decimal('9999999999.99')
+
+TRANSACTION_TYPE_CHOICES = (
+    (DEPOSIT, 'Deposit'),
+    (WITHDRAWAL, 'Withdrawal'),
+    (INTEREST, 'Interest'),
+)
@@ -0,0 +1,53 @@
+import csv
+import json
+
+from django.utils import timezone
+
+from .constants import TRANSACTION_TYPE_CHOICES
+
+
+EXPORT_FIELDS = (
+    'timestamp',
+    'transaction_type',
+    'amount',
+    'balance_after_transaction',
+)
+
+TRANSACTION_TYPE_LABELS = dict(TRANSACTION_TYPE_CHOICES)
+
+
+class Echo:
+    """
+    File-like object that returns what is written instead of buffering it,
+    so ``csv.writer`` output can be streamed one row at a time.
+    """
+    def write(self, value):
+        return value
+
+
+def format_row(row):
+    timestamp, transaction_type, amount, balance_after_transaction = row
+    return (
+        timezone.localtime(timestamp).isoformat(),
+        TRANSACTION_TYPE_LABELS.get(transaction_type, transaction_type),
+        str(amount),
+        str(balance_after_transaction),
+    )
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(format_row(row))
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, format_row(row)))) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', stream_csv),
+    'ndjson': ('application/x-ndjson', stream_ndjson),
+}
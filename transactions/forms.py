@@ -1,93 +1,144 @@
-import datetime
-
-from django import forms
-from django.conf import settings
-
-from .models import Transaction
-
-
-class TransactionForm(forms.ModelForm):
-
-    class Meta:
-        model = Transaction
-        fields = [
-            'amount',
-            'transaction_type'
-        ]
-
-    def __init__(self, *args, **kwargs):
-        self.account = kwargs.pop('account')
-        super().__init__(*args, **kwargs)
-
-        self.fields['transaction_type'].disabled = True
-        self.fields['transaction_type'].widget = forms.HiddenInput()
-
-    def save(self, commit=True):
-        self.instance.account = self.account
-        self.instance.balance_after_transaction = self.account.balance
-        return super().save()
-
-
-class DepositForm(TransactionForm):
-
-    def clean_amount(self):
-        min_deposit_amount = settings.MINIMUM_DEPOSIT_AMOUNT
-        amount = self.cleaned_data.get('amount')
-
-        if amount < min_deposit_amount:
-            raise forms.ValidationError(
-                f'You need to deposit at least KES {min_deposit_amount}'
-            )
-
-        return amount
-
-
-class WithdrawForm(TransactionForm):
-
-    def clean_amount(self):
-        account = self.account
-        min_withdraw_amount = settings.MINIMUM_WITHDRAWAL_AMOUNT
-        max_withdraw_amount = (
-            account.account_type.maximum_withdrawal_amount
-        )
-        balance = account.balance
-
-        amount = self.cleaned_data.get('amount')
-
-        if amount < min_withdraw_amount:
-            raise forms.ValidationError(
-                f'You can withdraw at least KES {min_withdraw_amount}'
-            )
-
-        if amount > max_withdraw_amount:
-            raise forms.ValidationError(
-                f'You can withdraw at most KES {max_withdraw_amount}'
-            )
-
-        if amount > balance:
-            raise forms.ValidationError(
-                f'You have KES {balance} in your account. '
-                'You can not withdraw more than your account balance'
-            )
-
-        return amount
-
-
-class TransactionDateRangeForm(forms.Form):
-    daterange = forms.CharField(required=False)
-
-    def clean_daterange(self):
-        daterange = self.cleaned_data.get("daterange")
-        print(daterange)
-
-        try:
-            daterange = daterange.split(' - ')
-            print(daterange)
-            if len(daterange) == 2:
-                for date in daterange:
-                    datetime.datetime.strptime(date, '%Y-%m-%d')
-                return daterange
-            else:
-                raise forms.ValidationError("Please select a date range.")
-        except (ValueError, AttributeError):
-            raise forms.ValidationError("Invalid date range")
+import datetime
+
+from django import forms
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.account_types import account_types
+from accounts.models import UserBankAccount
+
+from .models import Transaction
+
+
+class TransactionForm(forms.ModelForm):
+
+    class Meta:
+        model = Transaction
+        fields = [
+            'amount',
+            'transaction_type'
+        ]
+
+    def __init__(self, *args, **kwargs):
+        self.account = kwargs.pop('account')
+        super().__init__(*args, **kwargs)
+
+        self.fields['transaction_type'].disabled = True
+        self.fields['transaction_type'].widget = forms.HiddenInput()
+
+    def save(self, commit=True):
+        self.instance = Transaction.objects.post(
+            account=self.account,
+            amount=self.cleaned_data['amount'],
+            transaction_type=self.cleaned_data['transaction_type']
+        )
+        return self.instance
+
+
+class DepositForm(TransactionForm):
+
+    def clean_amount(self):
+        min_deposit_amount = settings.MINIMUM_DEPOSIT_AMOUNT
+        amount = self.cleaned_data.get('amount')
+
+        if amount < min_deposit_amount:
+            raise forms.ValidationError(
+                f'You need to deposit at least KES {min_deposit_amount}'
+            )
+
+        return amount
+
+    def save(self, commit=True):
+        account = self.account
+
+        with transaction.atomic():
+            instance = super().save(commit)
+
+            if not account.initial_deposit_date:
+                account.start_interest_schedule(timezone.localdate())
+                # Only the first deposit may set these dates.
+                UserBankAccount.objects.filter(
+                    pk=account.pk,
+                    initial_deposit_date__isnull=True
+                ).update(
+                    initial_deposit_date=account.initial_deposit_date,
+                    interest_start_date=account.interest_start_date,
+                    next_interest_date=account.next_interest_date
+                )
+
+        return instance
+
+
+class WithdrawForm(TransactionForm):
+
+    def clean_amount(self):
+        account = self.account
+        min_withdraw_amount = settings.MINIMUM_WITHDRAWAL_AMOUNT
+        max_withdraw_amount = account_types.get(
+            account.account_type_id
+        ).maximum_withdrawal_amount
+        balance = account.balance
+
+        amount = self.cleaned_data.get('amount')
+
+        if amount < min_withdraw_amount:
+            raise forms.ValidationError(
+                f'You can withdraw at least KES {min_withdraw_amount}'
+            )
+
+        if amount > max_withdraw_amount:
+            raise forms.ValidationError(
+                f'You can withdraw at most KES {max_withdraw_amount}'
+            )
+
+        # Early feedback only, the balance is re-checked atomically when
+        # the withdrawal is posted.
+        if amount > balance:
+            raise forms.ValidationError(
+                f'You have KES {balance} in your account. '
+                'You can not withdraw more than your account balance'
+            )
+
+        return amount
+
+
+class TransactionDateRangeForm(forms.Form):
+    daterange = forms.CharField(required=False)
+
+    def clean_daterange(self):
+        """
+        Convert ``YYYY-MM-DD - YYYY-MM-DD`` into timezone aware
+        half-open ``[start, end)`` datetime bounds.
+
+        Filtering on raw datetime bounds instead of ``timestamp__date``
+        lets the database use a range scan on the timestamp index.
+        """
+        daterange = self.cleaned_data.get("daterange")
+
+        try:
+            daterange = daterange.split(' - ')
+            if len(daterange) == 2:
+                start_date, end_date = (
+                    datetime.datetime.strptime(date, '%Y-%m-%d').date()
+                    for date in daterange
+                )
+            else:
+                raise forms.ValidationError("Please select a date range.")
+        except (ValueError, AttributeError):
+            raise forms.ValidationError("Invalid date range")
+
+        if start_date > end_date:
+            raise forms.ValidationError("Invalid date range")
+
+        return (
+            timezone.make_aware(
+                datetime.datetime.combine(start_date, datetime.time.min)
+            ),
+            timezone.make_aware(
+                datetime.datetime.combine(
+                    end_date + datetime.timedelta(days=1),
+                    datetime.time.min
+                )
+            ),
+        )
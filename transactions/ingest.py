@@ -0,0 +1,139 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import UserBankAccount
+from core.db import fast_bulk_update
+
+from .constants import DEPOSIT, MAXIMUM_AMOUNT
+from .models import Transaction
+from .summaries import record_daily_summaries
+
+
+INGEST_FIELDS = ('account_no', 'amount')
+REJECT_FIELDS = ('line', 'account_no', 'amount', 'reason')
+
+
+def read_csv(file):
+    for line, row in enumerate(csv.DictReader(file), start=2):
+        yield line, row
+
+
+def read_ndjson(file):
+    for line, text in enumerate(file, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else {}
+
+
+INGEST_READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+def parse_row(row):
+    """
+    Return ``(account_no, amount)`` for a credit row or raise ``ValueError``
+    with the reason it is rejected.
+    """
+    try:
+        account_no = int(row.get('account_no'))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid account number')
+
+    try:
+        amount = Decimal(str(row.get('amount')).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError('Invalid amount')
+
+    if not amount.is_finite() or amount.as_tuple().exponent < -2:
+        raise ValueError('Invalid amount')
+
+    if amount < settings.MINIMUM_DEPOSIT_AMOUNT:
+        raise ValueError(
+            f'Amount is below the minimum deposit of '
+            f'{settings.MINIMUM_DEPOSIT_AMOUNT}'
+        )
+
+    if amount > MAXIMUM_AMOUNT:
+        raise ValueError(f'Amount is above the maximum of {MAXIMUM_AMOUNT}')
+
+    return account_no, amount
+
+
+def ingest_chunk(rows, reject):
+    """
+    Validate and post a chunk of ``(line, row)`` credits.
+
+    Account existence is checked by the same query that locks the
+    accounts, then all balances are written with one UPDATE and all
+    transactions with one INSERT in a single DB transaction. Rejected rows
+    are passed to ``reject(line, row, reason)``. Returns the number of
+    posted transactions.
+    """
+    credits = []
+    for line, row in rows:
+        try:
+            credits.append((line, row) + parse_row(row))
+        except ValueError as e:
+            reject(line, row, str(e))
+
+    if not credits:
+        return 0
+
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        accounts = {
+            account.account_no: account
+            for account in UserBankAccount.objects.filter(
+                account_no__in={account_no for _, _, account_no, _ in credits}
+            ).select_for_update().only(
+                'account_no', 'account_type_id', 'balance',
+                'initial_deposit_date', 'interest_start_date',
+                'next_interest_date'
+            )
+        }
+
+        transactions = []
+        for line, row, account_no, amount in credits:
+            account = accounts.get(account_no)
+            if account is None:
+                reject(line, row, 'Unknown account')
+                continue
+
+            if account.balance + amount > MAXIMUM_AMOUNT:
+                reject(line, row, 'Balance would exceed the maximum')
+                continue
+
+            if not account.initial_deposit_date:
+                account.start_interest_schedule(today)
+            account.balance += amount
+            transactions.append(Transaction(
+                account=account,
+                amount=amount,
+                balance_after_transaction=account.balance,
+                transaction_type=DEPOSIT
+            ))
+
+        if transactions:
+            fast_bulk_update(
+                {obj.account for obj in transactions},
+                [
+                    'balance', 'initial_deposit_date', 'interest_start_date',
+                    'next_interest_date'
+                ]
+            )
+            Transaction.objects.bulk_create(transactions)
+            record_daily_summaries(transactions)
+
+    return len(transactions)
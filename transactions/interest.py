@@ -0,0 +1,235 @@
+import logging
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from accounts.account_types import account_types as account_type_registry
+from accounts.models import UserBankAccount
+from core.db import fast_bulk_update
+
+from .constants import INTEREST
+from .models import InterestRun, InterestRunShard, Transaction
+from .summaries import record_daily_summaries
+
+
+logger = logging.getLogger(__name__)
+
+INTEREST_CHUNK_SIZE = 1000
+
+
+def get_due_accounts(today):
+    return UserBankAccount.objects.filter(next_interest_date__lte=today)
+
+
+def post_interest_chunk(rows, account_types):
+    """
+    Post interest for ``(pk, balance, account_type_id, next_interest_date)``
+    rows with one UPDATE for the accounts and one INSERT for the
+    transactions, and move every account on to its next interest date.
+    """
+    accounts = []
+    transactions = []
+
+    for pk, balance, account_type_id, next_interest_date in rows:
+        account_type = account_types[account_type_id]
+        interest = account_type.calculate_interest(balance)
+        account = UserBankAccount(
+            pk=pk,
+            balance=balance,
+            next_interest_date=next_interest_date + relativedelta(
+                months=+account_type.interest_calculation_interval
+            )
+        )
+        accounts.append(account)
+
+        if interest > 0:
+            account.balance += interest
+            transactions.append(Transaction(
+                account=account,
+                amount=interest,
+                balance_after_transaction=account.balance,
+                transaction_type=INTEREST
+            ))
+
+    fast_bulk_update(accounts, ['balance', 'next_interest_date'])
+    Transaction.objects.bulk_create(transactions)
+    record_daily_summaries(transactions)
+
+    return len(transactions)
+
+
+def post_interest_batch(due, after_pk, chunk_size, account_types):
+    """
+    Lock and post the next chunk of ``due`` accounts after ``after_pk``.
+
+    Must run inside a transaction. Returns ``(scanned, posted, last_pk)``.
+    """
+    rows = list(
+        due.filter(pk__gt=after_pk).order_by('pk').select_for_update()
+        .values_list(
+            'pk', 'balance', 'account_type_id', 'next_interest_date'
+        )[:chunk_size]
+    )
+    if not rows:
+        return 0, 0, after_pk
+
+    return len(rows), post_interest_chunk(rows, account_types), rows[-1][0]
+
+
+def start_interest_run(today=None, shard_size=None):
+    """
+    Get or create the ledger entry for this month's interest run.
+
+    A new run splits the account id space into ``shard_size`` ranges.
+    Calling this again for the same month returns the existing run, so a
+    retried job resumes its pending shards instead of starting over.
+    """
+    today = today or timezone.localdate()
+    shard_size = shard_size or settings.INTEREST_SHARD_SIZE
+
+    with transaction.atomic():
+        run, created = InterestRun.objects.select_for_update().get_or_create(
+            period=today.replace(day=1)
+        )
+        if created:
+            bounds = UserBankAccount.objects.aggregate(
+                first=Min('pk'), last=Max('pk')
+            )
+            if bounds['first'] is not None:
+                InterestRunShard.objects.bulk_create(
+                    InterestRunShard(
+                        run=run,
+                        min_pk=min_pk,
+                        max_pk=min(min_pk + shard_size, bounds['last']),
+                        last_pk=min_pk
+                    )
+                    for min_pk in range(
+                        bounds['first'] - 1, bounds['last'], shard_size
+                    )
+                )
+            run.shard_count = run.shards.count()
+            run.save(update_fields=['shard_count'])
+
+    return run
+
+
+def run_interest_shard(shard_id, chunk_size=INTEREST_CHUNK_SIZE):
+    """
+    Post interest for one shard, checkpointing after every chunk, and
+    finish the run if this was its last pending shard.
+
+    The checkpoint is written in the same DB transaction as the chunk it
+    covers, and the shard row stays locked while a chunk is posted, so a
+    crashed or duplicated shard task can never post interest twice.
+    """
+    shard = InterestRunShard.objects.select_related('run').get(pk=shard_id)
+    account_types = account_type_registry.as_dict()
+    due = get_due_accounts(shard.run.period).filter(pk__lte=shard.max_pk)
+
+    started = time.perf_counter()
+    posted_here = chunks = 0
+    last_shard = False
+
+    while True:
+        with transaction.atomic():
+            shard = InterestRunShard.objects.select_for_update().get(
+                pk=shard_id
+            )
+            if shard.completed_at:
+                return shard.accounts
+
+            scanned, posted, shard.last_pk = post_interest_batch(
+                due, shard.last_pk, chunk_size, account_types
+            )
+            shard.accounts += posted
+            if not scanned:
+                shard.completed_at = timezone.now()
+                last_shard = is_last_pending_shard(shard)
+            shard.save(update_fields=['last_pk', 'accounts', 'completed_at'])
+
+        if shard.completed_at:
+            break
+        posted_here += posted
+        chunks += 1
+
+    duration = time.perf_counter() - started
+    logger.info(
+        'Interest shard %s posted %d accounts in %d chunks '
+        '(%.2fs, %.0f accounts/sec)',
+        shard.pk, posted_here, chunks, duration,
+        posted_here / duration if duration else 0
+    )
+    if last_shard:
+        finish_interest_run(shard.run_id)
+    return shard.accounts
+
+
+def is_last_pending_shard(shard):
+    """
+    Whether every other shard of the run of ``shard`` is completed.
+
+    Must run in the transaction completing ``shard``. The run row is
+    locked so completions are seen one after the other, and exactly one
+    of the shards finishing last at the same time sees none pending.
+    """
+    InterestRun.objects.select_for_update().only('pk').get(pk=shard.run_id)
+    return not InterestRunShard.objects.filter(
+        run_id=shard.run_id, completed_at__isnull=True
+    ).exclude(pk=shard.pk).exists()
+
+
+def finish_interest_run(run_id):
+    with transaction.atomic():
+        run = InterestRun.objects.select_for_update().get(pk=run_id)
+        if run.finished_at or run.shards.filter(completed_at__isnull=True).exists():
+            return run
+
+        run.accounts = run.shards.aggregate(total=Sum('accounts'))['total'] or 0
+        run.finished_at = timezone.now()
+        run.save(update_fields=['accounts', 'finished_at'])
+
+    logger.info(
+        'Interest run for %s posted %d accounts in %d shards (%s)',
+        run.period, run.accounts, run.shard_count, run.duration
+    )
+    return run
+
+
+def collect_interest_run_metrics():
+    """
+    Progress of the latest interest run read from the ledger, so it is
+    visible from every process whichever workers posted it.
+    """
+    run = InterestRun.objects.order_by('-period').first()
+    if run is None:
+        return []
+
+    shards = run.shards.aggregate(
+        accounts=Sum('accounts'),
+        pending=Count('pk', filter=Q(completed_at__isnull=True))
+    )
+    labels = {'period': run.period.isoformat()}
+    duration = (run.finished_at or timezone.now()) - run.started_at
+
+    return [
+        (
+            'interest_run_accounts', 'gauge',
+            'Accounts the latest interest run posted interest to.',
+            [(labels, shards['accounts'] or 0)]
+        ),
+        (
+            'interest_run_shards_pending', 'gauge',
+            'Shards of the latest interest run not completed yet.',
+            [(labels, shards['pending'])]
+        ),
+        (
+            'interest_run_duration_seconds', 'gauge',
+            'Duration of the latest interest run, so far if unfinished.',
+            [(labels, duration.total_seconds())]
+        ),
+    ]
@@ -0,0 +1,52 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import UserBankAccount
+from transactions.archive import ArchiveError, archive_account
+
+
+class Command(BaseCommand):
+    help = (
+        'Move the transactions of whole years older than '
+        'TRANSACTION_ARCHIVE_AFTER_DAYS out of the transactions table into '
+        'one archive file per account and year under '
+        'TRANSACTION_ARCHIVE_ROOT, where reports and exports read them from.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before-year', type=int,
+            help='Archive the years before this one, by default the year '
+                 'TRANSACTION_ARCHIVE_AFTER_DAYS days ago.'
+        )
+
+    def handle(self, *args, **options):
+        if options['before_year']:
+            before = datetime.date(options['before_year'], 1, 1)
+        else:
+            before = (timezone.localdate() - datetime.timedelta(
+                days=settings.TRANSACTION_ARCHIVE_AFTER_DAYS
+            )).replace(month=1, day=1)
+
+        accounts = UserBankAccount.objects.filter(
+            Q(transactions_archived_before__isnull=True)
+            | Q(transactions_archived_before__lt=before),
+            initial_deposit_date__lt=before
+        ).order_by('pk').values_list('pk', flat=True)
+
+        archived = moved = 0
+        try:
+            for pk in accounts.iterator(chunk_size=2000):
+                moved += archive_account(pk, before)
+                archived += 1
+        except ArchiveError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} transactions of {archived} accounts from '
+            f'before {before}.'
+        ))
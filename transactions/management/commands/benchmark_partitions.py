@@ -0,0 +1,150 @@
+import json
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+
+from accounts.models import User
+from transactions.benchmarks import BenchmarkError, BenchmarkSuite, compare
+from transactions.models import Transaction
+from transactions.partitioning import (
+    TABLE,
+    is_partitioned,
+    partition_transaction_table,
+)
+from transactions.seeding import BankSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throw-away Postgres test database, time the transaction '
+        'report and the interest run, partition the transactions table by '
+        'month and time them again. Seeding the default 50M transactions '
+        'takes about 40 minutes, --keepdb keeps them for the next run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50_000_000)
+        parser.add_argument(
+            '--transactions', type=int, default=500,
+            help='Mean number of transactions per customer.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=730,
+            help='Number of days the transaction history goes back.'
+        )
+        parser.add_argument(
+            '--sample', type=int, default=3,
+            help='Number of customers the report is timed for.'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keepdb', action='store_true')
+        parser.add_argument('--output', default='partition-benchmark.json')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning needs PostgreSQL.')
+
+        old_config = setup_databases(
+            verbosity=options['verbosity'],
+            interactive=False,
+            keepdb=options['keepdb'],
+            aliases={DEFAULT_DB_ALIAS},
+            serialized_aliases=set()
+        )
+        try:
+            results = self.run(options)
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        finally:
+            teardown_databases(
+                old_config,
+                verbosity=options['verbosity'],
+                keepdb=options['keepdb']
+            )
+
+        with open(options['output'], 'w') as file:
+            json.dump(results, file, indent=2)
+
+        self.stdout.write(
+            f'\nMedian ms, {results["rows"]} transactions, plain -> '
+            f'partitioned:'
+        )
+        for name, before, after, change in compare(
+            results['plain'], results['partitioned']
+        ):
+            self.stdout.write(
+                f'{name:<40} {before:10.2f} {after:10.2f} {change:+8.1%}'
+            )
+        self.stdout.write(
+            f'Partitioned in {results["partition_seconds"]:.1f}s, results '
+            f'written to {options["output"]}.'
+        )
+
+    def run(self, options):
+        if is_partitioned():
+            raise CommandError(
+                'The kept test database is already partitioned, run without '
+                '--keepdb to seed a new one.'
+            )
+
+        def progress(users, transactions):
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'{users} customers, {transactions} transactions created'
+                )
+
+        rows = Transaction.objects.count()
+        if rows < options['rows']:
+            seeder = BankSeeder(seed=options['seed'], days=options['days'])
+            summary = seeder.seed(
+                (options['rows'] - rows) // options['transactions'],
+                options['transactions'],
+                progress=progress
+            )
+            self.stdout.write(
+                f'Seeded {summary["transactions"]} transactions in '
+                f'{summary["duration"]:.0f}s'
+            )
+            rows = Transaction.objects.count()
+        with connection.cursor() as cursor:
+            cursor.execute(f'VACUUM ANALYZE {TABLE}')
+
+        suite = BenchmarkSuite(repeat=options['repeat'], log=self.stdout.write)
+        users = User.objects.filter(account__isnull=False).order_by('pk')
+        pks = random.Random(options['seed']).sample(
+            list(users.values_list('pk', flat=True)), options['sample']
+        )
+        suite.users = {
+            f'{user.account.transactions.count()}tx': user
+            for user in users.filter(pk__in=pks).select_related('account')
+        }
+
+        plain = self.run_suite(suite)
+        duration = partition_transaction_table(log=self.stdout.write)
+        partitioned = self.run_suite(suite)
+
+        return {
+            'rows': rows,
+            'partition_seconds': duration,
+            'plain': plain,
+            'partitioned': partitioned,
+        }
+
+    def run_suite(self, suite):
+        benchmarks = {}
+        # The test client sends requests for the "testserver" host.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+        ):
+            for bench in (suite.bench_report, suite.bench_interest):
+                for name, stats in bench():
+                    benchmarks[name] = stats
+                    self.stdout.write(
+                        f'{name}: median {stats["median_ms"]:.2f}ms'
+                    )
+        return {'benchmarks': benchmarks}
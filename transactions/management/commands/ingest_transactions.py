@@ -0,0 +1,73 @@
+import csv
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.ingest import INGEST_READERS, REJECT_FIELDS, ingest_chunk
+
+
+class Command(BaseCommand):
+    help = (
+        'Post a batch file of deposits (account_no, amount) as CSV or NDJSON. '
+        'Rows are processed in chunks and rejected rows are written to a '
+        'rejects file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file to ingest.')
+        parser.add_argument(
+            '--format', choices=sorted(INGEST_READERS),
+            help='Input format, detected from the file extension by default.'
+        )
+        parser.add_argument(
+            '--rejects',
+            help='Where to write rejected rows, <path>.rejects.csv by default.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Number of rows validated and posted per DB transaction.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in INGEST_READERS:
+            raise CommandError(
+                f'Can not detect the format of {path}, use --format.'
+            )
+        rejects_path = options['rejects'] or f'{path}.rejects.csv'
+
+        started = time.perf_counter()
+        rows_read = posted = rejected = 0
+
+        with open(path, newline='') as file, \
+                open(rejects_path, 'w', newline='') as rejects_file:
+            rejects = csv.writer(rejects_file)
+            rejects.writerow(REJECT_FIELDS)
+
+            def reject(line, row, reason):
+                nonlocal rejected
+                rejected += 1
+                rejects.writerow([
+                    line, row.get('account_no'), row.get('amount'), reason
+                ])
+
+            rows = INGEST_READERS[file_format](file)
+            while True:
+                chunk = list(islice(rows, options['chunk_size']))
+                if not chunk:
+                    break
+                rows_read += len(chunk)
+                posted += ingest_chunk(chunk, reject)
+
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{rows_read} rows processed')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Posted {posted} of {rows_read} rows, rejected {rejected} '
+            f'({rejects_path}) in {elapsed:.2f}s '
+            f'({rows_read / elapsed if elapsed else 0:.0f} rows/sec).'
+        ))
@@ -0,0 +1,98 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = (
+        'Send concurrent GET requests for a page through the WSGI or ASGI '
+        'request handler, logged in as an existing user, and report '
+        'throughput and latency. Set ASYNC_TRANSACTION_VIEWS=1 to serve the '
+        'transaction pages with the async views.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='User to send the requests as.')
+        parser.add_argument(
+            '--handler', choices=['wsgi', 'asgi'], default='wsgi',
+            help='Request handler to send the requests through.'
+        )
+        parser.add_argument(
+            '--path', help='Page to request, the transaction report by default.'
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=100)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model()._default_manager.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}.')
+
+        client = Client()
+        client.force_login(user)
+        self.cookies = client.cookies
+        self.path = options['path'] or reverse(
+            'transactions:transaction_report'
+        )
+
+        run = self.run_asgi if options['handler'] == 'asgi' else self.run_wsgi
+        # The test clients send requests for the "testserver" host.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+        ):
+            started = time.perf_counter()
+            results = run(options['requests'], options['concurrency'])
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        errors = sum(status != 200 for status, _ in results)
+        p50, p95, p99 = (
+            statistics.quantiles(latencies, n=100)[i - 1] * 1000
+            for i in (50, 95, 99)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["handler"].upper()} {self.path}: '
+            f'{len(results)} requests at concurrency '
+            f'{options["concurrency"]} in {elapsed:.2f}s '
+            f'({len(results) / elapsed:.0f} req/sec), '
+            f'p50 {p50:.1f}ms, p95 {p95:.1f}ms, p99 {p99:.1f}ms, '
+            f'{errors} errors.'
+        ))
+
+    def get_client(self, client_class):
+        # Clients store response cookies, so every request gets its own.
+        client = client_class()
+        client.cookies.update(self.cookies)
+        return client
+
+    def run_wsgi(self, requests, concurrency):
+        def request(_):
+            started = time.perf_counter()
+            response = self.get_client(Client).get(self.path)
+            return response.status_code, time.perf_counter() - started
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(request, range(requests)))
+
+    def run_asgi(self, requests, concurrency):
+        async def request(semaphore):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await self.get_client(AsyncClient).get(self.path)
+                return response.status_code, time.perf_counter() - started
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(
+                *(request(semaphore) for _ in range(requests))
+            )
+
+        return asyncio.run(run())
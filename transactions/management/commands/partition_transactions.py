@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.partitioning import (
+    COPY_BATCH_SIZE,
+    PartitioningError,
+    partition_transaction_table,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Move the transactions table of a Postgres database into a table '
+        'partitioned by month on timestamp, while postings carry on. The '
+        'old table is kept as transactions_transaction_unpartitioned unless '
+        '--drop-old is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=COPY_BATCH_SIZE,
+            help='Number of transaction ids copied per DB transaction.'
+        )
+        parser.add_argument(
+            '--months-ahead', type=int,
+            help='Months after the current one to create partitions for, '
+                 'TRANSACTION_PARTITION_MONTHS_AHEAD by default.'
+        )
+        parser.add_argument('--drop-old', action='store_true')
+
+    def handle(self, *args, **options):
+        if not settings.TRANSACTION_PARTITIONING:
+            raise CommandError(
+                'Set TRANSACTION_PARTITIONING=1 first, so the partitions of '
+                'the coming months are created.'
+            )
+
+        try:
+            duration = partition_transaction_table(
+                months_ahead=options['months_ahead'],
+                batch_size=options['batch_size'],
+                drop_old=options['drop_old'],
+                log=self.stdout.write
+            )
+        except PartitioningError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Partitioned the transactions table in {duration:.1f}s.'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from transactions.summaries import rebuild_daily_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily account summaries from the raw transactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Number of rows read and written per batch.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_daily_summaries(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {created} daily account summaries.'
+        ))
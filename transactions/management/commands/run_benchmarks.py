@@ -0,0 +1,95 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import setup_databases, teardown_databases
+
+from transactions.benchmarks import BenchmarkError, BenchmarkSuite, compare
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throw-away test database and time the transaction report at '
+        'several history sizes, deposits, withdrawals, concurrent '
+        'withdrawals from one account, registration, the statement export '
+        'and the interest run. Results are written as JSON '
+        'and can be compared with the results of another commit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='benchmark-results.json',
+            help='File the results are written to.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Results of an earlier run to compare the medians with.'
+        )
+        parser.add_argument(
+            '--history-sizes', type=int, nargs='+', default=[100, 1000, 10000],
+            help='Transaction history sizes the report is timed at.'
+        )
+        parser.add_argument(
+            '--customers', type=int, default=1000,
+            help='Number of background customers seeded.'
+        )
+        parser.add_argument(
+            '--transactions', type=int, default=100,
+            help='Mean number of transactions per background customer.'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Reuse the test database if it exists and keep it after.'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+
+        suite = BenchmarkSuite(
+            history_sizes=options['history_sizes'],
+            customers=options['customers'],
+            transactions=options['transactions'],
+            repeat=options['repeat'],
+            seed=options['seed'],
+            log=self.stdout.write
+        )
+
+        # Seeded data must not end up in, or be skewed by, the real database.
+        old_config = setup_databases(
+            verbosity=options['verbosity'],
+            interactive=False,
+            keepdb=options['keepdb'],
+            aliases={DEFAULT_DB_ALIAS},
+            serialized_aliases=set()
+        )
+        try:
+            results = suite.run()
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        finally:
+            teardown_databases(
+                old_config,
+                verbosity=options['verbosity'],
+                keepdb=options['keepdb']
+            )
+
+        with open(options['output'], 'w') as file:
+            json.dump(results, file, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(results["benchmarks"])} results for commit '
+            f'{results["commit"]} to {options["output"]}.'
+        ))
+
+        if baseline:
+            self.stdout.write(
+                f'\nMedian ms, {baseline["commit"]} -> {results["commit"]}:'
+            )
+            for name, before, after, change in compare(baseline, results):
+                self.stdout.write(
+                    f'{name:<32} {before:10.2f} {after:10.2f} {change:+8.1%}'
+                )
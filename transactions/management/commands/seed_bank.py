@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from transactions.seeding import SEED_PASSWORD, BankSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate customers with an account, an address and a transaction '
+        'history for development and benchmarking. Transactions and daily '
+        'rollups are written with bulk inserts. Seeded users log in with '
+        f'the password "{SEED_PASSWORD}".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--transactions', type=int, default=100,
+            help='Mean number of transactions per account.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Number of days the transaction history goes back.'
+        )
+        parser.add_argument(
+            '--seed', type=int,
+            help='Random seed, the same seed generates the same data.'
+        )
+        parser.add_argument('--email-domain', default='example.com')
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Number of customers created per DB transaction.'
+        )
+
+    def handle(self, *args, **options):
+        seeder = BankSeeder(
+            seed=options['seed'],
+            days=options['days'],
+            email_domain=options['email_domain']
+        )
+
+        def progress(users, transactions):
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'{users} customers, {transactions} transactions created'
+                )
+
+        summary = seeder.seed(
+            options['users'],
+            options['transactions'],
+            chunk_size=options['chunk_size'],
+            progress=progress
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {summary["users"]} customers with '
+            f'{summary["transactions"]} transactions in '
+            f'{summary["duration"]:.2f}s '
+            f'({summary["transactions_per_second"]:.0f} transactions/sec).'
+        ))
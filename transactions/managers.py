@@ -0,0 +1,45 @@
+from django.db import models, transaction
+
+from accounts.models import UserBankAccount
+
+from .constants import WITHDRAWAL
+from .summaries import record_daily_summaries
+
+
+class InsufficientBalance(Exception):
+    pass
+
+
+class TransactionManager(models.Manager):
+
+    def post(self, account, amount, transaction_type):
+        """
+        Apply a transaction to the account balance and record it.
+
+        The balance change is a single conditional UPDATE, so concurrent
+        postings on the same account never lose updates and withdrawals
+        can not overdraw. The transaction row is inserted in the same DB
+        transaction with the balance returned by that UPDATE.
+        """
+        delta = -amount if transaction_type == WITHDRAWAL else amount
+
+        with transaction.atomic(using=self.db):
+            balance = UserBankAccount.objects.db_manager(
+                self.db
+            ).adjust_balance(account.pk, delta)
+
+            if balance is None:
+                raise InsufficientBalance(
+                    f'Account {account.account_no} can not cover {amount}'
+                )
+
+            account.balance = balance
+            transaction_obj = self.create(
+                account=account,
+                amount=amount,
+                balance_after_transaction=balance,
+                transaction_type=transaction_type
+            )
+            record_daily_summaries([transaction_obj])
+
+        return transaction_obj
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_transaction_account_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterestRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(help_text='First day of the month interest was posted for', unique=True)),
+                ('shard_count', models.PositiveIntegerField(default=0)),
+                ('accounts', models.PositiveIntegerField(default=0, help_text='Number of accounts interest was posted to')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InterestRunShard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_pk', models.PositiveIntegerField(help_text='Exclusive lower bound of the account id range')),
+                ('max_pk', models.PositiveIntegerField(help_text='Inclusive upper bound of the account id range')),
+                ('last_pk', models.PositiveIntegerField(help_text='Last account id committed for this shard')),
+                ('accounts', models.PositiveIntegerField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='transactions.interestrun')),
+            ],
+            options={
+                'ordering': ['run', 'min_pk'],
+                'unique_together': {('run', 'min_pk')},
+            },
+        ),
+    ]
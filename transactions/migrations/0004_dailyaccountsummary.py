@@ -0,0 +1,73 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+# Summary field prefix of each transaction type, as of this migration.
+SUMMARY_FIELD_PREFIXES = {1: 'deposit', 2: 'withdrawal', 3: 'interest'}
+BATCH_SIZE = 2000
+
+
+def build_daily_summaries(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    DailyAccountSummary = apps.get_model('transactions', 'DailyAccountSummary')
+    db_alias = schema_editor.connection.alias
+
+    rows = Transaction.objects.using(db_alias).order_by('account', 'timestamp', 'id').values_list(
+        'account_id', 'timestamp', 'transaction_type', 'amount',
+        'balance_after_transaction'
+    ).iterator(chunk_size=BATCH_SIZE)
+
+    batch = []
+    summary = None
+
+    for account_id, timestamp, transaction_type, amount, balance in rows:
+        date = timezone.localdate(timestamp)
+        if summary is None or (summary.account_id, summary.date) != (account_id, date):
+            summary = DailyAccountSummary(account_id=account_id, date=date)
+            batch.append(summary)
+            if len(batch) > BATCH_SIZE:
+                DailyAccountSummary.objects.using(db_alias).bulk_create(batch[:-1])
+                batch = batch[-1:]
+
+        prefix = SUMMARY_FIELD_PREFIXES[transaction_type]
+        setattr(summary, f'{prefix}_amount', getattr(summary, f'{prefix}_amount') + amount)
+        setattr(summary, f'{prefix}_count', getattr(summary, f'{prefix}_count') + 1)
+        summary.closing_balance = balance
+
+    DailyAccountSummary.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_userbankaccount_next_interest_date'),
+        ('transactions', '0003_interest_run_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAccountSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('deposit_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('deposit_count', models.PositiveIntegerField(default=0)),
+                ('withdrawal_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('withdrawal_count', models.PositiveIntegerField(default=0)),
+                ('interest_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('interest_count', models.PositiveIntegerField(default=0)),
+                ('closing_balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='accounts.userbankaccount')),
+            ],
+            options={
+                'ordering': ['account', 'date'],
+                'unique_together': {('account', 'date')},
+            },
+        ),
+        migrations.RunPython(
+            build_daily_summaries, migrations.RunPython.noop
+        ),
+    ]
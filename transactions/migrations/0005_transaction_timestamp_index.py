@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_dailyaccountsummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['timestamp'], name='transaction_timestamp_idx'),
+        ),
+    ]
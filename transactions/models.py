@@ -1,30 +1,131 @@
-from django.db import models
-
-from .constants import TRANSACTION_TYPE_CHOICES
-from accounts.models import UserBankAccount
-
-
-class Transaction(models.Model):
-    account = models.ForeignKey(
-        UserBankAccount,
-        related_name='transactions',
-        on_delete=models.CASCADE,
-    )
-    amount = models.DecimalField(
-        decimal_places=2,
-        max_digits=12
-    )
-    balance_after_transaction = models.DecimalField(
-        decimal_places=2,
-        max_digits=12
-    )
-    transaction_type = models.PositiveSmallIntegerField(
-        choices=TRANSACTION_TYPE_CHOICES
-    )
-    timestamp = models.DateTimeField(auto_now_add=True)
-
-    def __str__(self):
-        return str(self.account.account_no)
-
-    class Meta:
-        ordering = ['timestamp']
+from django.db import models
+
+from .constants import TRANSACTION_TYPE_CHOICES
+from .managers import TransactionManager
+from accounts.models import UserBankAccount
+
+
+class Transaction(models.Model):
+    account = models.ForeignKey(
+        UserBankAccount,
+        related_name='transactions',
+        on_delete=models.CASCADE,
+    )
+    amount = models.DecimalField(
+        decimal_places=2,
+        max_digits=12
+    )
+    balance_after_transaction = models.DecimalField(
+        decimal_places=2,
+        max_digits=12
+    )
+    transaction_type = models.PositiveSmallIntegerField(
+        choices=TRANSACTION_TYPE_CHOICES
+    )
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    objects = TransactionManager()
+
+    def __str__(self):
+        return str(self.account.account_no)
+
+    class Meta:
+        ordering = ['timestamp', 'id']
+        indexes = [
+            # Serves the per-account report and export range scans in
+            # output order, so no separate sort step is needed.
+            models.Index(
+                fields=['account', 'timestamp', 'id'],
+                name='transaction_account_ts_idx',
+            ),
+            # Serves the admin date hierarchy's first and last date and
+            # its date ranges.
+            models.Index(fields=['timestamp'], name='transaction_timestamp_idx'),
+        ]
+
+
+class DailyAccountSummary(models.Model):
+    account = models.ForeignKey(
+        UserBankAccount,
+        related_name='daily_summaries',
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField()
+    deposit_amount = models.DecimalField(
+        default=0,
+        decimal_places=2,
+        max_digits=14
+    )
+    deposit_count = models.PositiveIntegerField(default=0)
+    withdrawal_amount = models.DecimalField(
+        default=0,
+        decimal_places=2,
+        max_digits=14
+    )
+    withdrawal_count = models.PositiveIntegerField(default=0)
+    interest_amount = models.DecimalField(
+        default=0,
+        decimal_places=2,
+        max_digits=14
+    )
+    interest_count = models.PositiveIntegerField(default=0)
+    closing_balance = models.DecimalField(
+        decimal_places=2,
+        max_digits=12
+    )
+
+    def __str__(self):
+        return f'{self.account.account_no} {self.date}'
+
+    class Meta:
+        ordering = ['account', 'date']
+        unique_together = ['account', 'date']
+
+
+class InterestRun(models.Model):
+    period = models.DateField(
+        unique=True,
+        help_text='First day of the month interest was posted for'
+    )
+    shard_count = models.PositiveIntegerField(default=0)
+    accounts = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of accounts interest was posted to'
+    )
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.period.strftime('%B %Y')
+
+    @property
+    def duration(self):
+        if self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+
+class InterestRunShard(models.Model):
+    run = models.ForeignKey(
+        InterestRun,
+        related_name='shards',
+        on_delete=models.CASCADE,
+    )
+    min_pk = models.PositiveIntegerField(
+        help_text='Exclusive lower bound of the account id range'
+    )
+    max_pk = models.PositiveIntegerField(
+        help_text='Inclusive upper bound of the account id range'
+    )
+    last_pk = models.PositiveIntegerField(
+        help_text='Last account id committed for this shard'
+    )
+    accounts = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.run} ({self.min_pk}, {self.max_pk}]'
+
+    class Meta:
+        ordering = ['run', 'min_pk']
+        unique_together = ['run', 'min_pk']
@@ -0,0 +1,178 @@
+import base64
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) pagination on ``(timestamp, id)``.
+
+    Unlike offset pagination every page is fetched with a bounded range
+    query, so page N costs the same as page 1. Given ``archive``, an
+    ``ArchivedTransactions`` holding the rows before the queryset's, pages
+    start in the archive and the queryset is only queried for the rows
+    the archive can not fill a page with.
+    """
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, archive=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.archive = archive
+
+    @classmethod
+    def encode_cursor(cls, direction, obj):
+        raw = f'{direction}|{obj.timestamp.isoformat()}|{obj.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            direction, timestamp, pk = raw.split('|')
+            timestamp = parse_datetime(timestamp)
+            pk = int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+
+        if direction not in (cls.NEXT, cls.PREVIOUS) or timestamp is None:
+            raise InvalidCursor(cursor)
+
+        return direction, timestamp, pk
+
+    def parse_cursor(self, cursor=None):
+        return self.decode_cursor(cursor) if cursor else (self.NEXT, None, None)
+
+    def get_page_queryset(self, direction, timestamp, pk):
+        """
+        Return the queryset of the rows after the cursor, in page direction.
+        """
+        if direction == self.NEXT:
+            queryset = self.queryset.order_by('timestamp', 'id')
+            if timestamp is not None:
+                # The leading ``timestamp >=`` bound keeps the predicate
+                # usable as an index range start.
+                queryset = queryset.filter(timestamp__gte=timestamp).filter(
+                    Q(timestamp__gt=timestamp) | Q(id__gt=pk)
+                )
+        else:
+            queryset = self.queryset.order_by('-timestamp', '-id').filter(
+                timestamp__lte=timestamp
+            ).filter(
+                Q(timestamp__lt=timestamp) | Q(id__lt=pk)
+            )
+
+        return queryset
+
+    def get_archived_rows(self, direction, timestamp, pk):
+        """
+        Up to a page and one archived rows after the cursor, in page
+        direction.
+        """
+        if self.archive is None:
+            return []
+        if direction == self.NEXT:
+            rows = self.archive.transactions(
+                after=(timestamp, pk) if timestamp else None
+            )
+        else:
+            rows = self.archive.transactions(before=(timestamp, pk), reverse=True)
+        return list(islice(rows, self.per_page + 1))
+
+    def get_query_limit(self, direction, timestamp, archived):
+        """
+        Number of rows to query after ``archived`` rows were read, 0 when
+        the archive covers the page.
+        """
+        if direction == self.NEXT:
+            return self.per_page + 1 - len(archived)
+        # Every row before a cursor into the archive is archived.
+        if self.archive and timestamp < self.archive.horizon:
+            return 0
+        return self.per_page + 1
+
+    def merge_rows(self, direction, archived, rows):
+        # Archived rows come before the queried ones.
+        rows = archived + rows if direction == self.NEXT else rows + archived
+        return rows[:self.per_page + 1]
+
+    def build_page(self, rows, direction, timestamp):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == self.PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, timestamp is not None
+
+        if not rows:
+            return KeysetPage(rows)
+
+        return KeysetPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(self.NEXT, rows[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(self.PREVIOUS, rows[0])
+                if has_previous else None
+            ),
+        )
+
+    def page(self, cursor=None):
+        direction, timestamp, pk = self.parse_cursor(cursor)
+        archived = self.get_archived_rows(direction, timestamp, pk)
+        limit = self.get_query_limit(direction, timestamp, archived)
+        rows = []
+        if limit:
+            rows = list(
+                self.get_page_queryset(direction, timestamp, pk)[:limit]
+            )
+        return self.build_page(
+            self.merge_rows(direction, archived, rows), direction, timestamp
+        )
+
+    async def apage(self, cursor=None):
+        direction, timestamp, pk = self.parse_cursor(cursor)
+        # Archive files are memory mapped, reading a page of them does not
+        # wait on I/O long enough to need a worker thread.
+        archived = self.get_archived_rows(direction, timestamp, pk)
+        limit = self.get_query_limit(direction, timestamp, archived)
+        rows = []
+        if limit:
+            queryset = self.get_page_queryset(direction, timestamp, pk)[:limit]
+            rows = [obj async for obj in queryset]
+        return self.build_page(
+            self.merge_rows(direction, archived, rows), direction, timestamp
+        )
@@ -0,0 +1,294 @@
+import datetime
+import logging
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import UserBankAccount
+
+from .models import Transaction
+
+
+logger = logging.getLogger(__name__)
+
+TABLE = Transaction._meta.db_table
+NEW_TABLE = f'{TABLE}_partitioned'
+OLD_TABLE = f'{TABLE}_unpartitioned'
+DEFAULT_PARTITION = f'{TABLE}_default'
+# Ids of the rows updated or deleted in the table while it is copied.
+CHANGES_TABLE = f'{TABLE}_changes'
+# Indexes of the table and their columns.
+INDEXES = {
+    'transaction_account_ts_idx': '(account_id, "timestamp", id)',
+    'transaction_timestamp_idx': '("timestamp")',
+}
+COPY_BATCH_SIZE = 500000
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table '
+            'WHERE partrelid = to_regclass(%s)',
+            [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def get_partitions():
+    """Names of the partitions of the transactions table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT inhrelid::regclass::text FROM pg_inherits '
+            'WHERE inhparent = to_regclass(%s)',
+            [TABLE]
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+def get_partition_name(month):
+    return f'{TABLE}_{month:%Y_%m}'
+
+
+def get_month_bounds(month):
+    """Local midnights starting ``month`` and the month after it."""
+    return tuple(
+        timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+        for day in (month, month + relativedelta(months=1))
+    )
+
+
+def create_partition(cursor, parent, month):
+    start, end = get_month_bounds(month)
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {get_partition_name(month)} '
+        f'PARTITION OF {parent} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def get_months(first_month, months_ahead, today=None):
+    """
+    First days of the months from ``first_month`` to ``months_ahead``
+    months after the current one.
+    """
+    last_month = (today or timezone.localdate()).replace(day=1) + relativedelta(
+        months=months_ahead
+    )
+    month = first_month
+    while month <= last_month:
+        yield month
+        month += relativedelta(months=1)
+
+
+def create_future_partitions(months_ahead=None, today=None):
+    """
+    Create the missing partitions of the current month and of the
+    ``months_ahead`` months after it, so postings never fall in the
+    default partition. Does nothing unless TRANSACTION_PARTITIONING is on
+    and the table is partitioned. Returns the names of the partitions
+    created.
+    """
+    if not settings.TRANSACTION_PARTITIONING or not is_partitioned():
+        return []
+    if months_ahead is None:
+        months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD
+
+    today = today or timezone.localdate()
+    existing = get_partitions()
+    created = []
+    with connection.cursor() as cursor:
+        for month in get_months(today.replace(day=1), months_ahead, today):
+            if get_partition_name(month) not in existing:
+                create_partition(cursor, TABLE, month)
+                created.append(get_partition_name(month))
+
+    if created:
+        logger.info('Created transaction partitions %s', ', '.join(created))
+    return created
+
+
+def create_partitioned_table(first_month, months_ahead):
+    """
+    Create the partitioned copy of the transactions table with its
+    monthly partitions, a default partition, the primary key, the account
+    foreign key and the indexes under temporary names.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE {NEW_TABLE} (LIKE {TABLE}) '
+            f'PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(
+            f'ALTER TABLE {NEW_TABLE} ALTER COLUMN id '
+            f'ADD GENERATED BY DEFAULT AS IDENTITY'
+        )
+        # The partition key has to be part of the primary key, ids stay
+        # unique as they all come from the same identity sequence.
+        cursor.execute(
+            f'ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {NEW_TABLE}_pkey '
+            f'PRIMARY KEY (id, "timestamp")'
+        )
+        cursor.execute(
+            f'ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {NEW_TABLE}_account_fk '
+            f'FOREIGN KEY (account_id) '
+            f'REFERENCES {UserBankAccount._meta.db_table} (id) '
+            f'DEFERRABLE INITIALLY DEFERRED'
+        )
+        for name, columns in INDEXES.items():
+            cursor.execute(
+                f'CREATE INDEX {name}_partitioned ON {NEW_TABLE} {columns}'
+            )
+        for month in get_months(first_month, months_ahead):
+            create_partition(cursor, NEW_TABLE, month)
+        cursor.execute(
+            f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {NEW_TABLE} DEFAULT'
+        )
+        track_changes(cursor)
+
+
+def track_changes(cursor):
+    """
+    Log the ids of the rows updated or deleted in the table from now on,
+    archive_transactions deleting rows already copied for instance, so
+    the swap can bring them in line.
+    """
+    cursor.execute(f'CREATE TABLE {CHANGES_TABLE} (id bigint NOT NULL)')
+    cursor.execute(
+        f'CREATE FUNCTION {CHANGES_TABLE}_log() RETURNS trigger '
+        f'LANGUAGE plpgsql AS $$ BEGIN '
+        f'INSERT INTO {CHANGES_TABLE} SELECT id FROM changed; '
+        f'RETURN NULL; END $$'
+    )
+    for event in ('UPDATE', 'DELETE'):
+        cursor.execute(
+            f'CREATE TRIGGER {CHANGES_TABLE}_{event.lower()} '
+            f'AFTER {event} ON {TABLE} REFERENCING OLD TABLE AS changed '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION {CHANGES_TABLE}_log()'
+        )
+
+
+def get_copy_horizon():
+    """
+    Highest transaction id once every transaction inserting into the table
+    has finished. Ids up to it never change afterwards, later postings get
+    higher ids.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Waits for running inserts and holds new ones back for a moment.
+        cursor.execute(f'LOCK TABLE {TABLE} IN SHARE MODE')
+        cursor.execute(f'SELECT max(id) FROM {TABLE}')
+        return cursor.fetchone()[0] or 0
+
+
+def swap_tables(copied_id):
+    """
+    Copy the transactions posted since ``copied_id``, redo the rows
+    changed since they were copied and put the partitioned table in place
+    of the old one, which is kept as ``OLD_TABLE``. Postings, updates and
+    deletes wait for the swap, reads go on.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {TABLE} IN EXCLUSIVE MODE')
+        cursor.execute(
+            f'DELETE FROM {NEW_TABLE} '
+            f'WHERE id IN (SELECT id FROM {CHANGES_TABLE})'
+        )
+        cursor.execute(
+            f'INSERT INTO {NEW_TABLE} SELECT * FROM {TABLE} '
+            f'WHERE id > %s OR id IN (SELECT id FROM {CHANGES_TABLE})',
+            [copied_id]
+        )
+        cursor.execute(f'DROP FUNCTION {CHANGES_TABLE}_log() CASCADE')
+        cursor.execute(f'DROP TABLE {CHANGES_TABLE}')
+        # Serial or identity, depending on the Django version that
+        # created the table.
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+        sequence, = cursor.fetchone()
+        renames = [
+            ('TABLE', TABLE, OLD_TABLE),
+            ('TABLE', NEW_TABLE, TABLE),
+            ('INDEX', f'{TABLE}_pkey', f'{OLD_TABLE}_pkey'),
+            ('INDEX', f'{NEW_TABLE}_pkey', f'{TABLE}_pkey'),
+            *(
+                rename
+                for name in INDEXES
+                for rename in (
+                    ('INDEX', name, f'{name}_unpartitioned'),
+                    ('INDEX', f'{name}_partitioned', name),
+                )
+            ),
+            ('SEQUENCE', sequence, f'{OLD_TABLE}_id_seq'),
+            ('SEQUENCE', f'{NEW_TABLE}_id_seq', f'{TABLE}_id_seq'),
+        ]
+        for kind, old_name, new_name in renames:
+            cursor.execute(f'ALTER {kind} {old_name} RENAME TO {new_name}')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f"coalesce(max(id), 0) + 1, false) FROM {TABLE}"
+        )
+
+
+def partition_transaction_table(months_ahead=None, batch_size=COPY_BATCH_SIZE,
+                                drop_old=False, log=None):
+    """
+    Move the transactions into a table partitioned by month on
+    ``timestamp``, while postings carry on.
+
+    The partitioned table is created next to the old one and filled in
+    batches of ``batch_size`` ids, one DB transaction each. Postings are
+    only held back while the transactions posted, updated or deleted
+    during the copy are brought over and the tables swapped. The old table is kept as
+    ``OLD_TABLE`` unless ``drop_old``.
+    """
+    log = log or logger.info
+    if connection.vendor != 'postgresql':
+        raise PartitioningError('Partitioning needs PostgreSQL.')
+    if is_partitioned():
+        raise PartitioningError(f'{TABLE} is already partitioned.')
+    if months_ahead is None:
+        months_ahead = settings.TRANSACTION_PARTITION_MONTHS_AHEAD
+
+    started = time.perf_counter()
+    first = Transaction.objects.order_by('timestamp').values_list(
+        'timestamp', flat=True
+    ).first()
+    first_month = timezone.localdate(first or timezone.now()).replace(day=1)
+
+    create_partitioned_table(first_month, months_ahead)
+    horizon = get_copy_horizon()
+
+    copied_id = 0
+    while copied_id < horizon:
+        batch_end = min(copied_id + batch_size, horizon)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {NEW_TABLE} SELECT * FROM {TABLE} '
+                f'WHERE id > %s AND id <= %s',
+                [copied_id, batch_end]
+            )
+        copied_id = batch_end
+        log(f'Copied transactions up to id {copied_id} of {horizon}')
+
+    swap_tables(copied_id)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {TABLE}')
+        if drop_old:
+            cursor.execute(f'DROP TABLE {OLD_TABLE}')
+
+    duration = time.perf_counter() - started
+    log(
+        f'Partitioned {TABLE} into {len(get_partitions())} partitions in '
+        f'{duration:.1f}s'
+    )
+    return duration
@@ -0,0 +1,331 @@
+import datetime
+import math
+import random
+import time
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.account_types import account_types as account_type_registry
+from accounts.constants import GENDER_CHOICE
+from accounts.models import BankAccountType, User, UserAddress, UserBankAccount
+from core.db import fast_bulk_insert
+
+from .constants import DEPOSIT, INTEREST, WITHDRAWAL
+from .models import DailyAccountSummary, Transaction
+from .summaries import SUMMARY_FIELDS, add_to_summary
+
+
+SEED_PASSWORD = 'seed-password'
+
+DEFAULT_ACCOUNT_TYPES = [
+    {
+        'name': 'Savings',
+        'maximum_withdrawal_amount': 20000,
+        'annual_interest_rate': Decimal('4.50'),
+        'interest_calculation_per_year': 12,
+    },
+    {
+        'name': 'Current',
+        'maximum_withdrawal_amount': 100000,
+        'annual_interest_rate': Decimal('0.50'),
+        'interest_calculation_per_year': 4,
+    },
+    {
+        'name': 'Fixed Deposit',
+        'maximum_withdrawal_amount': 5000,
+        'annual_interest_rate': Decimal('7.00'),
+        'interest_calculation_per_year': 1,
+    },
+]
+
+FIRST_NAMES = [
+    'Amina', 'Brian', 'Grace', 'David', 'Faith', 'Kevin', 'Mercy', 'Peter',
+    'Sarah', 'James', 'Joy', 'Daniel', 'Mary', 'John', 'Esther', 'Samuel',
+]
+LAST_NAMES = [
+    'Otieno', 'Mwangi', 'Wanjiru', 'Kamau', 'Achieng', 'Mutua', 'Njeri',
+    'Kiprop', 'Onyango', 'Wambui', 'Chebet', 'Kariuki', 'Akinyi', 'Mbugua',
+]
+STREETS = [
+    'Moi Avenue', 'Kenyatta Avenue', 'Ngong Road', 'Waiyaki Way',
+    'Mombasa Road', 'Thika Road', 'Kimathi Street', 'Biashara Street',
+]
+CITIES = [
+    ('Nairobi', 'Kenya'), ('Mombasa', 'Kenya'), ('Kisumu', 'Kenya'),
+    ('Nakuru', 'Kenya'), ('Kampala', 'Uganda'), ('Dar es Salaam', 'Tanzania'),
+]
+
+TRANSACTION_FIELDS = (
+    'account_id', 'amount', 'balance_after_transaction', 'transaction_type',
+    'timestamp',
+)
+DAILY_SUMMARY_FIELDS = ('account_id', 'date', *SUMMARY_FIELDS)
+
+
+class AccountHistory:
+    """
+    Transactions of one account, oldest first, with the account state
+    they leave behind.
+    """
+
+    def __init__(self, account_type):
+        self.account_type = account_type
+        self.balance = Decimal('0.00')
+        self.transactions = []
+        self.initial_deposit_date = None
+        self.interest_start_date = None
+        self.next_interest_date = None
+        self.next_interest_at = None
+
+    def add(self, transaction_type, amount, timestamp):
+        if transaction_type == WITHDRAWAL:
+            self.balance -= amount
+        else:
+            self.balance += amount
+        self.transactions.append(
+            (transaction_type, amount, self.balance, timestamp)
+        )
+
+    def set_next_interest_date(self, date):
+        self.next_interest_date = date
+        # The interest run posts early on the first of the month.
+        self.next_interest_at = timezone.make_aware(
+            datetime.datetime.combine(date, datetime.time(0, 5))
+        )
+
+    def start_interest_schedule(self, deposit_date):
+        # Same schedule as UserBankAccount.start_interest_schedule().
+        self.initial_deposit_date = deposit_date
+        self.interest_start_date = deposit_date + relativedelta(
+            months=+self.account_type.interest_calculation_interval
+        )
+        self.set_next_interest_date(self.interest_start_date.replace(day=1))
+
+    def post_interest_until(self, until):
+        """
+        Post interest on every interest date up to ``until`` the way the
+        interest run would have.
+        """
+        while self.next_interest_at and self.next_interest_at <= until:
+            interest = self.account_type.calculate_interest(self.balance)
+            if interest > 0:
+                self.add(INTEREST, interest, self.next_interest_at)
+            self.set_next_interest_date(
+                self.next_interest_date + relativedelta(
+                    months=+self.account_type.interest_calculation_interval
+                )
+            )
+
+
+class BankSeeder:
+    """
+    Generate customers with their account, address and transaction
+    history.
+
+    Every account gets a history of deposits and withdrawals spread over
+    the last ``days`` days, with amounts drawn from a log-normal
+    distribution, withdrawals only of money the account holds and interest
+    posted on the account type's schedule. Daily rollups are written along
+    with the transactions. The same ``seed`` generates the same data.
+    """
+
+    def __init__(self, seed=None, days=365, email_domain='example.com',
+                 now=None):
+        self.random = random.Random(seed)
+        self.days = days
+        self.email_domain = email_domain
+        self.now = now or timezone.now()
+        # Hashing a password per customer would dominate the run.
+        self.password = make_password(SEED_PASSWORD)
+        self.next_index = (User.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def get_account_types(self):
+        if not BankAccountType.objects.exists():
+            BankAccountType.objects.bulk_create(
+                BankAccountType(**fields) for fields in DEFAULT_ACCOUNT_TYPES
+            )
+            account_type_registry.invalidate()
+        return account_type_registry.all()
+
+    def draw_transaction_count(self, mean):
+        """
+        Number of transactions for one account. Log-normal, so most
+        accounts are quiet and a few are very busy, with mean ``mean``.
+        """
+        if mean <= 0:
+            return 0
+        return round(self.random.lognormvariate(math.log(mean) - 0.5, 1))
+
+    def draw_amount(self, median, minimum, maximum=None):
+        amount = max(self.random.lognormvariate(math.log(median), 1), minimum)
+        if maximum is not None:
+            amount = min(amount, maximum)
+        return Decimal(f'{amount:.2f}')
+
+    def build_history(self, account_type, count):
+        """
+        Build an ``AccountHistory`` with ``count`` deposits and withdrawals
+        plus the interest they earned.
+        """
+        history = AccountHistory(account_type)
+        tz = timezone.get_current_timezone()
+        start = self.now - datetime.timedelta(days=self.days)
+        seconds = self.days * 24 * 60 * 60
+        timestamps = sorted(
+            start + datetime.timedelta(seconds=self.random.uniform(0, seconds))
+            for _ in range(count)
+        )
+        minimum_withdrawal = Decimal(settings.MINIMUM_WITHDRAWAL_AMOUNT)
+
+        for timestamp in timestamps:
+            history.post_interest_until(timestamp)
+
+            if history.balance >= minimum_withdrawal and self.random.random() < 0.4:
+                amount = self.draw_amount(
+                    history.balance / 4, minimum_withdrawal,
+                    min(history.balance, account_type.maximum_withdrawal_amount)
+                )
+                history.add(WITHDRAWAL, amount, timestamp)
+            else:
+                if not history.initial_deposit_date:
+                    history.start_interest_schedule(timestamp.astimezone(tz).date())
+                history.add(
+                    DEPOSIT,
+                    self.draw_amount(400, settings.MINIMUM_DEPOSIT_AMOUNT),
+                    timestamp
+                )
+
+        history.post_interest_until(self.now)
+        return history
+
+    def build_customer(self, account_type):
+        index = self.next_index
+        self.next_index += 1
+        first_name = self.random.choice(FIRST_NAMES)
+        last_name = self.random.choice(LAST_NAMES)
+        user = User(
+            email=f'customer{index}@{self.email_domain}',
+            first_name=first_name,
+            last_name=last_name,
+            password=self.password
+        )
+        city, country = self.random.choice(CITIES)
+        address = UserAddress(
+            street_address=(
+                f'{self.random.randint(1, 999)} {self.random.choice(STREETS)}'
+            ),
+            city=city,
+            postal_code=self.random.randint(10000, 99999),
+            country=country
+        )
+        account = UserBankAccount(
+            account_type=account_type,
+            gender=self.random.choice(GENDER_CHOICE)[0],
+            birth_date=self.now.date() - datetime.timedelta(
+                days=self.random.randint(18 * 365, 80 * 365)
+            )
+        )
+        return user, address, account
+
+    @transaction.atomic
+    def create_customers(self, transaction_counts):
+        """
+        Create one customer per entry of ``transaction_counts`` with that
+        many deposits and withdrawals. Returns the users and the number of
+        transactions created.
+        """
+        account_types = self.get_account_types()
+        customers = []
+        histories = []
+        for count in transaction_counts:
+            account_type = self.random.choice(account_types)
+            customers.append(self.build_customer(account_type))
+            histories.append(self.build_history(account_type, count))
+
+        users = User.objects.bulk_create(user for user, _, _ in customers)
+
+        accounts = []
+        account_numbers = UserBankAccount.objects.reserve_account_numbers(
+            len(customers)
+        )
+        for (user, address, account), history, account_no in zip(
+            customers, histories, account_numbers
+        ):
+            address.user = user
+            account.user = user
+            account.account_no = account_no
+            account.balance = history.balance
+            account.initial_deposit_date = history.initial_deposit_date
+            account.interest_start_date = history.interest_start_date
+            account.next_interest_date = history.next_interest_date
+            accounts.append(account)
+
+        UserAddress.objects.bulk_create(address for _, address, _ in customers)
+        UserBankAccount.objects.bulk_create(accounts)
+
+        transactions = [
+            (account.pk, amount, balance, transaction_type, timestamp)
+            for account, history in zip(accounts, histories)
+            for transaction_type, amount, balance, timestamp in history.transactions
+        ]
+        fast_bulk_insert(Transaction, TRANSACTION_FIELDS, transactions)
+        fast_bulk_insert(
+            DailyAccountSummary,
+            DAILY_SUMMARY_FIELDS,
+            (
+                [summary.account_id, summary.date] + [
+                    getattr(summary, field) for field in SUMMARY_FIELDS
+                ]
+                for summary in self.build_daily_summaries(transactions)
+            )
+        )
+
+        return users, len(transactions)
+
+    def build_daily_summaries(self, transactions):
+        tz = timezone.get_current_timezone()
+        summary = None
+        for account_id, amount, balance, transaction_type, timestamp in transactions:
+            date = timestamp.astimezone(tz).date()
+            if summary is None or (summary.account_id, summary.date) != (account_id, date):
+                if summary is not None:
+                    yield summary
+                summary = DailyAccountSummary(account_id=account_id, date=date)
+            add_to_summary(summary, transaction_type, amount, balance)
+        if summary is not None:
+            yield summary
+
+    def seed(self, users, transactions_per_account, chunk_size=500,
+             progress=None):
+        """
+        Create ``users`` customers averaging ``transactions_per_account``
+        transactions, ``chunk_size`` customers per DB transaction.
+        """
+        started = time.perf_counter()
+        created = transactions = 0
+
+        while created < users:
+            counts = [
+                self.draw_transaction_count(transactions_per_account)
+                for _ in range(min(chunk_size, users - created))
+            ]
+            _, chunk_transactions = self.create_customers(counts)
+            created += len(counts)
+            transactions += chunk_transactions
+            if progress:
+                progress(created, transactions)
+
+        duration = time.perf_counter() - started
+        return {
+            'users': created,
+            'transactions': transactions,
+            'duration': duration,
+            'transactions_per_second': transactions / duration if duration else 0,
+        }
@@ -0,0 +1,53 @@
+$(document).ready(function () {
+  // Initialize date range picker on the input field
+  $('input[name="daterange"]').daterangepicker({
+    opens: "left",
+    autoApply: true,
+    locale: {
+      format: "YYYY-MM-DD",
+      cancelLabel: "Clear",
+    },
+  });
+
+  // Listen for changes in the date range selection
+  $('input[name="daterange"]').on(
+    "apply.daterangepicker",
+    function (ev, picker) {
+      // Add loading state
+      const submitBtn = document.createElement("div");
+      submitBtn.className = "loading-spinner";
+      $(this).parent().append(submitBtn);
+
+      // Submit the form when date range is applied
+      $(this).closest("form").submit();
+    }
+  );
+
+  // Animate table rows on load
+  $(".transaction-row").each(function (index) {
+    const delay = $(this).data("index") * 100; // 100ms delay between each row
+    $(this).css("animation-delay", delay + "ms");
+  });
+
+  // Add ripple effect to table rows
+  $(".table-body tr").on("click", function (e) {
+    const ripple = $('<span class="table-ripple"></span>');
+    const rect = this.getBoundingClientRect();
+    const size = Math.max(rect.width, rect.height);
+    const x = e.clientX - rect.left - size / 2;
+    const y = e.clientY - rect.top - size / 2;
+
+    ripple.css({
+      width: size,
+      height: size,
+      left: x,
+      top: y,
+    });
+
+    $(this).append(ripple);
+
+    setTimeout(() => {
+      ripple.remove();
+    }, 600);
+  });
+});
@@ -0,0 +1,191 @@
+from django.apps import apps
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.db import fast_bulk_update
+
+from .constants import DEPOSIT, INTEREST, WITHDRAWAL
+
+
+SUMMARY_FIELD_PREFIXES = {
+    DEPOSIT: 'deposit',
+    WITHDRAWAL: 'withdrawal',
+    INTEREST: 'interest',
+}
+
+SUMMARY_FIELDS = [
+    f'{prefix}_{suffix}'
+    for prefix in SUMMARY_FIELD_PREFIXES.values()
+    for suffix in ('amount', 'count')
+] + ['closing_balance']
+
+
+def add_to_summary(summary, transaction_type, amount, balance_after_transaction):
+    prefix = SUMMARY_FIELD_PREFIXES[transaction_type]
+    setattr(
+        summary, f'{prefix}_amount',
+        getattr(summary, f'{prefix}_amount') + amount
+    )
+    setattr(
+        summary, f'{prefix}_count',
+        getattr(summary, f'{prefix}_count') + 1
+    )
+    summary.closing_balance = balance_after_transaction
+
+
+def record_daily_summaries(transactions):
+    """
+    Fold newly created transactions into their ``DailyAccountSummary`` rows.
+
+    Must run in the DB transaction that created ``transactions`` while the
+    accounts are locked by their balance update, so rollups of one account
+    are always applied in posting order.
+    """
+    DailyAccountSummary = apps.get_model('transactions', 'DailyAccountSummary')
+
+    keys = {
+        (transaction.account_id, timezone.localdate(transaction.timestamp))
+        for transaction in transactions
+    }
+    if not keys:
+        return
+
+    summaries = {
+        (summary.account_id, summary.date): summary
+        for summary in DailyAccountSummary.objects.filter(
+            account_id__in={account_id for account_id, _ in keys},
+            date__in={date for _, date in keys}
+        )
+        if (summary.account_id, summary.date) in keys
+    }
+    existing = set(summaries)
+
+    for transaction in transactions:
+        key = (transaction.account_id, timezone.localdate(transaction.timestamp))
+        if key not in summaries:
+            summaries[key] = DailyAccountSummary(
+                account_id=key[0], date=key[1]
+            )
+        add_to_summary(
+            summaries[key],
+            transaction.transaction_type,
+            transaction.amount,
+            transaction.balance_after_transaction
+        )
+
+    fast_bulk_update([summaries[key] for key in existing], SUMMARY_FIELDS)
+    DailyAccountSummary.objects.bulk_create(
+        [summary for key, summary in summaries.items() if key not in existing]
+    )
+
+
+def rebuild_daily_summaries(batch_size=2000):
+    """
+    Recreate every ``DailyAccountSummary`` row from the raw transactions.
+
+    Transactions are streamed in ``(account, timestamp, id)`` index order so
+    each account-day is complete once the stream moves past it. The rows of
+    days whose transactions were archived are kept.
+    """
+    Transaction = apps.get_model('transactions', 'Transaction')
+    DailyAccountSummary = apps.get_model('transactions', 'DailyAccountSummary')
+
+    DailyAccountSummary.objects.exclude(
+        date__lt=F('account__transactions_archived_before')
+    ).delete()
+
+    rows = Transaction.objects.order_by('account', 'timestamp', 'id').values_list(
+        'account_id', 'timestamp', 'transaction_type', 'amount',
+        'balance_after_transaction'
+    ).iterator(chunk_size=batch_size)
+
+    created = 0
+    batch = []
+    summary = None
+
+    for account_id, timestamp, transaction_type, amount, balance in rows:
+        date = timezone.localdate(timestamp)
+        if summary is None or (summary.account_id, summary.date) != (account_id, date):
+            summary = DailyAccountSummary(account_id=account_id, date=date)
+            batch.append(summary)
+            if len(batch) > batch_size:
+                DailyAccountSummary.objects.bulk_create(batch[:-1])
+                created += len(batch) - 1
+                batch = batch[-1:]
+
+        add_to_summary(summary, transaction_type, amount, balance)
+
+    DailyAccountSummary.objects.bulk_create(batch)
+    return created + len(batch)
+
+
+def get_range_querysets(account, start_date=None, end_date=None):
+    """
+    Return the rollups of ``account`` in ``[start_date, end_date)`` and the
+    ones before ``start_date``.
+    """
+    DailyAccountSummary = apps.get_model('transactions', 'DailyAccountSummary')
+
+    summaries = DailyAccountSummary.objects.filter(account=account)
+    before = summaries.none()
+    if start_date:
+        before = summaries.filter(date__lt=start_date)
+        summaries = summaries.filter(date__gte=start_date)
+    if end_date:
+        summaries = summaries.filter(date__lt=end_date)
+
+    return summaries, before
+
+
+def get_range_aggregates():
+    return {
+        'deposits': Sum('deposit_amount'),
+        'deposit_count': Sum('deposit_count'),
+        'withdrawals': Sum('withdrawal_amount'),
+        'withdrawal_count': Sum('withdrawal_count'),
+        'interest': Sum('interest_amount'),
+        'interest_count': Sum('interest_count'),
+    }
+
+
+def get_latest_closing_balance(summaries):
+    return summaries.order_by('-date').values_list(
+        'closing_balance', flat=True
+    )
+
+
+def build_range_summary(totals, opening_balance, closing_balance):
+    totals['count'] = sum(
+        totals.pop(f'{prefix}_count') or 0
+        for prefix in SUMMARY_FIELD_PREFIXES.values()
+    )
+    totals['opening_balance'] = opening_balance or 0
+    totals['closing_balance'] = (
+        totals['opening_balance'] if closing_balance is None
+        else closing_balance
+    )
+    return totals
+
+
+def get_range_summary(account, start_date=None, end_date=None):
+    """
+    Totals, counts and opening/closing balance for ``[start_date, end_date)``
+    read from the daily rollups instead of the raw transactions.
+    """
+    summaries, before = get_range_querysets(account, start_date, end_date)
+
+    return build_range_summary(
+        summaries.aggregate(**get_range_aggregates()),
+        get_latest_closing_balance(before).first(),
+        get_latest_closing_balance(summaries).first()
+    )
+
+
+async def aget_range_summary(account, start_date=None, end_date=None):
+    summaries, before = get_range_querysets(account, start_date, end_date)
+
+    return build_range_summary(
+        await summaries.aaggregate(**get_range_aggregates()),
+        await get_latest_closing_balance(before).afirst(),
+        await get_latest_closing_balance(summaries).afirst()
+    )
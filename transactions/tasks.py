@@ -1,45 +1,49 @@
-from django.utils import timezone
-
-from celery.decorators import task
-
-from accounts.models import UserBankAccount
-from transactions.constants import INTEREST
-from transactions.models import Transaction
-
-
-@task(name="calculate_interest")
-def calculate_interest():
-    accounts = UserBankAccount.objects.filter(
-        balance__gt=0,
-        interest_start_date__gte=timezone.now(),
-        initial_deposit_date__isnull=False
-    ).select_related('account_type')
-
-    this_month = timezone.now().month
-
-    created_transactions = []
-    updated_accounts = []
-
-    for account in accounts:
-        if this_month in account.get_interest_calculation_months():
-            interest = account.account_type.calculate_interest(
-                account.balance
-            )
-            account.balance += interest
-            account.save()
-
-            transaction_obj = Transaction(
-                account=account,
-                transaction_type=INTEREST,
-                amount=interest
-            )
-            created_transactions.append(transaction_obj)
-            updated_accounts.append(account)
-
-    if created_transactions:
-        Transaction.objects.bulk_create(created_transactions)
-
-    if updated_accounts:
-        UserBankAccount.objects.bulk_update(
-            updated_accounts, ['balance']
-        )
+from celery import shared_task
+
+from django.conf import settings
+
+from core.metrics import track_task
+from transactions import interest, partitioning
+
+
+@shared_task(name="calculate_interest")
+def calculate_interest():
+    with track_task('calculate_interest') as task:
+        run = interest.start_interest_run()
+        pending = list(
+            run.shards.filter(completed_at__isnull=True)
+            .values_list('pk', flat=True)
+        )
+        task.rows = interest.get_due_accounts(run.period).count()
+
+        # The shard completing last finishes the run.
+        for shard_id in pending:
+            post_interest_shard.delay(shard_id)
+        if not pending:
+            finish_interest_run.delay(run.pk)
+
+    return run.pk
+
+
+@shared_task(name="post_interest_shard", acks_late=True)
+def post_interest_shard(shard_id):
+    with track_task('post_interest_shard') as task:
+        task.rows = interest.run_interest_shard(shard_id)
+    return task.rows
+
+
+@shared_task(name="finish_interest_run")
+def finish_interest_run(run_id):
+    with track_task('finish_interest_run') as task:
+        task.rows = interest.finish_interest_run(run_id).accounts
+    return task.rows
+
+
+@shared_task(name="create_transaction_partitions")
+def create_transaction_partitions():
+    if not settings.TRANSACTION_PARTITIONING:
+        return 0
+    with track_task('create_transaction_partitions') as task:
+        task.rows = len(partitioning.create_future_partitions())
+    return task.rows
+
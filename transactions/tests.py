@@ -1,3 +1,1399 @@
-from django.test import TestCase
-
-# Create your tests here.
+import base64
+import datetime
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from dateutil.relativedelta import relativedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.db import OperationalError, connection, connections, transaction
+from django.core.management import CommandError, call_command
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from accounts.account_types import account_types
+from accounts.models import BankAccountType, User, UserAddress, UserBankAccount
+from banking_system.celery import app as celery_app
+from core.admin import EstimatedCountPaginator
+from core.db import fast_bulk_insert
+from core.metrics import metrics
+from core.routers import ReplicaRouter
+from core.sessions import mark_refreshed
+from core.views import HomeView
+from transactions import async_views, views
+from transactions.admin import TransactionAdmin
+from transactions.archive import read_year
+from transactions.benchmarks import BenchmarkSuite, compare
+from transactions.constants import DEPOSIT, INTEREST, WITHDRAWAL
+from transactions.forms import TransactionDateRangeForm
+from transactions.interest import (
+    get_due_accounts,
+    post_interest_batch,
+    run_interest_shard,
+    start_interest_run,
+)
+from transactions.managers import InsufficientBalance
+from transactions.models import (
+    DailyAccountSummary,
+    InterestRun,
+    InterestRunShard,
+    Transaction,
+)
+from transactions.pagination import InvalidCursor, KeysetPaginator
+from transactions.partitioning import (
+    create_future_partitions,
+    get_partition_name,
+    get_partitions,
+    is_partitioned,
+    partition_transaction_table,
+)
+from transactions.seeding import (
+    DAILY_SUMMARY_FIELDS,
+    TRANSACTION_FIELDS,
+    BankSeeder,
+)
+from transactions.summaries import get_range_summary
+from transactions.tasks import calculate_interest, create_transaction_partitions
+from transactions.urls import get_urlpatterns
+
+
+class AccountFixtureMixin:
+
+    @classmethod
+    def create_account(cls):
+        cls.account_type = BankAccountType.objects.create(
+            name='Savings',
+            maximum_withdrawal_amount=10000,
+            annual_interest_rate=12,
+            interest_calculation_per_year=12
+        )
+        cls.user = User.objects.create_user(
+            email='customer@example.com',
+            password='test-password'
+        )
+        cls.account = UserBankAccount.objects.create(
+            user=cls.user,
+            account_type=cls.account_type,
+            account_no=1000000001,
+            gender='M'
+        )
+
+
+class AccountTestCase(AccountFixtureMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_account()
+
+    def create_transactions(self, count, account=None, amount=100):
+        return Transaction.objects.bulk_create(
+            Transaction(
+                account=account or self.account,
+                amount=amount,
+                balance_after_transaction=amount * (i + 1),
+                transaction_type=DEPOSIT
+            )
+            for i in range(count)
+        )
+
+
+class TransactionReportQueryPlanTests(AccountTestCase):
+
+    def get_report_querysets(self):
+        """
+        The page queries the report view runs for the first page and for
+        cursors in both directions, built by the view and its paginator.
+        """
+        transaction = self.create_transactions(20)[10]
+        request = RequestFactory().get(
+            reverse('transactions:transaction_report'),
+            {'daterange': '2024-01-01 - 2024-01-31'}
+        )
+        request.user = self.user
+        view = views.TransactionRepostView()
+        view.setup(request)
+        paginator = KeysetPaginator(view.get_queryset(), view.paginate_by)
+
+        for cursor in (
+            None,
+            paginator.encode_cursor(paginator.NEXT, transaction),
+            paginator.encode_cursor(paginator.PREVIOUS, transaction),
+        ):
+            yield paginator.get_page_queryset(
+                *paginator.parse_cursor(cursor)
+            )[:view.paginate_by + 1]
+
+    def test_daterange_is_half_open_and_timezone_aware(self):
+        form = TransactionDateRangeForm({'daterange': '2024-01-01 - 2024-01-31'})
+        self.assertTrue(form.is_valid())
+        start, end = form.cleaned_data['daterange']
+
+        self.assertTrue(timezone.is_aware(start))
+        self.assertEqual(timezone.localtime(start).date().isoformat(), '2024-01-01')
+        self.assertEqual(timezone.localtime(end).date().isoformat(), '2024-02-01')
+        self.assertEqual(timezone.localtime(end).hour, 0)
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite specific plan')
+    def test_sqlite_report_uses_index_range_scan_without_sort(self):
+        for queryset in self.get_report_querysets():
+            plan = queryset.explain()
+
+            self.assertIn('USING INDEX transaction_account_ts_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL specific plan')
+    def test_postgres_report_uses_index_range_scan_without_sort(self):
+        with connection.cursor() as cursor:
+            # The table is tiny in tests, make the planner ignore seq scans
+            # and any plan that needs a sort while one without exists.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+        for queryset in self.get_report_querysets():
+            plan = queryset.explain()
+
+            self.assertIn('transaction_account_ts_idx', plan)
+            self.assertNotIn('Sort', plan)
+
+
+class KeysetPaginatorTests(AccountTestCase):
+
+    def setUp(self):
+        self.transactions = self.create_transactions(5)
+        self.paginator = KeysetPaginator(
+            Transaction.objects.filter(account=self.account), 2
+        )
+
+    def get_pks(self, page):
+        return [transaction.pk for transaction in page]
+
+    def test_next_and_previous_cursors(self):
+        pks = [transaction.pk for transaction in self.transactions]
+
+        first = self.paginator.page()
+        self.assertEqual(self.get_pks(first), pks[:2])
+        self.assertFalse(first.has_previous())
+
+        second = self.paginator.page(first.next_cursor)
+        self.assertEqual(self.get_pks(second), pks[2:4])
+        self.assertTrue(second.has_previous())
+
+        last = self.paginator.page(second.next_cursor)
+        self.assertEqual(self.get_pks(last), pks[4:])
+        self.assertFalse(last.has_next())
+
+        self.assertEqual(
+            self.get_pks(self.paginator.page(last.previous_cursor)), pks[2:4]
+        )
+        back = self.paginator.page(second.previous_cursor)
+        self.assertEqual(self.get_pks(back), pks[:2])
+        self.assertFalse(back.has_previous())
+
+    def test_timestamp_ties_are_ordered_by_id(self):
+        Transaction.objects.update(timestamp=timezone.now())
+        pks = sorted(transaction.pk for transaction in self.transactions)
+
+        pages = [self.paginator.page()]
+        while pages[-1].has_next():
+            pages.append(self.paginator.page(pages[-1].next_cursor))
+        self.assertEqual(
+            [pk for page in pages for pk in self.get_pks(page)], pks
+        )
+
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.paginator.page(page.previous_cursor)
+            self.assertEqual(self.get_pks(page), self.get_pks(expected))
+
+    def test_invalid_cursor(self):
+        cursors = ['nope'] + [
+            base64.urlsafe_b64encode(raw.encode()).decode()
+            for raw in (
+                'n|yesterday|1',
+                'x|2024-01-01T00:00:00+00:00|1',
+                'n|2024-01-01T00:00:00+00:00|one',
+            )
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    self.paginator.page(cursor)
+
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('transactions:transaction_report'), {'cursor': 'nope'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TransactionReportRenderTests(AccountTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_rows_are_served_from_the_fragment_cache(self):
+        transactions = self.create_transactions(3)
+        path = reverse('transactions:transaction_report')
+        self.assertContains(self.client.get(path), 'KES 100.00')
+
+        # Posted transactions never change, edit one behind the cache's back.
+        Transaction.objects.filter(pk=transactions[0].pk).update(amount=7)
+        self.assertNotContains(self.client.get(path), 'KES 7.00')
+
+        # A new transaction changes the last row and so the cache key.
+        self.create_transactions(1, amount=200)
+        response = self.client.get(path)
+        self.assertContains(response, 'KES 7.00')
+        self.assertContains(response, 'KES 200.00')
+
+    def test_empty_report(self):
+        response = self.client.get(reverse('transactions:transaction_report'))
+        self.assertContains(response, 'class="empty-state"')
+
+    def test_styles_and_scripts_are_static_files(self):
+        response = self.client.get(reverse('transactions:transaction_report'))
+        self.assertContains(response, 'transactions/css/transaction_report.css')
+        self.assertContains(response, 'transactions/js/transaction_report.js')
+        self.assertNotContains(response, '<style')
+
+
+class TransactionExportViewTests(AccountTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_csv_export_is_streamed(self):
+        self.create_transactions(3)
+        response = self.client.get(
+            reverse('transactions:transaction_export'), {'format': 'csv'}
+        )
+
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0], 'timestamp,transaction_type,amount,balance_after_transaction'
+        )
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[-1].endswith(',Deposit,100.00,300.00'))
+
+    def test_ndjson_export_respects_daterange(self):
+        self.create_transactions(2)
+        response = self.client.get(
+            reverse('transactions:transaction_export'),
+            {'format': 'ndjson', 'daterange': '2000-01-01 - 2000-01-31'}
+        )
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(b''.join(response.streaming_content), b'')
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(
+            reverse('transactions:transaction_export'), {'format': 'xml'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TransactionPostingTests(AccountTestCase):
+
+    def test_post_returns_balance_after_transaction(self):
+        deposit = Transaction.objects.post(self.account, Decimal('500'), DEPOSIT)
+        withdrawal = Transaction.objects.post(
+            self.account, Decimal('120.50'), WITHDRAWAL
+        )
+
+        self.assertEqual(deposit.balance_after_transaction, Decimal('500.00'))
+        self.assertEqual(withdrawal.balance_after_transaction, Decimal('379.50'))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('379.50'))
+
+    def test_overdraft_is_rejected_without_side_effects(self):
+        Transaction.objects.post(self.account, Decimal('100'), DEPOSIT)
+
+        with self.assertRaises(InsufficientBalance):
+            Transaction.objects.post(self.account, Decimal('100.01'), WITHDRAWAL)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('100.00'))
+        self.assertEqual(self.account.transactions.count(), 1)
+
+    def test_first_deposit_sets_interest_dates(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('transactions:deposit_money'), {'amount': '1000'}
+        )
+
+        self.assertRedirects(response, reverse('transactions:transaction_report'))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1000.00'))
+        self.assertIsNotNone(self.account.initial_deposit_date)
+        self.assertIsNotNone(self.account.interest_start_date)
+        self.assertEqual(
+            self.account.next_interest_date,
+            self.account.interest_start_date.replace(day=1)
+        )
+
+    def test_withdraw_view_rejects_overdraft(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('transactions:withdraw_money'), {'amount': '200'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Transaction.objects.exists())
+
+
+class ConcurrentWithdrawalTests(AccountFixtureMixin, TransactionTestCase):
+    workers = 8
+    withdrawals = 200
+
+    def setUp(self):
+        self.create_account()
+        UserBankAccount.objects.filter(pk=self.account.pk).update(balance=15000)
+
+    def withdraw(self, _):
+        try:
+            while True:
+                try:
+                    Transaction.objects.post(self.account, Decimal('100'), WITHDRAWAL)
+                    return True
+                except InsufficientBalance:
+                    return False
+                except OperationalError:
+                    # SQLite reports lock contention instead of waiting.
+                    time.sleep(0.001)
+        finally:
+            connections.close_all()
+
+    def test_parallel_withdrawals_never_lose_updates_or_overdraw(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self.withdraw, range(self.withdrawals)))
+
+        self.account.refresh_from_db()
+        self.assertEqual(results.count(True), 150)
+        self.assertEqual(self.account.balance, Decimal('0.00'))
+        self.assertEqual(
+            self.account.transactions.filter(transaction_type=WITHDRAWAL).count(),
+            150
+        )
+
+
+class InterestPostingTests(AccountTestCase):
+
+    def setUp(self):
+        UserBankAccount.objects.filter(pk=self.account.pk).update(
+            balance=1000,
+            initial_deposit_date=datetime.date(2024, 1, 1),
+            interest_start_date=datetime.date(2024, 2, 1),
+            next_interest_date=datetime.date(2024, 2, 1)
+        )
+
+    def post_batch(self, today):
+        with transaction.atomic():
+            return post_interest_batch(
+                get_due_accounts(today), 0, 1000, account_types.as_dict()
+            )
+
+    def test_due_accounts_are_posted_in_chunks(self):
+        run = start_interest_run(today=datetime.date(2024, 3, 1))
+
+        self.assertEqual(run_interest_shard(run.shards.get().pk, chunk_size=1), 1)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('1010.00'))
+        interest = self.account.transactions.get()
+        self.assertEqual(interest.transaction_type, INTEREST)
+        self.assertEqual(interest.amount, Decimal('10.00'))
+        self.assertEqual(interest.balance_after_transaction, Decimal('1010.00'))
+        self.assertEqual(self.account.next_interest_date, datetime.date(2024, 3, 1))
+        run.refresh_from_db()
+        self.assertEqual(run.accounts, 1)
+
+    def test_posting_is_not_repeated_before_next_interest_date(self):
+        self.assertEqual(self.post_batch(datetime.date(2024, 2, 1))[:2], (1, 1))
+        scanned, posted, last_pk = self.post_batch(datetime.date(2024, 2, 15))
+
+        self.assertEqual(scanned, 0)
+        self.assertEqual(self.account.transactions.count(), 1)
+
+    def test_accounts_before_interest_start_are_skipped(self):
+        scanned, posted, last_pk = self.post_batch(datetime.date(2024, 1, 15))
+
+        self.assertEqual(posted, 0)
+        self.assertFalse(self.account.transactions.exists())
+
+
+class ShardedInterestRunTests(AccountTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(2, 6):
+            user = User.objects.create_user(
+                email=f'customer{i}@example.com', password='test-password'
+            )
+            UserBankAccount.objects.create(
+                user=user,
+                account_type=cls.account_type,
+                account_no=1000000000 + i,
+                gender='F'
+            )
+        UserBankAccount.objects.update(
+            balance=1000,
+            initial_deposit_date=datetime.date(2024, 1, 1),
+            interest_start_date=datetime.date(2024, 1, 1),
+            next_interest_date=datetime.date(2024, 3, 1)
+        )
+
+    def setUp(self):
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+
+    def run_job(self):
+        with override_settings(INTEREST_SHARD_SIZE=2):
+            with mock.patch(
+                'django.utils.timezone.localdate',
+                return_value=datetime.date(2024, 3, 1)
+            ):
+                return InterestRun.objects.get(pk=calculate_interest.delay().get())
+
+    def test_run_is_sharded_and_summarised(self):
+        run = self.run_job()
+
+        self.assertEqual(run.shard_count, 3)
+        self.assertEqual(run.accounts, 5)
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(
+            Transaction.objects.filter(transaction_type=INTEREST).count(), 5
+        )
+
+    def test_last_shard_finishes_run(self):
+        with mock.patch('transactions.tasks.post_interest_shard.delay'):
+            run = self.run_job()
+        shards = list(run.shards.order_by('min_pk'))
+
+        for shard in shards[:-1]:
+            run_interest_shard(shard.pk)
+            run.refresh_from_db()
+            self.assertIsNone(run.finished_at)
+
+        run_interest_shard(shards[-1].pk)
+        run.refresh_from_db()
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(run.accounts, 5)
+
+    def test_run_reports_metrics(self):
+        metrics.reset()
+        self.run_job()
+
+        output = metrics.render()
+        self.assertIn(
+            'task_rows_processed_total{task="post_interest_shard"} 5', output
+        )
+        self.assertIn(
+            'task_rows_processed_total{task="calculate_interest"} 5', output
+        )
+        self.assertIn(
+            'task_duration_seconds_count{task="post_interest_shard",'
+            'state="success"} 3', output
+        )
+        self.assertIn(
+            'interest_run_accounts{period="2024-03-01"} 5', output
+        )
+        self.assertIn(
+            'interest_run_shards_pending{period="2024-03-01"} 0', output
+        )
+
+    def test_retried_run_resumes_without_double_posting(self):
+        with mock.patch(
+            'transactions.tasks.post_interest_shard.delay',
+            side_effect=RuntimeError('worker lost')
+        ):
+            with self.assertRaises(RuntimeError):
+                self.run_job()
+
+        # One shard completed before the crash.
+        first_shard = InterestRunShard.objects.order_by('min_pk').first()
+        run_interest_shard(first_shard.pk)
+
+        run = self.run_job()
+        self.run_job()
+
+        self.assertEqual(run.accounts, 5)
+        self.assertEqual(
+            Transaction.objects.filter(transaction_type=INTEREST).count(), 5
+        )
+        self.assertEqual(
+            set(UserBankAccount.objects.values_list('balance', flat=True)),
+            {Decimal('1010.00')}
+        )
+
+
+class DailyAccountSummaryTests(AccountTestCase):
+
+    def post_transactions(self):
+        Transaction.objects.post(self.account, Decimal('500'), DEPOSIT)
+        Transaction.objects.post(self.account, Decimal('200'), DEPOSIT)
+        Transaction.objects.post(self.account, Decimal('150'), WITHDRAWAL)
+
+    def get_summary_values(self):
+        return list(DailyAccountSummary.objects.values(
+            'account', 'date', 'deposit_amount', 'deposit_count',
+            'withdrawal_amount', 'withdrawal_count', 'closing_balance'
+        ))
+
+    def test_postings_update_rollup(self):
+        self.post_transactions()
+
+        summary = DailyAccountSummary.objects.get()
+        self.assertEqual(summary.date, timezone.localdate())
+        self.assertEqual(summary.deposit_amount, Decimal('700.00'))
+        self.assertEqual(summary.deposit_count, 2)
+        self.assertEqual(summary.withdrawal_amount, Decimal('150.00'))
+        self.assertEqual(summary.withdrawal_count, 1)
+        self.assertEqual(summary.closing_balance, Decimal('550.00'))
+
+    def test_range_summary_reads_rollups(self):
+        self.post_transactions()
+        today = timezone.localdate()
+
+        # Totals, opening balance and closing balance.
+        with self.assertNumQueries(3):
+            totals = get_range_summary(
+                self.account, today, today + datetime.timedelta(days=1)
+            )
+
+        self.assertEqual(totals['count'], 3)
+        self.assertEqual(totals['deposits'], Decimal('700.00'))
+        self.assertEqual(totals['opening_balance'], 0)
+        self.assertEqual(totals['closing_balance'], Decimal('550.00'))
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.post_transactions()
+        incremental = self.get_summary_values()
+
+        call_command('rebuild_daily_summaries', stdout=mock.Mock())
+
+        self.assertEqual(self.get_summary_values(), incremental)
+
+
+class TransactionPartitioningTests(AccountTestCase):
+
+    def test_command_needs_setting(self):
+        with self.assertRaisesMessage(CommandError, 'TRANSACTION_PARTITIONING'):
+            call_command('partition_transactions')
+
+    def test_future_partitions_need_setting(self):
+        self.assertEqual(create_future_partitions(), [])
+        self.assertEqual(create_transaction_partitions(), 0)
+
+    @override_settings(TRANSACTION_PARTITIONING=True)
+    def test_future_partitions_need_partitioned_table(self):
+        self.assertEqual(create_future_partitions(), [])
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL partitioning')
+    def test_partition_and_prune(self):
+        today = timezone.localdate()
+        months = [
+            today.replace(day=1) - relativedelta(months=months_ago)
+            for months_ago in (2, 1, 0)
+        ]
+        fast_bulk_insert(Transaction, TRANSACTION_FIELDS, [
+            (self.account.pk, 100, 100 * (i + 1), DEPOSIT, timezone.make_aware(
+                datetime.datetime.combine(month, datetime.time(12))
+            ))
+            for i, month in enumerate(months)
+        ])
+
+        partition_transaction_table(
+            months_ahead=1, batch_size=2, log=lambda message: None
+        )
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual(Transaction.objects.count(), 3)
+        self.assertTrue(
+            {get_partition_name(month) for month in months} <= get_partitions()
+        )
+
+        # Postings carry on with the next id, in this month's partition.
+        posted = Transaction.objects.post(self.account, Decimal('50'), DEPOSIT)
+        self.assertGreater(posted.pk, max(
+            Transaction.objects.exclude(pk=posted.pk).values_list('pk', flat=True)
+        ))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT tableoid::regclass::text FROM transactions_transaction '
+                'WHERE id = %s', [posted.pk]
+            )
+            self.assertEqual(cursor.fetchone()[0], get_partition_name(months[-1]))
+
+        form = TransactionDateRangeForm({
+            'daterange': f'{months[0]:%Y-%m-%d} - {months[0]:%Y-%m-%d}'
+        })
+        self.assertTrue(form.is_valid())
+        start, end = form.cleaned_data['daterange']
+        plan = Transaction.objects.filter(
+            account=self.account, timestamp__gte=start, timestamp__lt=end
+        ).order_by('timestamp', 'id')[:51].explain()
+        self.assertIn(get_partition_name(months[0]), plan)
+        self.assertNotIn(get_partition_name(months[1]), plan)
+
+        # Partitions of the coming months are created once, when enabled.
+        later = today + relativedelta(months=3)
+        self.assertEqual(create_future_partitions(months_ahead=1, today=later), [])
+        with override_settings(TRANSACTION_PARTITIONING=True):
+            self.assertEqual(
+                create_future_partitions(months_ahead=1, today=later),
+                [
+                    get_partition_name(
+                        later.replace(day=1) + relativedelta(months=i)
+                    )
+                    for i in range(2)
+                ]
+            )
+            self.assertEqual(
+                create_future_partitions(months_ahead=1, today=later), []
+            )
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL partitioning')
+    def test_changes_during_copy_survive_swap(self):
+        transactions = self.create_transactions(4)
+        changed = []
+
+        def log(message):
+            # Archiving and postings carry on once the rows are copied.
+            if not changed:
+                Transaction.objects.filter(
+                    pk__in=[t.pk for t in transactions[:2]]
+                ).delete()
+                changed.append(
+                    Transaction.objects.post(self.account, Decimal('50'), DEPOSIT)
+                )
+
+        partition_transaction_table(months_ahead=0, log=log)
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual(
+            set(Transaction.objects.values_list('pk', flat=True)),
+            {t.pk for t in transactions[2:]} | {changed[0].pk}
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM transactions_transaction_unpartitioned'
+            )
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+
+class TransactionArchiveTests(AccountTestCase):
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        archive_root = override_settings(TRANSACTION_ARCHIVE_ROOT=directory.name)
+        archive_root.enable()
+        self.addCleanup(archive_root.disable)
+        self.client.force_login(self.user)
+        session = self.client.session
+        mark_refreshed(session)
+        session.save()
+
+        today = timezone.localdate()
+        self.years = (today.year - 2, today.year - 1)
+        noon = datetime.time(12)
+        # 40 transactions two years ago, 20 last year and 10 today.
+        timestamps = [
+            timezone.make_aware(datetime.datetime.combine(
+                datetime.date(year, 1, 1) + datetime.timedelta(days=7 * i),
+                noon
+            ))
+            for year, count in zip(self.years, (40, 20))
+            for i in range(count)
+        ] + [
+            timezone.make_aware(datetime.datetime.combine(today, noon))
+            + datetime.timedelta(seconds=i)
+            for i in range(10)
+        ]
+        fast_bulk_insert(Transaction, TRANSACTION_FIELDS, [
+            (self.account.pk, 100, 100 * (i + 1), DEPOSIT, timestamp)
+            for i, timestamp in enumerate(timestamps)
+        ])
+        UserBankAccount.objects.filter(pk=self.account.pk).update(
+            initial_deposit_date=timestamps[0].date()
+        )
+        self.expected = list(Transaction.objects.values_list(
+            'pk', 'timestamp', 'amount', 'balance_after_transaction'
+        ))
+        # Small chunks, so the rows of a year span several fetches.
+        with mock.patch('transactions.archive.ARCHIVE_CHUNK_SIZE', 7):
+            call_command(
+                'archive_transactions', before_year=today.year,
+                stdout=mock.Mock()
+            )
+
+    def get_report(self, **params):
+        response = self.client.get(
+            reverse('transactions:transaction_report'), params
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_old_years_are_moved_to_archive_files(self):
+        self.account.refresh_from_db()
+        self.assertEqual(
+            self.account.transactions_archived_before,
+            datetime.date(timezone.localdate().year, 1, 1)
+        )
+        self.assertEqual(Transaction.objects.count(), 10)
+        self.assertEqual(
+            [len(read_year(self.account.pk, year)) for year in self.years],
+            [40, 20]
+        )
+
+        # Running again moves nothing.
+        stdout = mock.Mock()
+        call_command('archive_transactions', stdout=stdout)
+        self.assertIn('Archived 0 transactions', stdout.write.call_args[0][0])
+
+    @mock.patch.object(views.TransactionRepostView, 'paginate_by', 13)
+    def test_report_pages_through_archive_and_table(self):
+        # Session, user, latest transaction, totals and closing balance,
+        # the page itself is read from the archive.
+        with self.assertNumQueries(5):
+            page = self.get_report()
+
+        pages = [list(page)]
+        while page.has_next():
+            page = self.get_report(cursor=page.next_cursor)
+            pages.append(list(page))
+        rows = [row for rows in pages for row in rows]
+        self.assertEqual(
+            [
+                (row.pk, row.timestamp, row.amount, row.balance_after_transaction)
+                for row in rows
+            ],
+            self.expected
+        )
+        self.assertEqual(rows[0].get_transaction_type_display(), 'Deposit')
+
+        # Back from the last page, which starts in the table, through a
+        # page of archived and table rows.
+        for rows in reversed(pages[:-1]):
+            page = self.get_report(cursor=page.previous_cursor)
+            self.assertEqual(list(page), rows)
+        self.assertFalse(page.has_previous())
+
+    def test_report_daterange_in_archive(self):
+        year = self.years[0]
+        page = self.get_report(daterange=f'{year}-03-01 - {year}-03-31')
+        self.assertEqual(
+            [row.pk for row in page],
+            [
+                pk for pk, timestamp, *_ in self.expected
+                if timezone.localdate(timestamp).year == year
+                and timezone.localdate(timestamp).month == 3
+            ]
+        )
+
+    def test_export_includes_archive(self):
+        response = self.client.get(
+            reverse('transactions:transaction_export'), {'format': 'csv'}
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 71)
+        self.assertTrue(lines[1].endswith(',Deposit,100.00,100.00'))
+        self.assertTrue(lines[-1].endswith(',Deposit,100.00,7000.00'))
+
+    def test_rebuild_keeps_archived_summaries(self):
+        archived = DailyAccountSummary.objects.create(
+            account=self.account, date=datetime.date(self.years[0], 1, 1),
+            deposit_amount=100, deposit_count=1, closing_balance=100
+        )
+        call_command('rebuild_daily_summaries', stdout=mock.Mock())
+
+        self.assertEqual(
+            list(DailyAccountSummary.objects.values_list('date', 'deposit_count')),
+            [(archived.date, 1), (timezone.localdate(), 10)]
+        )
+
+    def test_current_year_can_not_be_archived(self):
+        with self.assertRaisesMessage(CommandError, 'Only past years'):
+            call_command(
+                'archive_transactions',
+                before_year=timezone.localdate().year + 1,
+                stdout=mock.Mock()
+            )
+
+
+class TransactionAdminTests(AccountTestCase):
+
+    def setUp(self):
+        admin_user = User.objects.create_superuser(
+            email='admin@example.com', password='test-password'
+        )
+        self.client.force_login(admin_user)
+        self.path = reverse('admin:transactions_transaction_changelist')
+
+    def get_changelist(self, query_string=''):
+        response = self.client.get(self.path + query_string)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    @mock.patch.object(TransactionAdmin, 'list_per_page', 10)
+    def test_changelist_pages_on_primary_key(self):
+        self.create_transactions(25)
+        cl = self.get_changelist().context['cl']
+        self.assertEqual(cl.result_count, 25)
+        self.assertIsNone(cl.first_page_url)
+
+        pages = [[obj.pk for obj in cl.result_list]]
+        while cl.next_page_url:
+            cl = self.get_changelist(cl.next_page_url).context['cl']
+            pages.append([obj.pk for obj in cl.result_list])
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [pk for page in pages for pk in page],
+            list(Transaction.objects.order_by('-pk').values_list('pk', flat=True))
+        )
+        self.assertEqual(cl.first_page_url, '?')
+
+    def test_accounts_are_joined_not_queried_per_row(self):
+        self.create_transactions(2)
+        # The first request after logging in saves the session.
+        self.get_changelist()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_changelist()
+
+        self.create_transactions(20)
+        with self.assertNumQueries(len(queries)):
+            self.get_changelist()
+
+    def test_date_hierarchy_reads_first_and_last_date(self):
+        fast_bulk_insert(Transaction, TRANSACTION_FIELDS, [
+            (self.account.pk, 100, 100, DEPOSIT, timezone.make_aware(
+                datetime.datetime(year, month, 15, 12)
+            ))
+            for year, month in ((2022, 3), (2024, 1))
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_changelist()
+        self.assertFalse(
+            [query for query in queries if 'DISTINCT' in query['sql']]
+        )
+        for year in (2022, 2023, 2024):
+            self.assertContains(response, f'?timestamp__year={year}"')
+
+        response = self.get_changelist('?timestamp__year=2022')
+        self.assertContains(response, '?timestamp__month=3&amp;')
+        self.assertNotContains(response, '?timestamp__month=4&amp;')
+
+    def test_search_by_account_number(self):
+        self.create_transactions(2)
+        other_user = User.objects.create_user(
+            email='other@example.com', password='test-password'
+        )
+        other_account = UserBankAccount.objects.create(
+            user=other_user, account_type=self.account_type,
+            account_no=1000000002, gender='F'
+        )
+        self.create_transactions(3, account=other_account)
+
+        cl = self.get_changelist('?q=1000000002').context['cl']
+        self.assertEqual(
+            {obj.account_id for obj in cl.result_list}, {other_account.pk}
+        )
+        self.assertEqual(cl.result_count, 3)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL estimates')
+    def test_large_tables_are_counted_from_estimate(self):
+        self.create_transactions(3)
+        paginator = EstimatedCountPaginator(Transaction.objects.all(), 10)
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.estimated)
+
+        with mock.patch.object(EstimatedCountPaginator, 'exact_count_limit', -1):
+            paginator = EstimatedCountPaginator(Transaction.objects.all(), 10)
+            with CaptureQueriesContext(connection) as queries:
+                paginator.count
+        self.assertTrue(paginator.estimated)
+        self.assertFalse(
+            [query for query in queries if 'COUNT(' in query['sql']]
+        )
+
+
+class ViewQueryCountTests(AccountTestCase):
+    """
+    Guard the number of queries per view. The first two queries of every
+    request load the session and the user with account and account type.
+    """
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        # A recently saved session is not saved again.
+        session = self.client.session
+        mark_refreshed(session)
+        session.save()
+        Transaction.objects.post(self.account, Decimal('1000'), DEPOSIT)
+        # Account types are served from the warm process cache.
+        account_types.as_dict()
+
+    def test_transaction_report(self):
+        # Latest transaction, page, totals and closing balance.
+        with self.assertNumQueries(6):
+            self.client.get(reverse('transactions:transaction_report'))
+
+    def test_transaction_report_with_daterange(self):
+        # Adds the opening balance lookup.
+        with self.assertNumQueries(7):
+            self.client.get(
+                reverse('transactions:transaction_report'),
+                {'daterange': '2024-01-01 - 2024-01-31'}
+            )
+
+    def test_transaction_export(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('transactions:transaction_export'))
+            b''.join(response.streaming_content)
+
+    def test_deposit_form(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('transactions:deposit_money'))
+
+    def test_deposit(self):
+        # Balance update, insert, rollup, first deposit dates and the
+        # session saved pinned to the primary.
+        with self.assertNumQueries(14):
+            self.client.post(
+                reverse('transactions:deposit_money'), {'amount': '500'}
+            )
+
+    def test_withdraw_form(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('transactions:withdraw_money'))
+
+    def test_withdraw(self):
+        with self.assertNumQueries(11):
+            self.client.post(
+                reverse('transactions:withdraw_money'), {'amount': '200'}
+            )
+
+
+class ConditionalHistoryTests(AccountTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        mark_refreshed(session)
+        session.save()
+        Transaction.objects.post(self.account, Decimal('1000'), DEPOSIT)
+
+    def get_revalidated(self, path, response, data=None):
+        return self.client.get(
+            path, data, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+    def test_unchanged_report_is_not_modified(self):
+        path = reverse('transactions:transaction_report')
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+
+        # Session, user and latest transaction, no list query or render.
+        with self.assertNumQueries(3):
+            revalidated = self.get_revalidated(path, response)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_new_release_changes_validators(self):
+        path = reverse('transactions:transaction_report')
+        response = self.client.get(path)
+
+        with override_settings(RELEASE_VERSION='next'):
+            revalidated = self.get_revalidated(path, response)
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+
+    def test_new_transaction_changes_validators(self):
+        path = reverse('transactions:transaction_report')
+        response = self.client.get(path)
+        Transaction.objects.post(self.account, Decimal('200'), WITHDRAWAL)
+
+        revalidated = self.get_revalidated(path, response)
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+
+    def test_validators_depend_on_daterange(self):
+        path = reverse('transactions:transaction_report')
+        response = self.client.get(path)
+        revalidated = self.get_revalidated(
+            path, response, {'daterange': '2024-01-01 - 2024-01-31'}
+        )
+        self.assertEqual(revalidated.status_code, 200)
+
+    def test_pending_messages_are_rendered(self):
+        self.client.post(
+            reverse('transactions:deposit_money'), {'amount': '500'}
+        )
+        response = self.client.get(reverse('transactions:transaction_report'))
+        self.assertContains(response, 'was deposited')
+        self.assertNotIn('ETag', response)
+
+    def test_unchanged_export_is_not_modified(self):
+        path = reverse('transactions:transaction_export')
+        response = self.client.get(path, {'format': 'ndjson'})
+        b''.join(response.streaming_content)
+
+        revalidated = self.get_revalidated(path, response, {'format': 'ndjson'})
+        self.assertEqual(revalidated.status_code, 304)
+        revalidated = self.get_revalidated(path, response, {'format': 'csv'})
+        self.assertEqual(revalidated.status_code, 200)
+
+
+class IngestTransactionsCommandTests(AccountTestCase):
+
+    def ingest(self, content, suffix):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, f'batch.{suffix}')
+        with open(path, 'w') as file:
+            file.write(content)
+
+        call_command(
+            'ingest_transactions', path, chunk_size=2, stdout=mock.Mock()
+        )
+        with open(f'{path}.rejects.csv') as file:
+            return file.read().splitlines()[1:]
+
+    def test_csv_batch_is_posted_and_invalid_rows_rejected(self):
+        rejects = self.ingest(
+            'account_no,amount\n'
+            f'{self.account.account_no},150\n'
+            f'{self.account.account_no},99\n'
+            '42,500\n'
+            f'{self.account.account_no},250.50\n'
+            f'{self.account.account_no},abc\n',
+            'csv'
+        )
+
+        self.assertEqual(rejects, [
+            '3,1000000001,99,Amount is below the minimum deposit of 100',
+            '4,42,500,Unknown account',
+            '6,1000000001,abc,Invalid amount',
+        ])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('400.50'))
+        self.assertIsNotNone(self.account.next_interest_date)
+        self.assertEqual(
+            list(self.account.transactions.values_list(
+                'balance_after_transaction', flat=True
+            )),
+            [Decimal('150.00'), Decimal('400.50')]
+        )
+        self.assertEqual(
+            DailyAccountSummary.objects.get().closing_balance, Decimal('400.50')
+        )
+
+    def test_ndjson_batch(self):
+        rejects = self.ingest(
+            f'{{"account_no": {self.account.account_no}, "amount": "100"}}\n'
+            'not json\n',
+            'ndjson'
+        )
+
+        self.assertEqual(rejects, ['2,,,Invalid account number'])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('100.00'))
+
+    def test_oversized_amounts_are_rejected(self):
+        self.account.balance = Decimal('9999999000.00')
+        self.account.save()
+
+        rejects = self.ingest(
+            'account_no,amount\n'
+            f'{self.account.account_no},100000000000\n'
+            f'{self.account.account_no},500\n'
+            f'{self.account.account_no},999.99\n'
+            f'{self.account.account_no},100\n',
+            'csv'
+        )
+
+        self.assertEqual(rejects, [
+            '2,1000000001,100000000000,'
+            'Amount is above the maximum of 9999999999.99',
+            '4,1000000001,999.99,Balance would exceed the maximum',
+        ])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('9999999600.00'))
+
+
+class SeedBankTests(TestCase):
+
+    def get_summary_values(self):
+        return list(DailyAccountSummary.objects.order_by(
+            'account', 'date'
+        ).values_list(*DAILY_SUMMARY_FIELDS))
+
+    def test_seeded_data_is_consistent(self):
+        call_command(
+            'seed_bank', users=20, transactions=30, seed=1, chunk_size=8,
+            stdout=mock.Mock()
+        )
+
+        self.assertEqual(UserBankAccount.objects.count(), 20)
+        self.assertEqual(UserAddress.objects.count(), 20)
+        for account in UserBankAccount.objects.all():
+            last = account.transactions.order_by('timestamp', 'id').last()
+            if last is None:
+                self.assertEqual(account.balance, 0)
+                continue
+            self.assertEqual(account.balance, last.balance_after_transaction)
+            self.assertGreater(
+                account.account_no, settings.ACCOUNT_NUMBER_START_FROM
+            )
+            self.assertGreater(account.next_interest_date, timezone.localdate())
+        self.assertFalse(Transaction.objects.filter(
+            balance_after_transaction__lt=0
+        ).exists())
+
+        seeded = self.get_summary_values()
+        call_command('rebuild_daily_summaries', stdout=mock.Mock())
+        self.assertEqual(self.get_summary_values(), seeded)
+
+    def test_same_seed_generates_same_history(self):
+        now = timezone.now()
+
+        def history(seed):
+            user, = BankSeeder(seed=seed, now=now).create_customers([50])[0]
+            return list(user.account.transactions.values_list(
+                'transaction_type', 'amount', 'timestamp'
+            ))
+
+        self.assertEqual(history(1), history(1))
+        self.assertNotEqual(history(1), history(2))
+
+
+class BenchmarkSuiteTests(TransactionTestCase):
+    # Concurrent withdrawals run on other connections, which only see
+    # committed data.
+
+    def test_run(self):
+        results = BenchmarkSuite(
+            history_sizes=[5, 20], customers=3, transactions=5, repeat=2
+        ).run()
+
+        self.assertEqual(results['database'], connection.vendor)
+        self.assertEqual(sorted(results['benchmarks']), [
+            'calculate_interest',
+            'concurrent_withdrawals_8_threads',
+            'deposit',
+            'export_csv_20',
+            'export_ndjson_20',
+            'registration',
+            'report_20',
+            'report_20_last_30_days',
+            'report_5',
+            'report_5_last_30_days',
+            'withdraw',
+        ])
+        self.assertEqual(results['benchmarks']['deposit']['runs'], 2)
+        self.assertEqual(
+            results['benchmarks']['concurrent_withdrawals_8_threads']['runs'], 1
+        )
+        median = results['benchmarks']['report_5']['median_ms']
+        self.assertIn(('report_5', median, median, 0), compare(results, results))
+
+
+urlpatterns = [
+    path('', HomeView.as_view(), name='home'),
+    path('accounts/', include('accounts.urls', namespace='accounts')),
+    path(
+        'transactions/',
+        include((get_urlpatterns(async_views), 'transactions'))
+    ),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncTransactionViewTests(AccountTestCase):
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+
+    def test_middleware_keeps_views_async(self):
+        # Django adapts the chain below a sync-only middleware, running the
+        # async views through async_to_sync on a thread.
+        with mock.patch('django.core.handlers.base.logger') as logger:
+            ASGIHandler()
+        self.assertEqual(logger.debug.call_args_list, [])
+
+    async def test_anonymous_user_is_redirected_to_login(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get(
+            reverse('transactions:transaction_report')
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith('/accounts/login/'))
+
+    async def test_report(self):
+        await Transaction.objects.abulk_create(
+            Transaction(
+                account=self.account,
+                amount=100,
+                balance_after_transaction=100 * (i + 1),
+                transaction_type=DEPOSIT
+            )
+            for i in range(60)
+        )
+        response = await self.async_client.get(
+            reverse('transactions:transaction_report')
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['object_list']), 50)
+        self.assertTrue(response.context['page_obj'].has_next())
+
+        response = await self.async_client.get(
+            reverse('transactions:transaction_report'),
+            {'cursor': response.context['page_obj'].next_cursor}
+        )
+        self.assertEqual(len(response.context['object_list']), 10)
+
+    async def test_unchanged_report_is_not_modified(self):
+        path = reverse('transactions:transaction_report')
+        response = await self.async_client.get(path)
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.get(
+            path, headers={'if-none-match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_report_with_invalid_cursor(self):
+        response = await self.async_client.get(
+            reverse('transactions:transaction_report'), {'cursor': 'nope'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_deposit_and_withdraw(self):
+        response = await self.async_client.get(
+            reverse('transactions:deposit_money')
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.post(
+            reverse('transactions:deposit_money'), {'amount': '500'}
+        )
+        self.assertRedirects(
+            response, reverse('transactions:transaction_report'),
+            fetch_redirect_response=False
+        )
+        response = await self.async_client.post(
+            reverse('transactions:withdraw_money'), {'amount': '200'}
+        )
+        self.assertEqual(response.status_code, 302)
+
+        account = await UserBankAccount.objects.aget(pk=self.account.pk)
+        self.assertEqual(account.balance, Decimal('300.00'))
+        self.assertIsNotNone(account.next_interest_date)
+
+        response = await self.async_client.get(
+            reverse('transactions:transaction_report')
+        )
+        totals = response.context['totals']
+        self.assertEqual(totals['deposits'], Decimal('500'))
+        self.assertEqual(totals['withdrawals'], Decimal('200'))
+        self.assertEqual(totals['closing_balance'], Decimal('300'))
+
+    async def test_withdraw_more_than_balance(self):
+        response = await self.async_client.post(
+            reverse('transactions:withdraw_money'), {'amount': '200'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['amount'])
+
+
+# The test settings add a stand-in replica on SQLite only.
+REPLICA_ALIASES = {'replica'} & set(settings.DATABASES)
+
+
+@skipUnless(REPLICA_ALIASES, 'Needs the stand-in replica')
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(AccountTestCase):
+    """
+    The stand-in replica is a second SQLite database nothing is
+    replicated to, so pages read from it miss what the tests wrote.
+    """
+    databases = {'default', *REPLICA_ALIASES}
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        Transaction.objects.post(self.account, Decimal('1000'), DEPOSIT)
+
+    def get_report(self):
+        return self.client.get(reverse('transactions:transaction_report'))
+
+    def test_report_reads_from_replica(self):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.get_report()
+
+        # Logged in, as the session and the user are read from the primary.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['object_list']), 0)
+        self.assertTrue(queries)
+
+    def test_deposit_pins_session_to_primary(self):
+        self.client.post(
+            reverse('transactions:deposit_money'), {'amount': '500'}
+        )
+        self.assertEqual(len(self.get_report().context['object_list']), 2)
+
+        later = timezone.now() + datetime.timedelta(
+            seconds=settings.REPLICA_PIN_SECONDS + 1
+        )
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = self.get_report()
+        self.assertEqual(len(response.context['object_list']), 0)
+
+    def test_export_reads_from_replica(self):
+        response = self.client.get(
+            reverse('transactions:transaction_export'), {'format': 'ndjson'}
+        )
+        self.assertEqual(b''.join(response.streaming_content), b'')
+
+    def test_admin_changelist_reads_from_replica(self):
+        admin_user = User.objects.create_superuser(
+            email='admin@example.com', password='test-password'
+        )
+        self.client.force_login(admin_user)
+        response = self.client.get(
+            reverse('admin:transactions_transaction_changelist')
+        )
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_writes_and_migrations_use_primary(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_write(Transaction), 'default')
+        self.assertIs(router.allow_migrate('replica', 'transactions'), False)
+        self.assertIsNone(router.allow_migrate('default', 'transactions'))
+
+    @override_settings(ROOT_URLCONF=__name__)
+    async def test_async_report_reads_from_replica(self):
+        response = await self.async_client.get(
+            reverse('transactions:transaction_report')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['object_list']), 0)
+
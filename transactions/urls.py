@@ -1,13 +1,34 @@
-from django.urls import path
-
-from .views import DepositMoneyView, WithdrawMoneyView, TransactionRepostView
-
-
-app_name = 'transactions'
-
-
-urlpatterns = [
-    path("deposit/", DepositMoneyView.as_view(), name="deposit_money"),
-    path("report/", TransactionRepostView.as_view(), name="transaction_report"),
-    path("withdraw/", WithdrawMoneyView.as_view(), name="withdraw_money"),
-]
+from django.conf import settings
+from django.urls import path
+
+from . import async_views, views
+from .views import TransactionExportView
+
+
+app_name = 'transactions'
+
+
+def get_urlpatterns(transaction_views):
+    return [
+        path(
+            "deposit/",
+            transaction_views.DepositMoneyView.as_view(),
+            name="deposit_money"
+        ),
+        path(
+            "report/",
+            transaction_views.TransactionRepostView.as_view(),
+            name="transaction_report"
+        ),
+        path(
+            "withdraw/",
+            transaction_views.WithdrawMoneyView.as_view(),
+            name="withdraw_money"
+        ),
+        path("export/", TransactionExportView.as_view(), name="transaction_export"),
+    ]
+
+
+urlpatterns = get_urlpatterns(
+    async_views if settings.ASYNC_TRANSACTION_VIEWS else views
+)
@@ -1,134 +1,315 @@
-from dateutil.relativedelta import relativedelta
-
-from django.contrib import messages
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
-from django.utils import timezone
-from django.views.generic import CreateView, ListView
-
-from transactions.constants import DEPOSIT, WITHDRAWAL
-from transactions.forms import (
-    DepositForm,
-    TransactionDateRangeForm,
-    WithdrawForm,
-)
-from transactions.models import Transaction
-
-
-class TransactionRepostView(LoginRequiredMixin, ListView):
-    template_name = 'transactions/transaction_report.html'
-    model = Transaction
-    form_data = {}
-
-    def get(self, request, *args, **kwargs):
-        form = TransactionDateRangeForm(request.GET or None)
-        if form.is_valid():
-            self.form_data = form.cleaned_data
-
-        return super().get(request, *args, **kwargs)
-
-    def get_queryset(self):
-        queryset = super().get_queryset().filter(
-            account=self.request.user.account
-        )
-
-        daterange = self.form_data.get("daterange")
-
-        if daterange:
-            queryset = queryset.filter(timestamp__date__range=daterange)
-
-        return queryset.distinct()
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update({
-            'account': self.request.user.account,
-            'form': TransactionDateRangeForm(self.request.GET or None)
-        })
-
-        return context
-
-
-class TransactionCreateMixin(LoginRequiredMixin, CreateView):
-    template_name = 'transactions/transaction_form.html'
-    model = Transaction
-    title = ''
-    success_url = reverse_lazy('transactions:transaction_report')
-
-    def get_form_kwargs(self):
-        kwargs = super().get_form_kwargs()
-        kwargs.update({
-            'account': self.request.user.account
-        })
-        return kwargs
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update({
-            'title': self.title
-        })
-
-        return context
-
-
-class DepositMoneyView(TransactionCreateMixin):
-    form_class = DepositForm
-    title = 'Deposit Money to Your Account'
-
-    def get_initial(self):
-        initial = {'transaction_type': DEPOSIT}
-        return initial
-
-    def form_valid(self, form):
-        amount = form.cleaned_data.get('amount')
-        account = self.request.user.account
-
-        if not account.initial_deposit_date:
-            now = timezone.now()
-            next_interest_month = int(
-                12 / account.account_type.interest_calculation_per_year
-            )
-            account.initial_deposit_date = now
-            account.interest_start_date = (
-                now + relativedelta(
-                    months=+next_interest_month
-                )
-            )
-
-        account.balance += amount
-        account.save(
-            update_fields=[
-                'initial_deposit_date',
-                'balance',
-                'interest_start_date'
-            ]
-        )
-
-        messages.success(
-            self.request,
-            f'KES {amount} was deposited to your account successfully'
-        )
-
-        return super().form_valid(form)
-
-
-class WithdrawMoneyView(TransactionCreateMixin):
-    form_class = WithdrawForm
-    title = 'Withdraw Money from Your Account'
-
-    def get_initial(self):
-        initial = {'transaction_type': WITHDRAWAL}
-        return initial
-
-    def form_valid(self, form):
-        amount = form.cleaned_data.get('amount')
-
-        self.request.user.account.balance -= form.cleaned_data.get('amount')
-        self.request.user.account.save(update_fields=['balance'])
-
-        messages.success(
-            self.request,
-            f'Successfully withdrawn KES {amount} from your account'
-        )
-
-        return super().form_valid(form)
+import datetime
+import functools
+import hashlib
+from pathlib import Path
+from itertools import chain
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import router
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.views.generic import CreateView, ListView, View
+
+from core.routers import pin_to_primary
+from core.views import ReplicaReadMixin
+from transactions.archive import (
+    get_archive_horizon,
+    get_archived_transactions,
+)
+from transactions.constants import DEPOSIT, WITHDRAWAL
+from transactions.exports import EXPORT_FIELDS, EXPORT_FORMATS
+from transactions.forms import (
+    DepositForm,
+    TransactionDateRangeForm,
+    WithdrawForm,
+)
+from transactions.managers import InsufficientBalance
+from transactions.models import Transaction
+from transactions.pagination import InvalidCursor, KeysetPaginator
+from transactions.summaries import get_range_summary
+
+
+class TransactionDateRangeMixin(LoginRequiredMixin):
+    model = Transaction
+
+    def get_daterange(self):
+        form = TransactionDateRangeForm(self.request.GET or None)
+        if form.is_valid():
+            return form.cleaned_data.get("daterange")
+        return None
+
+    def get_summary_dates(self):
+        daterange = self.get_daterange()
+        if daterange:
+            return tuple(timezone.localdate(bound) for bound in daterange)
+        return None, None
+
+    def get_history_start(self):
+        """
+        Lower bound of the account's transaction timestamps in the table,
+        so a partitioned table skips the months before the first deposit
+        or the archived ones. The first deposit date is taken just after
+        its transaction is inserted, hence the day of margin around
+        midnight.
+        """
+        account = self.request.user.account
+        bounds = [get_archive_horizon(account)]
+        if account.initial_deposit_date:
+            bounds.append(timezone.make_aware(datetime.datetime.combine(
+                account.initial_deposit_date - datetime.timedelta(days=1),
+                datetime.time.min
+            )))
+        return max(filter(None, bounds), default=None)
+
+    def get_archive(self):
+        """Archived transactions in the date range, ``None`` if none are."""
+        return get_archived_transactions(
+            self.request.user.account, *(self.get_daterange() or ())
+        )
+
+    def get_queryset(self):
+        queryset = self.model._default_manager.filter(
+            account=self.request.user.account
+        )
+
+        history_start = self.get_history_start()
+        if history_start:
+            queryset = queryset.filter(timestamp__gte=history_start)
+
+        daterange = self.get_daterange()
+
+        if daterange:
+            start, end = daterange
+            queryset = queryset.filter(timestamp__gte=start, timestamp__lt=end)
+
+        return queryset
+
+
+@functools.cache
+def get_static_manifest_hash():
+    try:
+        manifest = (Path(settings.STATIC_ROOT) / 'staticfiles.json').read_bytes()
+    except FileNotFoundError:
+        return ''
+    return hashlib.md5(manifest, usedforsecurity=False).hexdigest()
+
+
+def get_release_version():
+    return settings.RELEASE_VERSION or get_static_manifest_hash()
+
+
+class ConditionalHistoryMixin:
+    """
+    Answer a repeated GET of an unchanged history with 304 Not Modified.
+
+    Transactions are only ever appended, so the account's latest
+    transaction and balance together with the query string and the
+    release identify the response. The latest transaction is read with
+    one lookup on the (account, timestamp, id) index before any list query
+    runs.
+
+    Only an ETag is sent. A Last-Modified date would let If-Modified-Since
+    answer 304 with a page rendered by the previous release.
+    """
+
+    def get_latest_transaction(self):
+        return self.model._default_manager.filter(
+            account=self.request.user.account
+        ).order_by('-timestamp', '-id').values_list('pk', flat=True)
+
+    def get_etag(self, latest):
+        """ETag of the response, ``latest`` being the latest transaction id."""
+        # Flash messages are shown once, the page has to be rendered.
+        if messages.get_messages(self.request):
+            return None
+
+        account = self.request.user.account
+        etag = hashlib.md5(
+            f'{get_release_version()}:{account.pk}:{latest}:{account.balance}:'
+            f'{self.request.GET.urlencode()}'.encode(),
+            usedforsecurity=False
+        ).hexdigest()
+        return quote_etag(etag)
+
+    def get_not_modified_response(self, latest):
+        """
+        Return the 304 (or 412) response for the request, ``None`` if the
+        page has to be built.
+        """
+        self.etag = self.get_etag(latest)
+        return get_conditional_response(self.request, etag=self.etag)
+
+    def add_validators(self, response):
+        if self.etag:
+            response.headers.setdefault('ETag', self.etag)
+        return response
+
+
+class TransactionRepostView(ConditionalHistoryMixin, TransactionDateRangeMixin,
+                            ReplicaReadMixin, ListView):
+    template_name = 'transactions/transaction_report.html'
+    paginate_by = 50
+    # Seconds the rendered rows of a page are cached for.
+    rows_cache_timeout = 60 * 60 * 24
+
+    def get(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(
+            self.get_latest_transaction().first()
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.add_validators(response)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, archive=self.get_archive()
+        )
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor.')
+
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_totals(self):
+        return get_range_summary(
+            self.request.user.account, *self.get_summary_dates()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'account': self.request.user.account,
+            'form': TransactionDateRangeForm(self.request.GET or None),
+            'totals': self.get_totals(),
+        })
+
+        return context
+
+
+class TransactionExportView(ConditionalHistoryMixin, TransactionDateRangeMixin,
+                            ReplicaReadMixin, View):
+    """
+    Stream the filtered statement as CSV or NDJSON.
+
+    Rows are read with a chunked iterator and written as they arrive, so
+    memory use does not depend on the size of the export.
+    """
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(
+                f'Unsupported export format: {export_format}'
+            )
+
+        response = self.get_not_modified_response(
+            self.get_latest_transaction().first()
+        )
+        if response is not None:
+            return self.add_validators(response)
+
+        content_type, stream_rows = EXPORT_FORMATS[export_format]
+        # Rows are read while streaming, after the view has returned.
+        rows = self.get_queryset().using(
+            router.db_for_read(self.model)
+        ).order_by('timestamp', 'id').values_list(
+            *EXPORT_FIELDS
+        ).iterator(chunk_size=self.chunk_size)
+        archive = self.get_archive()
+        if archive:
+            rows = chain(archive.export_rows(), rows)
+
+        response = StreamingHttpResponse(
+            stream_rows(rows), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="statement-'
+            f'{request.user.account.account_no}.{export_format}"'
+        )
+        return self.add_validators(response)
+
+
+class TransactionCreateMixin(LoginRequiredMixin, CreateView):
+    template_name = 'transactions/transaction_form.html'
+    model = Transaction
+    title = ''
+    success_url = reverse_lazy('transactions:transaction_report')
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs.update({
+            'account': self.request.user.account
+        })
+        return kwargs
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        # The report shows the new balance before replicas catch up.
+        pin_to_primary(self.request)
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'title': self.title
+        })
+
+        return context
+
+
+class DepositMoneyView(TransactionCreateMixin):
+    form_class = DepositForm
+    title = 'Deposit Money to Your Account'
+
+    def get_initial(self):
+        initial = {'transaction_type': DEPOSIT}
+        return initial
+
+    def form_valid(self, form):
+        amount = form.cleaned_data.get('amount')
+        response = super().form_valid(form)
+
+        messages.success(
+            self.request,
+            f'KES {amount} was deposited to your account successfully'
+        )
+
+        return response
+
+
+class WithdrawMoneyView(TransactionCreateMixin):
+    form_class = WithdrawForm
+    title = 'Withdraw Money from Your Account'
+
+    def get_initial(self):
+        initial = {'transaction_type': WITHDRAWAL}
+        return initial
+
+    def form_valid(self, form):
+        amount = form.cleaned_data.get('amount')
+
+        try:
+            response = super().form_valid(form)
+        except InsufficientBalance:
+            form.add_error(
+                'amount',
+                'You can not withdraw more than your account balance'
+            )
+            return self.form_invalid(form)
+
+        messages.success(
+            self.request,
+            f'Successfully withdrawn KES {amount} from your account'
+        )
+
+        return response